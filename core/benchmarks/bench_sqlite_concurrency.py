@@ -0,0 +1,132 @@
+"""
+Measures read throughput while a bulk write of translations is running, with
+the stock SQLite settings and with the production profile (core.sqlite).
+
+To run, in the core directory:
+    python benchmarks/bench_sqlite_concurrency.py --readers 4 --keys 20000 --seconds 5
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.sqlite import PRODUCTION_PRAGMAS  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE translation (
+    id INTEGER PRIMARY KEY,
+    language TEXT NOT NULL,
+    original_word TEXT NOT NULL,
+    translated_word TEXT NOT NULL,
+    UNIQUE (language, original_word)
+)
+"""
+
+
+def connect(path, pragmas):
+    # same defaults as django.db.backends.sqlite3
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+    for name, value in pragmas.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+def populate(path, keys):
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    connection.executemany(
+        "INSERT INTO translation (language, original_word, translated_word) VALUES (?, ?, ?)",
+        ((language, f"key_{index}", f"{language} {index}") for language in ("spanish", "french") for index in range(keys)),
+    )
+    connection.commit()
+    connection.close()
+
+
+def writer(path, pragmas, immediate, keys, stop, stats):
+    connection = connect(path, pragmas)
+    begin = "BEGIN IMMEDIATE" if immediate else "BEGIN"
+    revision = 0
+    while not stop.is_set():
+        revision += 1
+        try:
+            connection.execute(begin)
+            connection.executemany(
+                "UPDATE translation SET translated_word = ? WHERE language = 'spanish' AND original_word = ?",
+                ((f"spanish {index} r{revision}", f"key_{index}") for index in range(keys)),
+            )
+            connection.execute("COMMIT")
+            stats["writes"] += 1
+        except sqlite3.OperationalError:
+            connection.execute("ROLLBACK")
+            stats["write_errors"] += 1
+    connection.close()
+
+
+def reader(path, pragmas, keys, stop, stats, lock):
+    connection = connect(path, pragmas)
+    reads = errors = 0
+    index = 0
+    while not stop.is_set():
+        index = (index + 7919) % keys
+        try:
+            connection.execute(
+                "SELECT translated_word FROM translation WHERE language = 'spanish' AND original_word = ?",
+                (f"key_{index}",),
+            ).fetchone()
+            reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    connection.close()
+    with lock:
+        stats["reads"] += reads
+        stats["read_errors"] += errors
+
+
+def run(name, pragmas, immediate, args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.sqlite3")
+        populate(path, args.keys)
+        # journal_mode=WAL is persistent, set it before the threads start
+        connect(path, pragmas).close()
+
+        stats = {"reads": 0, "read_errors": 0, "writes": 0, "write_errors": 0}
+        stop = threading.Event()
+        lock = threading.Lock()
+        threads = [threading.Thread(target=writer, args=(path, pragmas, immediate, args.keys, stop, stats))]
+        threads += [
+            threading.Thread(target=reader, args=(path, pragmas, args.keys, stop, stats, lock))
+            for _ in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(
+        f"{name:<12}{stats['reads'] / args.seconds:>14,.0f}{stats['read_errors']:>13}"
+        f"{stats['writes']:>9}{stats['write_errors']:>14}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read throughput under a concurrent bulk write")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, bulk writes of {args.keys} keys, {args.seconds}s per profile")
+    print(f"{'profile':<12}{'reads/s':>14}{'read errors':>13}{'writes':>9}{'write errors':>14}")
+    run("stock", {}, False, args)
+    run("production", PRODUCTION_PRAGMAS, True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the binary translation table format against the JSON pull payload:
+bytes on the wire and encode/decode time.
+
+To run, in the core directory:
+    python benchmarks/bench_wire_format.py --languages 40 --keys 5000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from i18nilize.services import wire_format  # noqa: E402
+
+
+def build_catalog(languages, keys):
+    catalog = {}
+    for language_index in range(languages):
+        catalog[f"language_{language_index}"] = {
+            f"app.section_{key_index // 100}.message_{key_index}": f"Translated message {key_index} in language {language_index}"
+            for key_index in range(keys)
+        }
+    return catalog
+
+
+def encode_json(catalog):
+    # same settings as the rest_framework JSONRenderer
+    return json.dumps(catalog, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_json(data):
+    return json.loads(data)
+
+
+def measure(encode, decode, catalog, repeat):
+    data = encode(catalog)
+    encode_time = min(timeit.repeat(lambda: encode(catalog), number=1, repeat=repeat))
+    decode_time = min(timeit.repeat(lambda: decode(data), number=1, repeat=repeat))
+    assert decode(data) == catalog
+    return len(data), encode_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="translation wire format benchmark")
+    parser.add_argument("--languages", type=int, default=40)
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.languages, args.keys)
+    formats = [
+        ("json", encode_json, decode_json),
+        ("json + gzip", lambda c: gzip.compress(encode_json(c)), lambda d: decode_json(gzip.decompress(d))),
+        ("table", lambda c: wire_format.encode_catalog(c, compress=False), wire_format.decode_catalog),
+        ("table + zlib", lambda c: wire_format.encode_catalog(c, compress=True), wire_format.decode_catalog),
+    ]
+
+    print(f"{args.languages} languages x {args.keys} keys")
+    print(f"{'format':<14}{'bytes':>14}{'vs json':>10}{'encode ms':>12}{'decode ms':>12}")
+    json_size = None
+    for name, encode, decode in formats:
+        size, encode_time, decode_time = measure(encode, decode, catalog, args.repeat)
+        json_size = json_size or size
+        print(f"{name:<14}{size:>14,}{size / json_size:>10.2f}{encode_time * 1000:>12.1f}{decode_time * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
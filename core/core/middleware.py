@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _recent_write_key(client):
+    return f'i18nilize:recent-write:{client}'
+
+
+def _iterate_with_replica(content, enabled):
+    # set around every chunk rather than the whole iteration, the server may
+    # iterate in a different context than the one the generator was created in
+    iterator = iter(content)
+    while True:
+        with use_replica(enabled):
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets read-only requests (GET, HEAD, OPTIONS) read from the replicas.
+
+    Clients are identified by their Token or Microservice-Token header. After a
+    client sends a write, its reads stay on the primary for
+    READ_YOUR_WRITES_SECONDS so it never reads data older than its own writes
+    while replicas catch up. The marker is kept in the default cache, which
+    must be shared by every worker (see CACHES in settings). Without
+    REPLICA_DATABASES requests are passed through without touching the cache.
+
+    Streaming responses are read while their content is iterated, after the
+    view returned, so their iteration runs with the same routing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REPLICA_DATABASES', []):
+            # every read goes to the primary, no need for the cache
+            return self.get_response(request)
+
+        client = request.headers.get('Token') or request.headers.get('Microservice-Token')
+        is_read = request.method in SAFE_METHODS
+
+        replica_allowed = is_read and not (client and cache.get(_recent_write_key(client)))
+        with use_replica(replica_allowed):
+            response = self.get_response(request)
+        if response.streaming and not getattr(response, 'is_async', False):
+            response.streaming_content = _iterate_with_replica(response.streaming_content, replica_allowed)
+
+        if not is_read and client:
+            cache.set(_recent_write_key(client), True, getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5))
+        return response
@@ -0,0 +1,50 @@
+"""
+Database routing between the primary database and its read replicas.
+
+Reads go to a random replica while the current request allows it (see
+core.middleware.ReplicaRoutingMiddleware), every write goes to the primary.
+Once a request writes, its remaining reads go to the primary as well.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE = 'default'
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """
+    Allows (or forbids) reads from replicas for the duration of the block.
+    """
+    reset_token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(reset_token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the replicas listed in settings.REPLICA_DATABASES when allowed,
+    and writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        # read-your-writes: the rest of the request reads from the primary
+        _use_replica.set(False)
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
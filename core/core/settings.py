@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,6 +85,87 @@ DATABASES = {
     }
 }
 
+# Read replicas of the default database, given as a comma separated list of
+# database files in I18NILIZE_DB_REPLICAS. Read-only requests are spread over
+# them, writes always go to the default database.
+REPLICA_DATABASES = []
+for index, replica_name in enumerate(filter(None, os.environ.get('I18NILIZE_DB_REPLICAS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': replica_name.strip(),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Cache shared by every worker process, holding the read-your-writes markers of
+# ReplicaRoutingMiddleware and the writer permission cache. Both need a cache
+# shared by all workers to stay correct, so don't switch to the per-process
+# LocMemCache when running several workers. The file based cache is shared by
+# the processes of a host, like the SQLite database itself, set
+# I18NILIZE_CACHE_DIR to move it.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('I18NILIZE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'i18nilize-cache')),
+    }
+}
+
+# Runs tests against a cache in a temporary directory instead of the one above
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+# PRAGMAs run on every new SQLite connection (see core.sqlite). The production
+# profile, enabled with I18NILIZE_SQLITE_PROFILE=production, switches to WAL
+# and tunes locking and caching. Write transactions then take the write lock
+# up front (BEGIN IMMEDIATE), so they wait on busy_timeout instead of failing
+# with "database is locked" when upgrading a read lock.
+SQLITE_PRAGMAS = {}
+if os.environ.get('I18NILIZE_SQLITE_PROFILE') == 'production':
+    from core.sqlite import PRODUCTION_PRAGMAS
+    SQLITE_PRAGMAS = PRODUCTION_PRAGMAS
+    DATABASES['default']['OPTIONS'] = {
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+# Seconds a client's reads stay on the default database after it writes
+READ_YOUR_WRITES_SECONDS = 5
+
+# Rows written per UPDATE statement when patching translations in bulk
+BULK_UPDATE_CHUNK_SIZE = 500
+
+# Largest translation table body accepted, in bytes, compressed or not
+TRANSLATION_TABLE_MAX_SIZE = 64 * 1024 * 1024
+
+# Translations written per batch when importing an NDJSON upload
+INGEST_BATCH_SIZE = 1000
+
+# Worker threads applying background import jobs
+IMPORT_JOB_WORKERS = 2
+
+# Seconds without progress after which a pending or running import job is
+# reported as failed (its process was restarted or it is stuck)
+IMPORT_JOB_STALE_SECONDS = 600
+
+# In-process cache of tokens checked by require_valid_token: maximum number of
+# entries, and seconds known and unknown tokens stay cached
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_NEGATIVE_TTL = 5
+
+# Seconds writer permission checks stay cached in the shared default cache
+# (cleared on grant and relinquish, for every worker)
+WRITER_PERMISSION_CACHE_SECONDS = 30
+
+# Seconds a writer lease stays valid
+WRITER_LEASE_SECONDS = 3600
+
+# Seconds a signed read token stays valid (they can't be revoked before that)
+READ_TOKEN_SECONDS = 24 * 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
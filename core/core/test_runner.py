@@ -0,0 +1,31 @@
+"""
+Test runner keeping test runs out of the shared cache of the host.
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Points the default cache at a temporary directory for the duration of the
+    run, so clearing it in tests doesn't clear the cache of a server running on
+    the same host, and entries don't leak from one run into the next.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='i18nilize-test-cache-')
+        self.cache_settings = override_settings(CACHES={
+            **settings.CACHES,
+            'default': {**settings.CACHES['default'], 'LOCATION': self.cache_dir},
+        })
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
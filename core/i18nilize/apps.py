@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class I18NilizeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'i18nilize'
+
+    def ready(self):
+        # connects the token cache invalidation signals
+        from . import token_cache  # noqa: F401
+        from core.sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='i18nilize-sqlite-pragmas')
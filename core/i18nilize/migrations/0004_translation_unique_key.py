@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_translations(apps, schema_editor):
+    """
+    Collapses duplicate (token, language, original_word) rows, keeping the most
+    recently inserted row of each group, so the unique constraint can be added.
+    """
+    Translation = apps.get_model('i18nilize', 'Translation')
+    db_alias = schema_editor.connection.alias
+
+    duplicates = (
+        Translation.objects.using(db_alias)
+        .values('token', 'language', 'original_word')
+        .annotate(row_count=Count('id'), keep_id=Max('id'))
+        .filter(row_count__gt=1)
+    )
+    for duplicate in duplicates:
+        Translation.objects.using(db_alias).filter(
+            token=duplicate['token'],
+            language=duplicate['language'],
+            original_word=duplicate['original_word'],
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i18nilize', '0003_microservicetoken_writer'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_translations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.UniqueConstraint(fields=('token', 'language', 'original_word'), name='unique_translation_key'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalize_translations(apps, schema_editor):
+    """
+    Moves the free text language and original_word columns of every translation
+    into the per-project Language and SourceKey tables. Language codes are
+    normalized to lowercase, so rows that only differed by language casing are
+    collapsed, keeping the most recently inserted one.
+    """
+    Translation = apps.get_model('i18nilize', 'Translation')
+    Language = apps.get_model('i18nilize', 'Language')
+    SourceKey = apps.get_model('i18nilize', 'SourceKey')
+    db_alias = schema_editor.connection.alias
+
+    languages = {}
+    source_keys = {}
+    seen_keys = set()
+
+    for translation in Translation.objects.using(db_alias).order_by('-id').iterator():
+        code = translation.language_code.strip().lower()
+        language_key = (translation.token_id, code)
+        source_key_key = (translation.token_id, translation.original_word)
+
+        if (language_key, source_key_key) in seen_keys:
+            translation.delete()
+            continue
+        seen_keys.add((language_key, source_key_key))
+
+        if language_key not in languages:
+            languages[language_key] = Language.objects.using(db_alias).create(
+                token_id=translation.token_id, code=code
+            )
+        if source_key_key not in source_keys:
+            source_keys[source_key_key] = SourceKey.objects.using(db_alias).create(
+                token_id=translation.token_id, original_word=translation.original_word
+            )
+
+        translation.language = languages[language_key]
+        translation.source_key = source_keys[source_key_key]
+        translation.save(update_fields=['language', 'source_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i18nilize', '0004_translation_unique_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Language',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=255)),
+                ('token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.token')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'code'), name='unique_project_language')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SourceKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_word', models.CharField(max_length=255)),
+                ('token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.token')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'original_word'), name='unique_project_source_key')],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='translation',
+            name='unique_translation_key',
+        ),
+        migrations.RenameField(
+            model_name='translation',
+            old_name='language',
+            new_name='language_code',
+        ),
+        migrations.AddField(
+            model_name='translation',
+            name='language',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='i18nilize.language'),
+        ),
+        migrations.AddField(
+            model_name='translation',
+            name='source_key',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='i18nilize.sourcekey'),
+        ),
+        migrations.RunPython(normalize_translations, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='translation',
+            name='language_code',
+        ),
+        migrations.RemoveField(
+            model_name='translation',
+            name='original_word',
+        ),
+        migrations.AlterField(
+            model_name='translation',
+            name='language',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.language'),
+        ),
+        migrations.AlterField(
+            model_name='translation',
+            name='source_key',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.sourcekey'),
+        ),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.UniqueConstraint(fields=('language', 'source_key'), name='unique_translation_key'),
+        ),
+    ]
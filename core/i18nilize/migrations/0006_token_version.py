@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i18nilize', '0005_language_sourcekey_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='token',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
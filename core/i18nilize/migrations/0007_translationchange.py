@@ -0,0 +1,57 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_translation_changes(apps, schema_editor):
+    """
+    Records every existing translation in the change log under a new revision,
+    so clients can build a full catalog from the change feed alone.
+    """
+    Token = apps.get_model('i18nilize', 'Token')
+    Translation = apps.get_model('i18nilize', 'Translation')
+    TranslationChange = apps.get_model('i18nilize', 'TranslationChange')
+    db_alias = schema_editor.connection.alias
+
+    for token in Token.objects.using(db_alias).filter(translation__isnull=False).distinct():
+        token.version += 1
+        token.save(update_fields=['version'])
+        TranslationChange.objects.using(db_alias).bulk_create(
+            TranslationChange(
+                token_id=token.id,
+                revision=token.version,
+                language_id=language_id,
+                source_key_id=source_key_id,
+                translated_word=translated_word,
+            )
+            for language_id, source_key_id, translated_word in Translation.objects.using(db_alias)
+            .filter(token=token)
+            .values_list('language_id', 'source_key_id', 'translated_word')
+            .iterator()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i18nilize', '0006_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveBigIntegerField()),
+                ('translated_word', models.CharField(max_length=255, null=True)),
+                ('language', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.language')),
+                ('source_key', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='i18nilize.sourcekey')),
+                ('token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='i18nilize.token')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'revision'], name='translation_change_revision')],
+            },
+        ),
+        migrations.RunPython(backfill_translation_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('i18nilize', '0008_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writer',
+            name='lease_expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='writer',
+            name='lease_id',
+            field=models.UUIDField(null=True, unique=True),
+        ),
+    ]
@@ -6,15 +6,98 @@ import uuid
 class Token(models.Model):
     value = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every write to the project's translations, used to build ETags
+    # and as the revision number of the translation change log
+    version = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return str(self.value)
 
-class Translation(models.Model):
+class Language(models.Model):
+    token = models.ForeignKey(Token, on_delete=models.CASCADE)
+    code = models.CharField(max_length = 255)
+
+    # Language codes are stored once per project, normalized to lowercase at write time
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'code'], name='unique_project_language')
+        ]
+
+    def __str__(self):
+        return self.code
+
+class SourceKey(models.Model):
     token = models.ForeignKey(Token, on_delete=models.CASCADE)
     original_word = models.CharField(max_length = 255)
+
+    # Original words are stored once per project and shared by every language
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'original_word'], name='unique_project_source_key')
+        ]
+
+    def __str__(self):
+        return self.original_word
+
+class Translation(models.Model):
+    token = models.ForeignKey(Token, on_delete=models.CASCADE)
+    language = models.ForeignKey(Language, on_delete=models.CASCADE)
+    source_key = models.ForeignKey(SourceKey, on_delete=models.CASCADE)
     translated_word = models.CharField(max_length = 255)
-    language = models.CharField(max_length = 255)
+
+    # Ensures a project can only have one translation per language and original word,
+    # and backs the (language, source_key) lookups with a single index
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['language', 'source_key'], name='unique_translation_key')
+        ]
+
+class TranslationChange(models.Model):
+    """
+    Change log entry for a project's translations. A row without translated_word
+    is a tombstone for a deleted translation, and a row without source_key as
+    well means the whole language was deleted.
+    """
+    token = models.ForeignKey(Token, on_delete=models.CASCADE)
+    revision = models.PositiveBigIntegerField()
+    language = models.ForeignKey(Language, on_delete=models.CASCADE)
+    source_key = models.ForeignKey(SourceKey, on_delete=models.CASCADE, null=True)
+    translated_word = models.CharField(max_length = 255, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'revision'], name='translation_change_revision')
+        ]
+
+class ImportJob(models.Model):
+    """
+    A changeset applied in the background. The changeset is kept until the
+    job finishes, processed_count and total_count report its progress.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    token = models.ForeignKey(Token, on_delete=models.CASCADE)
+    status = models.CharField(max_length = 16, choices=STATUS_CHOICES, default=PENDING)
+    changeset = models.JSONField(null=True)
+    total_count = models.PositiveIntegerField(default=0)
+    processed_count = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True)
+    error = models.TextField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
 
 class MicroserviceToken(models.Model):
     value = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
@@ -27,6 +110,10 @@ class MicroserviceToken(models.Model):
 class Writer(models.Model):
     project_token = models.ForeignKey(Token, on_delete=models.CASCADE, null=False, blank=False)
     editor_token = models.ForeignKey(MicroserviceToken, null=True, on_delete=models.SET_NULL, related_name="write_permissions")
+    # Lease handed to the editor so it can skip checking its permissions before
+    # every push, writes sending a Writer-Lease header are checked against it
+    lease_id = models.UUIDField(null=True, unique=True)
+    lease_expires_at = models.DateTimeField(null=True)
 
     # Ensures that a project token (and editor token) can only appear once in writer
     class Meta:
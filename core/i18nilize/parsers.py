@@ -0,0 +1,31 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from i18nilize.services import wire_format
+
+
+class TranslationTableParser(BaseParser):
+    """
+    Parses a request body in the compact binary wire format into the same
+    {'translations': [{'language': ..., key: value}]} structure as the JSON body.
+    """
+    media_type = wire_format.MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # DATA_UPLOAD_MAX_MEMORY_SIZE doesn't apply to bodies read by parsers
+        max_size = getattr(settings, 'TRANSLATION_TABLE_MAX_SIZE', wire_format.MAX_BODY_SIZE)
+        data = stream.read(max_size + 1)
+        if len(data) > max_size:
+            raise ParseError(f'Translation table parse error - Body is larger than {max_size} bytes.')
+
+        try:
+            catalog = wire_format.decode_catalog(data, max_size)
+        except wire_format.WireFormatError as e:
+            raise ParseError(f'Translation table parse error - {e}')
+
+        return {
+            'translations': [
+                {'language': language, **translations}
+                for language, translations in catalog.items()
+            ]
+        }
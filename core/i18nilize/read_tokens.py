@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+from .models import Token
+
+"""
+Signed read tokens, accepted by the read endpoints in the Read-Token header
+instead of the project token.
+
+A read token carries the project's id, its scope and its expiry, signed with
+SECRET_KEY, so checking its signature doesn't touch the database. The payload
+is signed, not encrypted: it must never contain the project token, which
+grants writes.
+
+Read tokens can't be revoked: they stay valid until they expire. Deleting the
+project is the exception, require_read_token checks that the project still
+exists and answers 404 once it is gone. Rotating SECRET_KEY invalidates every
+read token, moving the old key to SECRET_KEY_FALLBACKS keeps them valid until
+they expire.
+"""
+
+DEFAULT_SECONDS = 24 * 3600
+
+SALT = 'i18nilize.read-token'
+READ_SCOPE = 'read'
+
+
+def max_seconds():
+    return getattr(settings, 'READ_TOKEN_SECONDS', DEFAULT_SECONDS)
+
+
+def issue_read_token(token, seconds=None):
+    """
+    Returns a read token for the project token, valid for the given number of
+    seconds (READ_TOKEN_SECONDS by default), and its expiry as a Unix timestamp.
+    """
+    expires_at = int(time.time()) + (seconds if seconds is not None else max_seconds())
+    payload = {'p': token.id, 's': READ_SCOPE, 'e': expires_at}
+    return signing.dumps(payload, salt=SALT), expires_at
+
+
+def verify_read_token(value, scope=READ_SCOPE):
+    """
+    Returns the Token a read token was issued for, or None if it is invalid,
+    expired or has another scope. Only the token's id is set, the other fields
+    are loaded on access.
+    """
+    try:
+        payload = signing.loads(value, salt=SALT)
+        if payload['s'] != scope or payload['e'] <= time.time():
+            return None
+        if not isinstance(payload['p'], int):
+            return None
+        return Token.from_db(None, ('id',), (payload['p'],))
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
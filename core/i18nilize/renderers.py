@@ -0,0 +1,26 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from i18nilize.services import wire_format
+
+
+class TranslationTableRenderer(BaseRenderer):
+    """
+    Renders a {language: {key: value}} catalog in the compact binary wire format.
+    Anything else (errors, messages) falls back to JSON.
+    """
+    media_type = wire_format.MEDIA_TYPE
+    format = 'table'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        response = renderer_context.get('response') if renderer_context else None
+        is_catalog = isinstance(data, dict) and all(isinstance(value, dict) for value in data.values())
+        if is_catalog and (response is None or response.status_code < 400):
+            return wire_format.encode_catalog(data)
+
+        if response is not None:
+            response['Content-Type'] = JSONRenderer.media_type
+        return JSONRenderer().render(data, renderer_context=renderer_context)
@@ -0,0 +1,155 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from ..models import ImportJob
+from . import translation_processor as tp
+
+"""
+Background import jobs. Large changesets are stored as an ImportJob and applied
+by a pool of worker threads inside the core service, a batch of translations
+at a time, so the request that submitted them returns right away.
+
+Jobs only live in the memory of the process that queued them. A running job
+saves its progress after every batch, which doubles as a heartbeat: pending or
+running jobs not updated for IMPORT_JOB_STALE_SECONDS (e.g. because the
+process restarted) are marked failed when their status is read, and must be
+submitted again.
+"""
+
+# Number of worker threads applying import jobs, can be overridden with the
+# IMPORT_JOB_WORKERS setting
+IMPORT_JOB_WORKERS = 2
+
+# Seconds without progress after which a pending or running job is considered
+# lost, can be overridden with the IMPORT_JOB_STALE_SECONDS setting
+IMPORT_JOB_STALE_SECONDS = 600
+
+STALE_JOB_ERROR = 'Import job stopped making progress, submit it again.'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Returns the worker pool, created on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMPORT_JOB_WORKERS', IMPORT_JOB_WORKERS),
+                thread_name_prefix='i18nilize-import',
+            )
+    return _executor
+
+
+def count_changeset(changeset):
+    """
+    Returns the number of translations in a changeset.
+    """
+    return sum(
+        len(changes.get(change_type, {}))
+        for changes in changeset.values()
+        for change_type in ('created', 'modified', 'deleted')
+    )
+
+
+def split_changeset(changeset, batch_size):
+    """
+    Splits a changeset into changesets of at most batch_size translations.
+    Deleted languages carry no translations and all go in the first batch.
+    """
+    batches = [{
+        language: changes
+        for language, changes in changeset.items()
+        if changes['type'] == 'deleted'
+    }]
+    size = 0
+    for language, changes in changeset.items():
+        if changes['type'] == 'deleted':
+            continue
+
+        for change_type in ('created', 'modified', 'deleted'):
+            for original_word, translated_word in changes.get(change_type, {}).items():
+                if size == batch_size:
+                    batches.append({})
+                    size = 0
+                if language not in batches[-1]:
+                    batches[-1][language] = {'type': changes['type'], 'created': {}, 'modified': {}, 'deleted': {}}
+                batches[-1][language][change_type][original_word] = translated_word
+                size += 1
+
+    return [batch for batch in batches if batch]
+
+
+def submit_import_job(token, changeset):
+    """
+    Stores the changeset as a pending ImportJob and queues it once the current
+    transaction commits. Returns the job.
+    """
+    job = ImportJob.objects.create(token=token, changeset=changeset, total_count=count_changeset(changeset))
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job.id))
+    return job
+
+
+def fail_stale_jobs(**filters):
+    """
+    Marks pending and running jobs matching filters that made no progress for
+    IMPORT_JOB_STALE_SECONDS as failed. Returns the number of jobs marked.
+    """
+    now = timezone.now()
+    stale_seconds = getattr(settings, 'IMPORT_JOB_STALE_SECONDS', IMPORT_JOB_STALE_SECONDS)
+    return ImportJob.objects.filter(
+        status__in=(ImportJob.PENDING, ImportJob.RUNNING),
+        updated_at__lt=now - timedelta(seconds=stale_seconds),
+        **filters,
+    ).update(status=ImportJob.FAILED, error=STALE_JOB_ERROR, updated_at=now)
+
+
+def _run_in_worker(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        # worker threads open their own connections, don't leak them
+        connections.close_all()
+
+
+def run_import_job(job_id):
+    """
+    Applies a pending job's changeset a batch at a time, saving the progress
+    after each batch. Each batch is its own transaction and applying a batch
+    again is harmless, so a failed job can simply be submitted again.
+    """
+    # claim the job, unless it was marked failed as stale in the meantime
+    claimed = ImportJob.objects.filter(id=job_id, status=ImportJob.PENDING).update(
+        status=ImportJob.RUNNING, updated_at=timezone.now()
+    )
+    job = ImportJob.objects.select_related('token').get(id=job_id)
+    if not claimed:
+        return job
+
+    batch_size = getattr(settings, 'INGEST_BATCH_SIZE', tp.INGEST_BATCH_SIZE)
+    result = {'created_count': 0, 'updated_count': 0, 'deleted_count': 0, 'dropped_languages': 0}
+    try:
+        for batch in split_changeset(job.changeset, batch_size):
+            for key, count in tp.apply_changeset(job.token, batch).items():
+                result[key] += count
+            job.processed_count += count_changeset(batch)
+            job.save(update_fields=['processed_count', 'updated_at'])
+    except Exception as e:
+        print(e)
+        job.status = ImportJob.FAILED
+        job.error = str(e)
+    else:
+        job.status = ImportJob.SUCCEEDED
+        job.changeset = None
+
+    job.token.refresh_from_db(fields=['version'])
+    job.result = {**result, 'revision': job.token.version}
+    job.save(update_fields=['status', 'error', 'changeset', 'result', 'updated_at'])
+    return job
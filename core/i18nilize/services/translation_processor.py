@@ -1,10 +1,46 @@
+import json
+import time
+
+from django.conf import settings
 from django.db import transaction
-from ..models import Translation
+from django.db.models import F
+from ..models import Language, SourceKey, Token, Translation, TranslationChange
 
 """
 Utility functions for translation file processing.
 """
 
+# Number of rows read from the database at a time when streaming translations
+STREAM_CHUNK_SIZE = 2000
+
+# Number of keys looked up per query by fetch_existing_translations, well under
+# SQLite's limit of 999 bound parameters in older versions
+EXISTING_LOOKUP_CHUNK_SIZE = 500
+
+# Number of rows written per UPDATE by bulk_update_translations, can be
+# overridden with the BULK_UPDATE_CHUNK_SIZE setting
+BULK_UPDATE_CHUNK_SIZE = 500
+
+# Number of translations upserted at a time when ingesting an NDJSON upload,
+# can be overridden with the INGEST_BATCH_SIZE setting
+INGEST_BATCH_SIZE = 1000
+
+# Change types of a language in a changeset, matching the client's DiffingProcessor
+CHANGE_TYPES = ('created', 'modified', 'deleted')
+
+# Default and maximum number of keys returned per page of translations
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Sorts after every other character, used to turn a key prefix into a key range
+MAX_CHARACTER = chr(0x10FFFF)
+
+
+class IngestError(ValueError):
+    def __init__(self, line_number, message):
+        super().__init__(f'Line {line_number}: {message}')
+        self.line_number = line_number
+
 
 def validate_translations_data(translations_data):
     """
@@ -24,13 +60,96 @@ def validate_translations_data(translations_data):
     return True
 
 
+def bump_version(token):
+    """
+    Increments the version of the given token. Must be called by every write to
+    the token's translations so that cached reads (ETags) are invalidated.
+    """
+    Token.objects.filter(pk=token.pk).update(version=F('version') + 1)
+    token.refresh_from_db(fields=['version'])
+    return token.version
+
+
+def record_changes(token, changes):
+    """
+    Bumps the version of the given token and records the changes under the new
+    revision in the change log. Changes are (language_id, source_key_id,
+    translated_word) tuples, with translated_word None for a deleted translation
+    and source_key_id None as well for a deleted language.
+    """
+    revision = bump_version(token)
+    TranslationChange.objects.bulk_create([
+        TranslationChange(
+            token=token,
+            revision=revision,
+            language_id=language_id,
+            source_key_id=source_key_id,
+            translated_word=translated_word,
+        )
+        for language_id, source_key_id, translated_word in changes
+    ])
+    return revision
+
+
+def normalize_language(language):
+    """
+    Normalizes a language code so every project stores one row per language.
+    """
+    return language.strip().lower()
+
+
+def get_or_create_languages(token, codes):
+    """
+    Returns a dictionary of language code to Language row for the given token,
+    creating any languages that don't exist yet.
+    """
+    codes = set(codes)
+    languages = {language.code: language for language in Language.objects.filter(token=token, code__in=codes)}
+    missing = [Language(token=token, code=code) for code in codes if code not in languages]
+    if missing:
+        Language.objects.bulk_create(missing, ignore_conflicts=True)
+        languages = {language.code: language for language in Language.objects.filter(token=token, code__in=codes)}
+    return languages
+
+
+def get_or_create_source_keys(token, original_words):
+    """
+    Returns a dictionary of original word to SourceKey row for the given token,
+    creating any source keys that don't exist yet.
+    """
+    original_words = sorted(set(original_words))
+    source_keys = fetch_source_keys(token, original_words)
+    missing = [
+        SourceKey(token=token, original_word=original_word)
+        for original_word in original_words if original_word not in source_keys
+    ]
+    if missing:
+        SourceKey.objects.bulk_create(missing, ignore_conflicts=True)
+        source_keys.update(fetch_source_keys(token, [source_key.original_word for source_key in missing]))
+    return source_keys
+
+
+def fetch_source_keys(token, original_words):
+    """
+    Returns a dictionary of original word to SourceKey row for the given words
+    that exist, looked up EXISTING_LOOKUP_CHUNK_SIZE words at a time.
+    """
+    source_keys = {}
+    for start in range(0, len(original_words), EXISTING_LOOKUP_CHUNK_SIZE):
+        for source_key in SourceKey.objects.filter(
+            token=token, original_word__in=original_words[start:start + EXISTING_LOOKUP_CHUNK_SIZE]
+        ):
+            source_keys[source_key.original_word] = source_key
+    return source_keys
+
+
 def get_new_translations(translations_data, token):
     """
     Returns a set of translations to add to the database. If any translation already
     exists and is being updated, returns False (use PATCH endpoint to make updates instead).
     """
-    translations_set, languages_set = extract_translations(translations_data)
-    existing_translations = fetch_existing_translations(token, translations_set, languages_set)
+    translations_set, _ = extract_translations(translations_data)
+    existing_translations = fetch_existing_translations(token, translations_set)
     return get_post_translations(translations_set, existing_translations)
 
 
@@ -39,8 +158,8 @@ def get_updated_translations(translations_data, token):
     Returns a set of translations to update in the database. If there are any new translations
     in the translations list, returns False (use POST endpoint to make new translations instead).
     """
-    translations_set, languages_set = extract_translations(translations_data)
-    existing_translations = fetch_existing_translations(token, translations_set, languages_set)
+    translations_set, _ = extract_translations(translations_data)
+    existing_translations = fetch_existing_translations(token, translations_set)
     return get_patch_translations(translations_set, existing_translations)
 
 
@@ -51,7 +170,7 @@ def extract_translations(translations_data):
     translations_set = set()
     languages_set = set()
     for translations in translations_data["translations"]:
-        language = translations["language"]
+        language = normalize_language(translations["language"])
         languages_set.add(language)
 
         for original_word, translated_word in translations.items():
@@ -62,19 +181,30 @@ def extract_translations(translations_data):
     return translations_set, languages_set
 
 
-def fetch_existing_translations(token, translations_set, languages_set):
+def fetch_existing_translations(token, translations_set):
     """
     Fetches existing translations from database in bulk to reduce number of queries.
+    Returns a dictionary of (original_word, language) to Translation row, so the
+    rows can be updated without being read again.
+
+    Keys are looked up per language, EXISTING_LOOKUP_CHUNK_SIZE keys at a time,
+    so only the requested (key, language) pairs are read and no query goes past
+    SQLite's bound parameter limit.
     """
-    existing_translations = {
-        (t.original_word, t.language): t.translated_word
+    words_by_language = {}
+    for original_word, _, language in translations_set:
+        words_by_language.setdefault(language, set()).add(original_word)
 
-        for t in Translation.objects.filter(
-            token=token,
-            language__in=list(languages_set),
-            original_word__in=[original_word for original_word, _, _ in translations_set],
-        )
-    }
+    existing_translations = {}
+    for language, original_words in words_by_language.items():
+        original_words = sorted(original_words)
+        for start in range(0, len(original_words), EXISTING_LOOKUP_CHUNK_SIZE):
+            for translation in Translation.objects.filter(
+                token=token,
+                language__code=language,
+                source_key__original_word__in=original_words[start:start + EXISTING_LOOKUP_CHUNK_SIZE],
+            ).select_related('language', 'source_key'):
+                existing_translations[(translation.source_key.original_word, language)] = translation
     return existing_translations
 
 
@@ -88,7 +218,7 @@ def get_post_translations(translations_set, existing_translations):
     for original_word, translated_word, language in translations_set:
         key = (original_word, language)
         if key in existing_translations:
-            if existing_translations[key] == translated_word:
+            if existing_translations[key].translated_word == translated_word:
                 continue
             # Translation already exists and is being updated
             return False
@@ -100,20 +230,23 @@ def get_post_translations(translations_set, existing_translations):
 def get_patch_translations(translations_set, existing_translations):
     """
     Compares translations received in request with translations in database.
-    If a translation already exists and is being updated, return False.
-    Otherwise, returns a list of new translations to add to database.
+    If a translation is new, return False.
+    Otherwise, returns a list of the existing Translation rows that change, with
+    their translated word set to the new value (not saved yet).
     """
-    new_translations = []
+    updated_translations = []
 
     for original_word, translated_word, language in translations_set:
         key = (original_word, language)
         if key in existing_translations:
-            if existing_translations[key] != translated_word:
-                new_translations.append((original_word, translated_word, language))
+            translation = existing_translations[key]
+            if translation.translated_word != translated_word:
+                translation.translated_word = translated_word
+                updated_translations.append(translation)
         else:
             return False
 
-    return new_translations
+    return updated_translations
 
 
 def bulk_create_translations(token, new_translations):
@@ -122,49 +255,488 @@ def bulk_create_translations(token, new_translations):
     If any addition fails, it will rollback all previous additions i.e database
     will be unchanged.
     """
-    bulk_translations = [
-        Translation(
-            token=token,
-            original_word=original_word,
-            translated_word=translated_word,
-            language=language,
-        )
-        for original_word, translated_word, language in new_translations
-    ]
     try:
         with transaction.atomic():
+            languages = get_or_create_languages(token, [language for _, _, language in new_translations])
+            source_keys = get_or_create_source_keys(token, [original_word for original_word, _, _ in new_translations])
+            bulk_translations = [
+                Translation(
+                    token=token,
+                    language=languages[language],
+                    source_key=source_keys[original_word],
+                    translated_word=translated_word,
+                )
+                for original_word, translated_word, language in new_translations
+            ]
             Translation.objects.bulk_create(bulk_translations)
+            if bulk_translations:
+                record_changes(token, [
+                    (translation.language_id, translation.source_key_id, translation.translated_word)
+                    for translation in bulk_translations
+                ])
         return True, len(bulk_translations)
     except Exception as e:
         print(e)
         return False, 0
 
 
-def bulk_update_translations(token, updated_translations):
+def bulk_update_translations(token, updated_translations, chunk_size=None):
     """
-    Update translations in the database with an atomic transaction.
-    Rollback previous updates if any fail.
+    Saves the translated word of the given Translation rows (as returned by
+    get_updated_translations) with an atomic transaction, one UPDATE per chunk
+    of rows. Rollback previous updates if any fail.
+
+    Returns whether the update succeeded, the number of updated rows and the
+    time spent on each chunk in milliseconds.
     """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'BULK_UPDATE_CHUNK_SIZE', BULK_UPDATE_CHUNK_SIZE)
+
     try:
+        chunk_timings = []
         with transaction.atomic():
-            for original_word, translated_word, language in updated_translations:
-                row = Translation.objects.get(token=token, original_word=original_word, language=language)
-                row.translated_word = translated_word
-                row.save()
+            for start in range(0, len(updated_translations), chunk_size):
+                chunk = updated_translations[start:start + chunk_size]
+                chunk_start = time.perf_counter()
+                Translation.objects.bulk_update(chunk, ['translated_word'], batch_size=chunk_size)
+                chunk_timings.append(round((time.perf_counter() - chunk_start) * 1000, 3))
+            if updated_translations:
+                record_changes(token, [
+                    (translation.language_id, translation.source_key_id, translation.translated_word)
+                    for translation in updated_translations
+                ])
 
-        return True, len(updated_translations)
+        return True, len(updated_translations), chunk_timings
     except Exception as e:
         print(e)
-        return False, 0
+        return False, 0, []
+
+def validate_changeset(changeset):
+    """
+    Light validation of a changeset, the structure DiffingProcessor.get_changed_translations
+    produces: {language: {'type': ..., 'created': {}, 'modified': {}, 'deleted': {}}}
+    """
+    if not isinstance(changeset, dict):
+        return False
+
+    for language, changes in changeset.items():
+        if not isinstance(changes, dict) or changes.get('type') not in CHANGE_TYPES:
+            return False
+
+        for change_type in ('created', 'modified', 'deleted'):
+            translations = changes.get(change_type, {})
+            if not isinstance(translations, dict):
+                return False
+            for key, value in translations.items():
+                if not isinstance(key, str) or not isinstance(value, str):
+                    return False
+
+    return True
+
+
+def translations_to_changeset(new_translations):
+    """
+    Converts the translations returned by get_new_translations into a changeset
+    creating them.
+    """
+    changeset = {}
+    for original_word, translated_word, language in new_translations:
+        if language not in changeset:
+            changeset[language] = {'type': 'modified', 'created': {}, 'modified': {}, 'deleted': {}}
+        changeset[language]['created'][original_word] = translated_word
+    return changeset
+
+
+def apply_changeset(token, changeset, chunk_size=None):
+    """
+    Applies a changeset (see validate_changeset) with one atomic transaction and
+    bulk queries. Created and modified translations are both upserted, so a
+    changeset can safely be sent again. Languages of type 'deleted' are dropped
+    with all their translations.
+
+    Returns a dictionary with the number of created, updated and deleted
+    translations and the number of dropped languages.
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'BULK_UPDATE_CHUNK_SIZE', BULK_UPDATE_CHUNK_SIZE)
+
+    dropped_languages = set()
+    upserts = {}
+    deletes = set()
+    for language, changes in changeset.items():
+        language = normalize_language(language)
+        if changes['type'] == 'deleted':
+            dropped_languages.add(language)
+            continue
+        for original_word, translated_word in changes.get('created', {}).items():
+            upserts[(original_word, language)] = translated_word
+        for original_word, translated_word in changes.get('modified', {}).items():
+            upserts[(original_word, language)] = translated_word
+        for original_word in changes.get('deleted', {}):
+            deletes.add((original_word, language))
+
+    with transaction.atomic():
+        deleted_count, changes = delete_translations(token, deletes, dropped_languages, chunk_size)
+
+        translations_set = {(original_word, None, language) for original_word, language in upserts}
+        existing_translations = fetch_existing_translations(token, translations_set)
+
+        updated_translations = []
+        for key, translated_word in upserts.items():
+            translation = existing_translations.get(key)
+            if translation is not None and translation.translated_word != translated_word:
+                translation.translated_word = translated_word
+                updated_translations.append(translation)
+        Translation.objects.bulk_update(updated_translations, ['translated_word'], batch_size=chunk_size)
+
+        new_keys = [key for key in upserts if key not in existing_translations]
+        languages = get_or_create_languages(token, [language for _, language in new_keys])
+        source_keys = get_or_create_source_keys(token, [original_word for original_word, _ in new_keys])
+        created_translations = Translation.objects.bulk_create([
+            Translation(
+                token=token,
+                language=languages[language],
+                source_key=source_keys[original_word],
+                translated_word=upserts[(original_word, language)],
+            )
+            for original_word, language in new_keys
+        ], batch_size=chunk_size)
+
+        changes.extend(
+            (translation.language_id, translation.source_key_id, translation.translated_word)
+            for translation in updated_translations + created_translations
+        )
+        if changes:
+            record_changes(token, changes)
+
+    return {
+        'created_count': len(created_translations),
+        'updated_count': len(updated_translations),
+        'deleted_count': deleted_count,
+        'dropped_languages': sum(1 for _, source_key_id, _ in changes if source_key_id is None),
+    }
+
+
+def ingest_translations(token, lines, batch_size=None):
+    """
+    Upserts translations read from NDJSON lines, each line being one entry of
+    the translations list ({'language': ..., key: value}). Lines are parsed,
+    validated and written a batch at a time, so memory depends on the batch
+    size and not on the size of the upload. Large languages can be split over
+    several lines.
+
+    The whole import is one transaction. Raises IngestError for an invalid
+    line, in which case nothing is imported.
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'INGEST_BATCH_SIZE', INGEST_BATCH_SIZE)
+
+    counts = {'created_count': 0, 'updated_count': 0}
+    batch = {}
+    batch_count = 0
+
+    def flush():
+        for key, count in apply_changeset(token, batch).items():
+            if key in counts:
+                counts[key] += count
+        batch.clear()
+
+    with transaction.atomic():
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                raise IngestError(line_number, 'Invalid JSON.')
+            if not isinstance(entry, dict) or not validate_translations_data({'translations': [entry]}):
+                raise IngestError(line_number, 'Translations are improperly formatted.')
+
+            language = entry.pop('language')
+            for original_word, translated_word in entry.items():
+                if language not in batch:
+                    batch[language] = {'type': 'modified', 'created': {}, 'modified': {}, 'deleted': {}}
+                batch[language]['created'][original_word] = translated_word
+                batch_count += 1
+                if batch_count % batch_size == 0:
+                    flush()
+
+        if batch:
+            flush()
+
+    return counts
+
+
+def delete_translations(token, keys=(), languages=(), chunk_size=None):
+    """
+    Deletes the translations of the given (original_word, language) pairs and
+    every translation of the given languages with set-based deletes, a chunk of
+    keys per query. Doesn't record the changes, callers must record the returned
+    changes in the same transaction.
+
+    Returns the number of deleted translations and the changes to record.
+    """
+    if chunk_size is None:
+        chunk_size = getattr(settings, 'BULK_UPDATE_CHUNK_SIZE', BULK_UPDATE_CHUNK_SIZE)
+
+    languages = {normalize_language(language) for language in languages}
+    language_ids = list(Language.objects.filter(token=token, code__in=languages).values_list('id', flat=True))
+    deleted_count, _ = Translation.objects.filter(token=token, language_id__in=language_ids).delete()
+    changes = [(language_id, None, None) for language_id in language_ids]
+
+    keys_by_language = {}
+    for original_word, language in keys:
+        language = normalize_language(language)
+        if language not in languages:
+            keys_by_language.setdefault(language, []).append(original_word)
+    key_languages = dict(
+        Language.objects.filter(token=token, code__in=list(keys_by_language)).values_list('code', 'id')
+    )
+
+    for language, original_words in keys_by_language.items():
+        if language not in key_languages:
+            continue
+        for start in range(0, len(original_words), chunk_size):
+            rows = list(Translation.objects.filter(
+                token=token,
+                language_id=key_languages[language],
+                source_key__original_word__in=original_words[start:start + chunk_size],
+            ).values_list('id', 'source_key_id'))
+            Translation.objects.filter(id__in=[translation_id for translation_id, _ in rows]).delete()
+            deleted_count += len(rows)
+            changes.extend((key_languages[language], source_key_id, None) for _, source_key_id in rows)
+
+    return deleted_count, changes
+
+
+def bulk_delete_translations(token, keys=(), languages=()):
+    """
+    Deletes the given (original_word, language) pairs and whole languages with
+    an atomic transaction. Returns the number of deleted translations.
+    """
+    with transaction.atomic():
+        deleted_count, changes = delete_translations(token, keys, languages)
+        if changes:
+            record_changes(token, changes)
+    return deleted_count
+
+
+def delete_all_translations(token):
+    """
+    Deletes every translation of the given token with a single query.
+    """
+    with transaction.atomic():
+        Translation.objects.filter(token=token).delete()
+        record_changes(token, [
+            (language_id, None, None)
+            for language_id in Language.objects.filter(token=token).values_list('id', flat=True)
+        ])
+
 
 def get_translations_by_language(language, token):
     """
     Return all translations for the given language as a dictionary.
     """
-    translations = Translation.objects.filter(language=language, token=token)
+    if language is None:
+        return {}
+
+    translations = Translation.objects.filter(
+        token=token, language__code=normalize_language(language)
+    ).values_list('source_key__original_word', 'translated_word')
 
     translations_dict = {
-        translation.original_word: translation.translated_word 
-        for translation in translations
+        original_word: translated_word
+        for original_word, translated_word in translations
     }
-    return translations_dict
\ No newline at end of file
+    return translations_dict
+
+
+def get_translations_page(token, languages, keys=None, prefix=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Returns one page of translations for the given languages, paginated by key.
+    Keys can be restricted to an explicit list and/or a prefix. Pages are ordered
+    by key and cursor is the last key of the previous page, so every page is a
+    range scan over the source key index.
+
+    Explicit keys and the translations of a page are looked up
+    EXISTING_LOOKUP_CHUNK_SIZE keys at a time, so no query goes past SQLite's
+    bound parameter limit however many keys are requested.
+
+    Returns a dictionary of language to translations, and the cursor of the next
+    page (None on the last page).
+    """
+    source_keys = SourceKey.objects.filter(token=token)
+    if prefix:
+        source_keys = source_keys.filter(
+            original_word__gte=prefix,
+            original_word__lt=prefix + MAX_CHARACTER,
+            original_word__startswith=prefix,
+        )
+    if cursor is not None:
+        source_keys = source_keys.filter(original_word__gt=cursor)
+    source_keys = source_keys.order_by('original_word').values_list('id', 'original_word')
+
+    if keys is None:
+        page = list(source_keys[:limit + 1])
+    else:
+        # chunks are in key order, so the page is read chunk after chunk
+        keys = sorted(set(keys))
+        page = []
+        for start in range(0, len(keys), EXISTING_LOOKUP_CHUNK_SIZE):
+            page += source_keys.filter(original_word__in=keys[start:start + EXISTING_LOOKUP_CHUNK_SIZE])
+            if len(page) > limit:
+                break
+    next_cursor = page[limit - 1][1] if len(page) > limit else None
+    original_words = dict(page[:limit])
+
+    languages = [normalize_language(language) for language in languages]
+    source_key_ids = list(original_words)
+    translations = {}
+    for start in range(0, len(source_key_ids), EXISTING_LOOKUP_CHUNK_SIZE):
+        translations.update(
+            ((language, source_key_id), translated_word)
+            for language, source_key_id, translated_word in Translation.objects.filter(
+                token=token,
+                language__code__in=languages,
+                source_key_id__in=source_key_ids[start:start + EXISTING_LOOKUP_CHUNK_SIZE],
+            ).values_list('language__code', 'source_key_id', 'translated_word')
+        )
+
+    # rebuild each language in key order
+    translations_dict = {language: {} for language in languages}
+    for language, language_translations in translations_dict.items():
+        for source_key_id, original_word in original_words.items():
+            key = (language, source_key_id)
+            if key in translations:
+                language_translations[original_word] = translations[key]
+
+    return translations_dict, next_cursor
+
+
+def create_translation(token, original_word, translated_word, language):
+    """
+    Adds a single translation to the database, creating its language and
+    source key rows if needed.
+    """
+    with transaction.atomic():
+        languages = get_or_create_languages(token, [language])
+        source_keys = get_or_create_source_keys(token, [original_word])
+        translation = Translation.objects.create(
+            token=token,
+            language=languages[language],
+            source_key=source_keys[original_word],
+            translated_word=translated_word,
+        )
+        record_changes(token, [(translation.language_id, translation.source_key_id, translated_word)])
+        return translation
+
+
+def update_translation(token, translation, translated_word):
+    """
+    Updates the translated word of a single translation.
+    """
+    with transaction.atomic():
+        translation.translated_word = translated_word
+        translation.save()
+        record_changes(token, [(translation.language_id, translation.source_key_id, translated_word)])
+    return translation
+
+
+def delete_translation(token, translation):
+    """
+    Deletes a single translation.
+    """
+    with transaction.atomic():
+        translation.delete()
+        record_changes(token, [(translation.language_id, translation.source_key_id, None)])
+
+
+def get_all_translations(token):
+    """
+    Return all translations for the given token grouped by language, following
+    the format of local translation files.
+    """
+    translations = Translation.objects.filter(token=token).values_list(
+        'language__code', 'source_key__original_word', 'translated_word'
+    )
+
+    translations_dict = {}
+    for language, original_word, translated_word in translations:
+        if language not in translations_dict:
+            translations_dict[language] = {}
+        translations_dict[language][original_word] = translated_word
+    return translations_dict
+
+
+def stream_all_translations(token, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yields all translations for the given token as fragments of the same JSON
+    object get_all_translations returns. Rows are read from the database in
+    chunks ordered by language, so memory stays flat regardless of catalog size.
+    """
+    # the language code is read with each row, a language created while
+    # streaming can't be missing from a lookup table read beforehand
+    rows = (
+        Translation.objects.filter(token=token)
+        .order_by('language_id')
+        .values_list('language_id', 'language__code', 'source_key__original_word', 'translated_word')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    yield '{'
+    current_language_id = None
+    buffer = []
+    for language_id, language, original_word, translated_word in rows:
+        if language_id != current_language_id:
+            if current_language_id is not None:
+                buffer.append('},')
+            buffer.append(f'{json.dumps(language)}:{{')
+            current_language_id = language_id
+        else:
+            buffer.append(',')
+        buffer.append(f'{json.dumps(original_word)}:{json.dumps(translated_word)}')
+
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+
+    if current_language_id is not None:
+        buffer.append('}')
+    buffer.append('}')
+    yield ''.join(buffer)
+
+
+def get_translation_changes(token, since):
+    """
+    Returns the changes made to the token's translations after the given revision,
+    grouped by language. Multiple changes to the same key are collapsed into the
+    latest one. A language with reset set to True was deleted (and possibly
+    recreated) and must be cleared before its updates are applied.
+    """
+    changes = (
+        TranslationChange.objects.filter(token=token, revision__gt=since)
+        .order_by('revision', 'id')
+        .values_list('language__code', 'source_key__original_word', 'translated_word')
+    )
+
+    changes_dict = {}
+    for language, original_word, translated_word in changes:
+        if language not in changes_dict or original_word is None:
+            changes_dict[language] = {'reset': original_word is None, 'updated': {}, 'deleted': []}
+        if original_word is None:
+            continue
+
+        language_changes = changes_dict[language]
+        if translated_word is None:
+            language_changes['updated'].pop(original_word, None)
+            language_changes['deleted'].append(original_word)
+        else:
+            language_changes['updated'][original_word] = translated_word
+
+    # a key that was deleted and then recreated only needs its latest value
+    for language_changes in changes_dict.values():
+        language_changes['deleted'] = [
+            original_word for original_word in dict.fromkeys(language_changes['deleted'])
+            if original_word not in language_changes['updated']
+        ]
+    return changes_dict
@@ -0,0 +1,163 @@
+import struct
+import sys
+import zlib
+from array import array
+
+"""
+Compact binary representation of a translation catalog ({language: {key: value}}).
+
+Every distinct key and value is sent once in a string table, and each language
+is sent as two arrays of indices into those tables:
+
+    header   magic (4 bytes) | format version (1 byte) | flags (1 byte)
+    body     key table | value table | language table | languages
+    table    count (u32) | character lengths (u32 * count) | utf-8 text
+    language entry count (u32) | key indices (u32 * count) | value indices (u32 * count)
+
+All integers are little-endian. When FLAG_COMPRESSED is set the body is zlib
+compressed. The client package ships the same codec, keep them in sync.
+"""
+
+MEDIA_TYPE = "application/x-i18nilize-table"
+
+MAGIC = b"I18T"
+FORMAT_VERSION = 1
+FLAG_COMPRESSED = 0x01
+
+# Bodies smaller than this are not worth compressing
+COMPRESSION_THRESHOLD = 1024
+
+# Largest body decode_catalog accepts by default, after decompression
+MAX_BODY_SIZE = 256 * 1024 * 1024
+
+_HEADER = struct.Struct("<4sBB")
+_COUNT = struct.Struct("<I")
+
+
+class WireFormatError(ValueError):
+    pass
+
+
+def _u32_array(values):
+    indices = array("I", values)
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices.tobytes()
+
+
+def _read_u32_array(body, offset, count):
+    end = offset + 4 * count
+    if end > len(body):
+        raise WireFormatError("Truncated index array.")
+    indices = array("I")
+    indices.frombytes(body[offset:end])
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices, end
+
+
+def _encode_table(strings):
+    text = "".join(strings)
+    return b"".join((
+        _COUNT.pack(len(strings)),
+        _u32_array(len(string) for string in strings),
+        _COUNT.pack(len(text.encode("utf-8"))),
+        text.encode("utf-8"),
+    ))
+
+
+def _decode_table(body, offset):
+    (count,) = _COUNT.unpack_from(body, offset)
+    lengths, offset = _read_u32_array(body, offset + _COUNT.size, count)
+    (text_size,) = _COUNT.unpack_from(body, offset)
+    offset += _COUNT.size
+    if offset + text_size > len(body):
+        raise WireFormatError("Truncated string table.")
+    text = body[offset:offset + text_size].decode("utf-8")
+    offset += text_size
+
+    strings = []
+    position = 0
+    for length in lengths:
+        strings.append(text[position:position + length])
+        position += length
+    if position != len(text):
+        raise WireFormatError("String table lengths do not match its text.")
+    return strings, offset
+
+
+def encode_catalog(catalog, compress=None):
+    """
+    Encodes a {language: {key: value}} catalog. Compresses the body when compress
+    is True, or when it is None and the body is larger than COMPRESSION_THRESHOLD.
+    """
+    key_indices = {}
+    value_indices = {}
+    languages = []
+    for language, translations in catalog.items():
+        language_keys = [key_indices.setdefault(key, len(key_indices)) for key in translations]
+        language_values = [value_indices.setdefault(value, len(value_indices)) for value in translations.values()]
+        languages.append((language, language_keys, language_values))
+
+    parts = [
+        _encode_table(list(key_indices)),
+        _encode_table(list(value_indices)),
+        _encode_table([language for language, _, _ in languages]),
+    ]
+    for _, language_keys, language_values in languages:
+        parts.append(_COUNT.pack(len(language_keys)))
+        parts.append(_u32_array(language_keys))
+        parts.append(_u32_array(language_values))
+    body = b"".join(parts)
+
+    flags = 0
+    if compress or (compress is None and len(body) > COMPRESSION_THRESHOLD):
+        body = zlib.compress(body)
+        flags |= FLAG_COMPRESSED
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags) + body
+
+
+def decode_catalog(data, max_size=MAX_BODY_SIZE):
+    """
+    Decodes bytes produced by encode_catalog back into a {language: {key: value}} catalog.
+    Bodies larger than max_size bytes, once decompressed, are rejected.
+    """
+    if len(data) < _HEADER.size:
+        raise WireFormatError("Missing header.")
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise WireFormatError("Not a translation table.")
+    if version != FORMAT_VERSION:
+        raise WireFormatError(f"Unsupported translation table version {version}.")
+
+    body = data[_HEADER.size:]
+    try:
+        if flags & FLAG_COMPRESSED:
+            decompressor = zlib.decompressobj()
+            body = decompressor.decompress(body, max_size + 1)
+            if len(body) > max_size or decompressor.unconsumed_tail:
+                raise WireFormatError(f"Body is larger than {max_size} bytes.")
+            if not decompressor.eof or decompressor.unused_data:
+                raise WireFormatError("Malformed compressed body.")
+        elif len(body) > max_size:
+            raise WireFormatError(f"Body is larger than {max_size} bytes.")
+
+        keys, offset = _decode_table(body, 0)
+        values, offset = _decode_table(body, offset)
+        languages, offset = _decode_table(body, offset)
+
+        catalog = {}
+        for language in languages:
+            (count,) = _COUNT.unpack_from(body, offset)
+            language_keys, offset = _read_u32_array(body, offset + _COUNT.size, count)
+            language_values, offset = _read_u32_array(body, offset, count)
+            catalog[language] = {
+                keys[key_index]: values[value_index]
+                for key_index, value_index in zip(language_keys, language_values)
+            }
+        if offset != len(body):
+            raise WireFormatError("Unexpected data after the last language.")
+    except (struct.error, zlib.error, UnicodeDecodeError, IndexError) as e:
+        raise WireFormatError(f"Malformed translation table: {e}") from e
+
+    return catalog
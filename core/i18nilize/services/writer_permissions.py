@@ -0,0 +1,155 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from ..models import MicroserviceToken, Writer
+
+"""
+Writer permission lookups for WriterPermissionView.
+
+A microservice token, its project token and the project's Writer row are
+resolved with a single joined query. Reads are cached for
+WRITER_PERMISSION_CACHE_SECONDS, keyed by microservice token (its project) and
+by project (its writer), so the check push_translations runs before every push
+is usually served from the cache. Granting or relinquishing permissions clears
+the project's entry, moving a microservice token to another project clears the
+token's entry.
+
+Entries are stored with the generation of the cache read before the lookup,
+and every invalidation starts a new generation. An entry from an older
+generation is ignored, so a lookup that read the database before a grant
+can't cache the previous writer after the grant cleared its entry.
+
+The entries live in the default cache, which is shared by every worker (see
+CACHES in settings), so the invalidations reach all of them. With a
+per-process cache such as LocMemCache, other workers would serve stale writers
+for up to WRITER_PERMISSION_CACHE_SECONDS.
+
+The editor can also get a writer lease, valid for WRITER_LEASE_SECONDS, and
+send it with its writes in the Writer-Lease header instead of checking its
+permissions before every push.
+"""
+
+DEFAULT_CACHE_SECONDS = 30
+DEFAULT_LEASE_SECONDS = 3600
+
+_MISSING = object()
+
+
+_GENERATION_KEY = 'i18nilize:writer-permission-generation'
+
+
+def _microservice_token_key(value):
+    return f'i18nilize:ms-token-project:{value}'
+
+
+def _project_writer_key(value):
+    return f'i18nilize:project-writer:{value}'
+
+
+def _cache_seconds():
+    return getattr(settings, 'WRITER_PERMISSION_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+
+
+def _current_generation():
+    generation = cache.get(_GENERATION_KEY)
+    if generation is None:
+        cache.add(_GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(_GENERATION_KEY)
+    return generation
+
+
+def _new_generation():
+    cache.set(_GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def resolve_microservice_token(value):
+    """
+    Returns the MicroserviceToken with the given value, with its project token
+    loaded and writer_id, writer_editor_id and writer_editor_value annotated
+    from the project's Writer row (None without one). Returns None if the
+    microservice token doesn't exist.
+    """
+    writers = Writer.objects.filter(project_token=OuterRef('project_token'))
+    return (
+        MicroserviceToken.objects.filter(value=value)
+        .select_related('project_token')
+        .annotate(
+            writer_id=Subquery(writers.values('id')[:1]),
+            writer_editor_id=Subquery(writers.values('editor_token_id')[:1]),
+            writer_editor_value=Subquery(writers.values('editor_token__value')[:1]),
+        )
+        .first()
+    )
+
+
+def get_writer_permission(value):
+    """
+    Returns whether the microservice token exists, and the writer of its project
+    as {'project_token': ..., 'editor_token': ...} (None if the project has no
+    Writer row yet). Served from the cache when possible.
+    """
+    cached = cache.get_many([_GENERATION_KEY, _microservice_token_key(value)])
+    generation = cached.get(_GENERATION_KEY)
+    project_entry = cached.get(_microservice_token_key(value), _MISSING)
+    if generation is not None and project_entry is not _MISSING and project_entry[0] == generation:
+        writer_entry = cache.get(_project_writer_key(project_entry[1]), _MISSING)
+        if writer_entry is not _MISSING and writer_entry[0] == generation:
+            return True, writer_entry[1]
+
+    # read before the database, a grant from now on starts a newer generation
+    if generation is None:
+        generation = _current_generation()
+
+    microservice_token = resolve_microservice_token(value)
+    if microservice_token is None:
+        return False, None
+
+    project_value = str(microservice_token.project_token) if microservice_token.project_token else None
+    writer = None
+    if microservice_token.writer_id is not None:
+        writer = {
+            'project_token': project_value,
+            'editor_token': str(microservice_token.writer_editor_value) if microservice_token.writer_editor_value else None,
+        }
+
+    cache.set(_microservice_token_key(value), (generation, project_value), _cache_seconds())
+    cache.set(_project_writer_key(project_value), (generation, writer), _cache_seconds())
+    return True, writer
+
+
+def invalidate_project(project_token):
+    _new_generation()
+    cache.delete(_project_writer_key(str(project_token) if project_token else None))
+
+
+def invalidate_microservice_token(value):
+    _new_generation()
+    cache.delete(_microservice_token_key(value))
+
+
+def issue_lease(writer_id):
+    """
+    Gives the writer a new lease, replacing the previous one. Returns the lease
+    id and its expiry.
+    """
+    lease_id = uuid.uuid4()
+    expires_at = timezone.now() + timedelta(seconds=getattr(settings, 'WRITER_LEASE_SECONDS', DEFAULT_LEASE_SECONDS))
+    Writer.objects.filter(id=writer_id).update(lease_id=lease_id, lease_expires_at=expires_at)
+    return lease_id, expires_at
+
+
+def is_valid_lease(project_token, lease_id):
+    """
+    Checks that the lease belongs to the current writer of the project and
+    hasn't expired, with a single lookup on the unique lease id.
+    """
+    return Writer.objects.filter(
+        lease_id=lease_id,
+        project_token=project_token,
+        editor_token__isnull=False,
+        lease_expires_at__gt=timezone.now(),
+    ).exists()
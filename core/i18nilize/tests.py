@@ -1,8 +1,28 @@
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import IntegrityError, connection, transaction
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
-from .models import Token, Translation, MicroserviceToken, Writer
-from .services.translation_processor import bulk_create_translations, bulk_update_translations, get_translations_by_language
+from rest_framework.test import APIRequestFactory, APITestCase
+from django.core import signing
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+from core.middleware import ReplicaRoutingMiddleware
+from core.routers import PrimaryReplicaRouter, use_replica
+from core.sqlite import configure_connection
+from .models import ImportJob, Language, SourceKey, Token, Translation, MicroserviceToken, Writer
+from .services import import_jobs, wire_format, writer_permissions
+from .read_tokens import issue_read_token
+from .token_cache import token_cache
+from .services.translation_processor import bulk_create_translations, bulk_update_translations, create_translation, fetch_existing_translations, get_translations_by_language, stream_all_translations
 
 
 class TokenViewTests(APITestCase):
@@ -252,6 +272,55 @@ class ProcessTranslationsViewTests(APITestCase):
         translations = Translation.objects.all()
         self.assertEqual(len(translations), 0)
 
+    def test_translation_key_is_unique(self):
+        """
+        Tests that the database rejects a second row for the same token, language and word.
+        """
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        translation = create_translation(token, 'hello', 'hola', 'spanish')
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Translation.objects.create(
+                    token=token, language=translation.language, source_key=translation.source_key, translated_word='buenas'
+                )
+
+        other_token = Token.objects.create()
+        create_translation(other_token, 'hello', 'hola', 'spanish')
+        self.assertEqual(Translation.objects.filter(source_key__original_word='hello').count(), 2)
+
+    def test_languages_and_source_keys_are_shared(self):
+        """
+        Tests that languages are normalized at write time and that languages and source keys
+        are stored once per project.
+        """
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'Spanish',
+                    'hello': 'hola',
+                    'bye': 'chau',
+                },
+                {
+                    'language': 'french',
+                    'hello': 'bonjour',
+                }
+            ]
+        }
+        headers = {
+            'HTTP_Token': self.TEST_TOKEN
+        }
+        response = self.client.post(reverse('process-translations'), translations_data, **headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        self.assertCountEqual(Language.objects.filter(token=token).values_list('code', flat=True), ['spanish', 'french'])
+        self.assertCountEqual(SourceKey.objects.filter(token=token).values_list('original_word', flat=True), ['hello', 'bye'])
+        self.assertEqual(Translation.objects.filter(token=token).count(), 3)
+
+        response = self.client.get(reverse('process-translations'), **headers, query_params={'language': 'SPANISH'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'hello': 'hola', 'bye': 'chau'})
+
     def test_patch_translation_valid(self):
         """
         Test patch endpoint with one updated translation.
@@ -292,6 +361,36 @@ class ProcessTranslationsViewTests(APITestCase):
         self.assertEqual(response.data['message'], 'All translations updated successfully.')
         self.assertEqual(response.data['updated_count'], 2)
 
+    @patch('i18nilize.services.translation_processor.EXISTING_LOOKUP_CHUNK_SIZE', 2)
+    def test_lookup_existing_translations_in_chunks(self):
+        """
+        Tests that existing translations are looked up a chunk of keys per language at a time.
+        """
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        translations_data = {
+            'translations': [
+                {'language': 'spanish', **{f'word{i}': f'palabra{i}' for i in range(5)}},
+                {'language': 'french', 'word0': 'mot0'},
+            ]
+        }
+        headers = {
+            'HTTP_Token': self.TEST_TOKEN
+        }
+        response = self.client.post(reverse('process-translations'), translations_data, **headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['added_count'], 6)
+
+        requested = {(f'word{i}', None, 'spanish') for i in range(5)} | {('word0', None, 'french'), ('word9', None, 'french')}
+        with self.assertNumQueries(4):
+            existing_translations = fetch_existing_translations(token, requested)
+        self.assertEqual(len(existing_translations), 6)
+        self.assertEqual(existing_translations[('word0', 'french')].translated_word, 'mot0')
+
+        translations_data['translations'][0]['word4'] = 'nueva4'
+        response = self.client.patch(reverse('process-translations'), translations_data, **headers, format='json')
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(get_translations_by_language('spanish', token)['word4'], 'nueva4')
+
     def test_patch_extra_translation(self):
         """
         Tests when user attempts to add a new translation using patch endpoint.
@@ -315,17 +414,45 @@ class ProcessTranslationsViewTests(APITestCase):
         """
         Tests atomic transaction in patch to rollback changes.
         """
-        invalid_translations = [
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        bulk_create_translations(token, [
             ("hello", "hola", "spanish"),
             ("bye", "chau", "spanish"),
-            ("another_word", None, "spanish")
-        ]
-        token = Token.objects.get(value=self.TEST_TOKEN)
-        success, added_count = bulk_update_translations(token, invalid_translations)
+            ("another_word", "otra", "spanish"),
+        ])
+        invalid_translations = list(Translation.objects.filter(token=token).order_by('id'))
+        for translation, translated_word in zip(invalid_translations, ["buenas", "adios", None]):
+            translation.translated_word = translated_word
+
+        success, updated_count, chunk_timings = bulk_update_translations(token, invalid_translations, chunk_size=1)
         self.assertEqual(success, False)
-        self.assertEqual(added_count, 0)
-        translations = Translation.objects.all()
-        self.assertEqual(len(translations), 0)
+        self.assertEqual(updated_count, 0)
+        self.assertEqual(chunk_timings, [])
+        self.assertEqual(get_translations_by_language('spanish', token), {'hello': 'hola', 'bye': 'chau', 'another_word': 'otra'})
+
+    @override_settings(BULK_UPDATE_CHUNK_SIZE=2)
+    def test_patch_translations_in_chunks(self):
+        """
+        Tests that large patches are written in chunks and report each chunk's timing.
+        """
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        bulk_create_translations(token, [(f'word{i}', f'palabra{i}', 'spanish') for i in range(5)])
+        translations_data = {
+            'translations': [
+                {'language': 'spanish', **{f'word{i}': f'nueva{i}' for i in range(5)}},
+            ]
+        }
+        headers = {
+            'HTTP_Token': self.TEST_TOKEN
+        }
+
+        with self.assertNumQueries(10):
+            # token, fetch, savepoint, 3 chunked UPDATEs, version bump and refresh, change log, release
+            response = self.client.patch(reverse('process-translations'), translations_data, **headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['updated_count'], 5)
+        self.assertEqual(len(response.data['chunk_timings_ms']), 3)
+        self.assertEqual(get_translations_by_language('spanish', token), {f'word{i}': f'nueva{i}' for i in range(5)})
 
     def test_get_translations_no_translations_found(self):
         translations_data = {
@@ -383,6 +510,101 @@ class ProcessTranslationsViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, expected_response_data)
 
+class TranslationPageTests(APITestCase):
+
+    def setUp(self):
+        token = Token.objects.create()
+        self.TEST_TOKEN = str(token.value)
+        self.headers = {
+            'Token': self.TEST_TOKEN
+        }
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'spanish',
+                    'home.title': 'inicio',
+                    'home.body': 'cuerpo',
+                    'home.footer': 'pie',
+                    'settings.title': 'ajustes',
+                },
+                {
+                    'language': 'french',
+                    'home.title': 'accueil',
+                    'settings.title': 'paramètres',
+                },
+                {
+                    'language': 'german',
+                    'home.title': 'startseite',
+                }
+            ]
+        }
+        self.client.post(reverse('process-translations'), data=translations_data, headers=self.headers, format='json')
+
+    def get_page(self, query_params):
+        return self.client.get(reverse('process-translations'), headers=self.headers, query_params=query_params)
+
+    def test_multiple_languages_by_key(self):
+        response = self.get_page({'languages': 'spanish,french', 'key': ['home.title', 'settings.title', 'missing']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'translations': {
+                'spanish': {'home.title': 'inicio', 'settings.title': 'ajustes'},
+                'french': {'home.title': 'accueil', 'settings.title': 'paramètres'},
+            },
+            'next_cursor': None,
+        })
+
+    def test_many_keys(self):
+        keys = [f'missing.{index}' for index in range(990)] + ['home.title']
+        response = self.get_page({'languages': 'spanish', 'key': keys})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['translations'], {'spanish': {'home.title': 'inicio'}})
+
+    @patch('i18nilize.services.translation_processor.EXISTING_LOOKUP_CHUNK_SIZE', 2)
+    def test_key_pagination_across_lookup_chunks(self):
+        keys = ['settings.title', 'home.title', 'missing', 'home.footer', 'home.body']
+        response = self.get_page({'languages': 'spanish', 'key': keys, 'limit': 3})
+        self.assertEqual(response.data['translations'], {
+            'spanish': {'home.body': 'cuerpo', 'home.footer': 'pie', 'home.title': 'inicio'},
+        })
+        self.assertEqual(response.data['next_cursor'], 'home.title')
+
+        response = self.get_page({'languages': 'spanish', 'key': keys, 'limit': 3, 'cursor': 'home.title'})
+        self.assertEqual(response.data['translations'], {'spanish': {'settings.title': 'ajustes'}})
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_prefix_pagination(self):
+        pages = []
+        cursor = None
+        while True:
+            query_params = {'languages': 'spanish,german', 'prefix': 'home.', 'limit': 2}
+            if cursor is not None:
+                query_params['cursor'] = cursor
+            response = self.get_page(query_params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data['translations'])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, [
+            {'spanish': {'home.body': 'cuerpo', 'home.footer': 'pie'}, 'german': {}},
+            {'spanish': {'home.title': 'inicio'}, 'german': {'home.title': 'startseite'}},
+        ])
+
+    def test_prefix_is_case_sensitive(self):
+        response = self.get_page({'languages': 'spanish', 'prefix': 'HOME.'})
+        self.assertEqual(response.data['translations'], {'spanish': {}})
+
+    def test_invalid_page_params(self):
+        response = self.get_page({'prefix': 'home.'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'At least one language is required.')
+
+        response = self.get_page({'languages': 'spanish', 'limit': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class TranslationViewTests(APITestCase):
     
 
@@ -1051,6 +1273,889 @@ class PullTranslations(APITestCase):
         response_data = response.json()
         self.assertEqual(response_data, expected_response)
 
+    def test_streaming_pull(self):
+        headers = {
+            'Token': self.TEST_TOKEN
+        }
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'spanish',
+                    'hello': 'hola',
+                    'bye': 'chau',
+                    'quote': '"comillas"',
+                },
+                {
+                    'language': 'french',
+                    'hello': 'bonjour',
+                }
+            ]
+        }
+        expected_response = {
+            'spanish': {
+                'hello': 'hola',
+                'bye': 'chau',
+                'quote': '"comillas"',
+            },
+            'french': {
+                'hello': 'bonjour',
+            }
+        }
+
+        self.client.post(reverse('process-translations'), data=translations_data, headers=headers, format='json')
+
+        response = self.client.get(reverse('pull-translations'), headers=headers, query_params={'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        response_data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(response_data, expected_response)
+
+    def test_streaming_pull_small_chunks(self):
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        bulk_create_translations(token, [(f'word{i}', f'palabra{i}', 'spanish') for i in range(5)])
+
+        chunks = list(stream_all_translations(token, chunk_size=2))
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(json.loads(''.join(chunks)), {'spanish': {f'word{i}': f'palabra{i}' for i in range(5)}})
+
+    def test_streaming_pull_language_created_while_streaming(self):
+        token = Token.objects.get(value=self.TEST_TOKEN)
+        bulk_create_translations(token, [('hello', 'hola', 'spanish')])
+
+        chunks = stream_all_translations(token)
+        first_chunk = next(chunks)
+        bulk_create_translations(token, [('hello', 'hallo', 'german')])
+        body = first_chunk + ''.join(chunks)
+        self.assertEqual(json.loads(body), {'spanish': {'hello': 'hola'}, 'german': {'hello': 'hallo'}})
+
+    def test_streaming_pull_no_translations(self):
+        headers = {
+            'Token': self.TEST_TOKEN
+        }
+        response = self.client.get(reverse('pull-translations'), headers=headers, query_params={'stream': 'true'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), {})
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        token = Token.objects.create()
+        self.TEST_TOKEN = str(token.value)
+        self.headers = {
+            'Token': self.TEST_TOKEN
+        }
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'spanish',
+                    'hello': 'hola',
+                }
+            ]
+        }
+        self.client.post(reverse('process-translations'), data=translations_data, headers=self.headers, format='json')
+
+    def test_pull_not_modified(self):
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(reverse('pull-translations'), headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(
+            reverse('pull-translations'), headers={**self.headers, 'If-None-Match': etag}, query_params={'stream': 'true'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_by_language_not_modified(self):
+        query_params = {
+            'language': 'spanish'
+        }
+        response = self.client.get(reverse('process-translations'), headers=self.headers, query_params=query_params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(
+            reverse('process-translations'), headers={**self.headers, 'If-None-Match': f'W/{etag}'}, query_params=query_params
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_change_etag(self):
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        etags = {response['ETag']}
+
+        writes = [
+            lambda: self.client.post(reverse('translation'), query_params={'language': 'spanish', 'bye': 'chau'}, headers=self.headers),
+            lambda: self.client.patch(reverse('translation'), query_params={'language': 'spanish', 'bye': 'adios'}, headers=self.headers),
+            lambda: self.client.delete(reverse('translation'), query_params={'language': 'spanish', 'bye': 'adios'}, headers=self.headers),
+            lambda: self.client.patch(
+                reverse('process-translations'), {'translations': [{'language': 'spanish', 'hello': 'buenas'}]}, headers=self.headers, format='json'
+            ),
+        ]
+        for write in writes:
+            etag = self.client.get(reverse('pull-translations'), headers=self.headers)['ETag']
+            write()
+            response = self.client.get(reverse('pull-translations'), headers={**self.headers, 'If-None-Match': etag})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etags.add(response['ETag'])
+
+        self.assertEqual(len(etags), len(writes) + 1)
+
+    def test_no_op_write_keeps_etag(self):
+        etag = self.client.get(reverse('pull-translations'), headers=self.headers)['ETag']
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'spanish',
+                    'hello': 'hola',
+                }
+            ]
+        }
+        self.client.post(reverse('process-translations'), data=translations_data, headers=self.headers, format='json')
+
+        response = self.client.get(reverse('pull-translations'), headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TranslationChangesTests(APITestCase):
+
+    def setUp(self):
+        token = Token.objects.create()
+        self.TEST_TOKEN = str(token.value)
+        self.headers = {
+            'Token': self.TEST_TOKEN
+        }
+
+    def get_changes(self, since):
+        return self.client.get(reverse('translation-changes'), headers=self.headers, query_params={'since': since})
+
+    def test_changes_since_revision(self):
+        translations_data = {
+            'translations': [
+                {
+                    'language': 'spanish',
+                    'hello': 'hola',
+                    'bye': 'chau',
+                },
+                {
+                    'language': 'french',
+                    'hello': 'bonjour',
+                }
+            ]
+        }
+        self.client.post(reverse('process-translations'), data=translations_data, headers=self.headers, format='json')
+        revision = int(self.client.get(reverse('pull-translations'), headers=self.headers)['Translations-Revision'])
+
+        self.client.patch(reverse('translation'), query_params={'language': 'spanish', 'hello': 'buenas'}, headers=self.headers)
+        self.client.delete(reverse('translation'), query_params={'language': 'spanish', 'bye': 'chau'}, headers=self.headers)
+        self.client.post(reverse('translation'), query_params={'language': 'german', 'hello': 'hallo'}, headers=self.headers)
+
+        response = self.get_changes(revision)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['revision'], revision + 3)
+        self.assertEqual(response.data['changes'], {
+            'spanish': {'reset': False, 'updated': {'hello': 'buenas'}, 'deleted': ['bye']},
+            'german': {'reset': False, 'updated': {'hello': 'hallo'}, 'deleted': []},
+        })
+
+        response = self.get_changes(0)
+        self.assertEqual(response.data['changes'], {
+            'spanish': {'reset': False, 'updated': {'hello': 'buenas'}, 'deleted': ['bye']},
+            'french': {'reset': False, 'updated': {'hello': 'bonjour'}, 'deleted': []},
+            'german': {'reset': False, 'updated': {'hello': 'hallo'}, 'deleted': []},
+        })
+
+        response = self.get_changes(revision + 3)
+        self.assertEqual(response.data, {'revision': revision + 3, 'changes': {}})
+
+    def test_delete_then_recreate(self):
+        self.client.post(reverse('translation'), query_params={'language': 'spanish', 'hello': 'hola'}, headers=self.headers)
+        self.client.delete(reverse('translation'), query_params={'language': 'spanish', 'hello': 'hola'}, headers=self.headers)
+        self.client.post(reverse('translation'), query_params={'language': 'spanish', 'hello': 'buenas'}, headers=self.headers)
+
+        response = self.get_changes(0)
+        self.assertEqual(response.data['changes'], {
+            'spanish': {'reset': False, 'updated': {'hello': 'buenas'}, 'deleted': []},
+        })
+
+    def test_wiped_languages_are_reset(self):
+        self.client.post(reverse('translation'), query_params={'language': 'spanish', 'hello': 'hola'}, headers=self.headers)
+        revision = Token.objects.get(value=self.TEST_TOKEN).version
+        self.client.delete(reverse('test-token'), headers=self.headers)
+
+        response = self.get_changes(revision)
+        self.assertEqual(response.data['changes'], {
+            'spanish': {'reset': True, 'updated': {}, 'deleted': []},
+        })
+
+    def test_invalid_revision(self):
+        response = self.get_changes('abc')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.get_changes(5)
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+
+class TranslationChangesetTests(APITestCase):
+
+    def setUp(self):
+        self.token = Token.objects.create()
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+        bulk_create_translations(self.token, [
+            ('hello', 'hola', 'spanish'),
+            ('bye', 'chau', 'spanish'),
+            ('hello', 'hallo', 'german'),
+        ])
+
+    def post_changeset(self, changeset):
+        return self.client.post(reverse('translation-changeset'), data=changeset, headers=self.headers, format='json')
+
+    def test_apply_changeset(self):
+        changeset = {
+            'spanish': {
+                'type': 'modified',
+                'created': {'thanks': 'gracias'},
+                'modified': {'hello': 'buenas'},
+                'deleted': {'bye': 'chau'},
+            },
+            'french': {
+                'type': 'created',
+                'created': {'hello': 'bonjour'},
+                'modified': {},
+                'deleted': {},
+            },
+            'german': {
+                'type': 'deleted',
+                'created': {},
+                'modified': {},
+                'deleted': {},
+            },
+        }
+        response = self.post_changeset(changeset)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(response.data['deleted_count'], 2)
+        self.assertEqual(response.data['dropped_languages'], 1)
+
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        self.assertEqual(response.data, {
+            'spanish': {'hello': 'buenas', 'thanks': 'gracias'},
+            'french': {'hello': 'bonjour'},
+        })
+
+        # the whole changeset is a single revision
+        response = self.client.get(reverse('translation-changes'), headers=self.headers, query_params={'since': 1})
+        self.assertEqual(response.data['revision'], 2)
+        self.assertTrue(response.data['changes']['german']['reset'])
+
+    def test_apply_changeset_twice(self):
+        changeset = {
+            'spanish': {'type': 'modified', 'created': {'hello': 'buenas'}, 'modified': {}, 'deleted': {'missing': 'x'}},
+        }
+        self.assertEqual(self.post_changeset(changeset).status_code, status.HTTP_200_OK)
+
+        response = self.post_changeset(changeset)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_count'], 0)
+        self.assertEqual(response.data['updated_count'], 0)
+        self.assertEqual(get_translations_by_language('spanish', self.token), {'hello': 'buenas', 'bye': 'chau'})
+
+    def test_invalid_changeset(self):
+        response = self.post_changeset({'spanish': {'type': 'renamed'}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.post_changeset({'spanish': {'type': 'modified', 'created': {'hello': 1}}})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(get_translations_by_language('spanish', self.token), {'hello': 'hola', 'bye': 'chau'})
+
+
+class TranslationImportTests(APITestCase):
+
+    def setUp(self):
+        self.token = Token.objects.create()
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+        bulk_create_translations(self.token, [('hello', 'hola', 'spanish')])
+
+    def import_lines(self, lines, content_type='application/x-ndjson'):
+        body = '\n'.join(json.dumps(line) if isinstance(line, dict) else line for line in lines)
+        return self.client.post(
+            reverse('translation-import'), data=body.encode('utf-8'), content_type=content_type, headers=self.headers
+        )
+
+    def test_import_chunked_body(self):
+        body = json.dumps({'language': 'spanish', 'hello': 'buenas', 'bye': 'chau'}).encode('utf-8')
+        # a de-chunked upload: no Content-Length, input terminated by the server
+        extra = {'CONTENT_LENGTH': '', 'wsgi.input_terminated': True}
+        response = self.client.generic(
+            'POST', reverse('translation-import'), body, content_type='application/x-ndjson', headers=self.headers, **extra
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_count'], 1)
+        self.assertEqual(response.data['updated_count'], 1)
+
+        # without the server's guarantee the body can't be read safely
+        response = self.client.generic(
+            'POST', reverse('translation-import'), body, content_type='application/x-ndjson', headers=self.headers,
+            CONTENT_LENGTH=''
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(INGEST_BATCH_SIZE=2)
+    def test_import_in_batches(self):
+        response = self.import_lines([
+            {'language': 'spanish', 'hello': 'buenas', 'bye': 'chau'},
+            '',
+            {'language': 'french', 'hello': 'bonjour', 'bye': 'au revoir'},
+            {'language': 'spanish', 'thanks': 'gracias'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_count'], 4)
+        self.assertEqual(response.data['updated_count'], 1)
+
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        self.assertEqual(response.data, {
+            'spanish': {'hello': 'buenas', 'bye': 'chau', 'thanks': 'gracias'},
+            'french': {'hello': 'bonjour', 'bye': 'au revoir'},
+        })
+
+    @override_settings(INGEST_BATCH_SIZE=1)
+    def test_import_invalid_line_rolls_back(self):
+        response = self.import_lines([
+            {'language': 'spanish', 'hello': 'buenas'},
+            {'language': 'french', 'hello': 'bonjour'},
+            {'hello': 'hallo'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['line'], 3)
+        self.assertEqual(self.client.get(reverse('pull-translations'), headers=self.headers).data, {
+            'spanish': {'hello': 'hola'},
+        })
+
+        response = self.import_lines(['{"language": "spanish",'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Line 1: Invalid JSON.')
+
+    def test_import_requires_ndjson(self):
+        response = self.import_lines([{'language': 'spanish', 'hello': 'buenas'}], content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+@override_settings(INGEST_BATCH_SIZE=2)
+class ImportJobTests(APITestCase):
+
+    def setUp(self):
+        self.token = Token.objects.create()
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+        bulk_create_translations(self.token, [('hello', 'hola', 'spanish'), ('hello', 'hallo', 'german')])
+
+        # run jobs right away instead of on the worker threads
+        executor_patcher = patch('i18nilize.services.import_jobs.get_executor')
+        executor_patcher.start().return_value.submit.side_effect = lambda func, job_id: import_jobs.run_import_job(job_id)
+        self.addCleanup(executor_patcher.stop)
+
+    def get_job(self, job_id):
+        return self.client.get(reverse('import-job', kwargs={'job_id': job_id}), headers=self.headers)
+
+    def test_async_post(self):
+        translations_data = {
+            'translations': [
+                {'language': 'spanish', 'hello': 'hola', 'bye': 'chau'},
+                {'language': 'french', 'hello': 'bonjour'},
+            ]
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('process-translations'), translations_data, headers=self.headers,
+                query_params={'async': 'true'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ImportJob.PENDING)
+        self.assertEqual(response.data['total_count'], 2)
+        self.assertTrue(response['Location'].endswith(reverse('import-job', kwargs={'job_id': response.data['job_id']})))
+
+        response = self.get_job(response.data['job_id'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ImportJob.SUCCEEDED)
+        self.assertEqual(response.data['processed_count'], 2)
+        self.assertEqual(response.data['result']['created_count'], 2)
+        self.assertEqual(response.data['result']['updated_count'], 0)
+
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        self.assertEqual(response.data, {
+            'spanish': {'hello': 'hola', 'bye': 'chau'},
+            'german': {'hello': 'hallo'},
+            'french': {'hello': 'bonjour'},
+        })
+
+    @override_settings(IMPORT_JOB_STALE_SECONDS=60)
+    def test_stale_job_fails(self):
+        changeset = {'spanish': {'type': 'modified', 'created': {'bye': 'chau'}, 'modified': {}, 'deleted': {}}}
+        job = ImportJob.objects.create(token=self.token, changeset=changeset, total_count=1)
+        response = self.get_job(job.id)
+        self.assertEqual(response.data['status'], ImportJob.PENDING)
+
+        # the process queueing the job restarted long ago
+        ImportJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(seconds=61))
+        response = self.get_job(job.id)
+        self.assertEqual(response.data['status'], ImportJob.FAILED)
+        self.assertEqual(response.data['error'], import_jobs.STALE_JOB_ERROR)
+
+        # a failed job isn't run anymore
+        import_jobs.run_import_job(job.id)
+        self.assertEqual(ImportJob.objects.get(id=job.id).status, ImportJob.FAILED)
+        self.assertFalse(Translation.objects.filter(source_key__original_word='bye').exists())
+
+    def test_async_post_rejects_updates(self):
+        translations_data = {'translations': [{'language': 'spanish', 'hello': 'buenas', 'bye': 'chau'}]}
+        response = self.client.post(
+            reverse('process-translations'), translations_data, headers=self.headers,
+            query_params={'async': 'true'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Use a PATCH request to make updates to translations.')
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_async_changeset(self):
+        changeset = {
+            'spanish': {'type': 'modified', 'created': {'bye': 'chau'}, 'modified': {}, 'deleted': {'hello': 'hola'}},
+            'german': {'type': 'deleted', 'created': {}, 'modified': {}, 'deleted': {}},
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('translation-changeset'), changeset, headers=self.headers,
+                query_params={'async': 'true'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        job = ImportJob.objects.get(id=response.data['job_id'])
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertIsNone(job.changeset)
+        self.assertEqual(job.result['dropped_languages'], 1)
+        self.assertEqual(get_translations_by_language('spanish', self.token), {'bye': 'chau'})
+
+    def test_failed_job(self):
+        job = import_jobs.submit_import_job(self.token, {
+            'spanish': {'type': 'modified', 'created': {'a': '1', 'b': '2'}, 'modified': {'c': '3'}, 'deleted': {}},
+        })
+        apply_changeset = import_jobs.tp.apply_changeset
+        with patch('i18nilize.services.translation_processor.apply_changeset') as mock_apply_changeset:
+            mock_apply_changeset.side_effect = [apply_changeset(self.token, {}), Exception('database is locked')]
+            import_jobs.run_import_job(job.id)
+
+        response = self.get_job(job.id)
+        self.assertEqual(response.data['status'], ImportJob.FAILED)
+        self.assertEqual(response.data['processed_count'], 2)
+        self.assertEqual(response.data['error'], 'database is locked')
+        self.assertIsNotNone(ImportJob.objects.get(id=job.id).changeset)
+
+    def test_split_changeset(self):
+        batches = import_jobs.split_changeset({
+            'spanish': {'type': 'modified', 'created': {'a': '1', 'b': '2'}, 'modified': {'c': '3'}, 'deleted': {}},
+            'german': {'type': 'deleted', 'created': {}, 'modified': {}, 'deleted': {}},
+        }, 2)
+        self.assertEqual(batches, [
+            {
+                'german': {'type': 'deleted', 'created': {}, 'modified': {}, 'deleted': {}},
+                'spanish': {'type': 'modified', 'created': {'a': '1', 'b': '2'}, 'modified': {}, 'deleted': {}},
+            },
+            {'spanish': {'type': 'modified', 'created': {}, 'modified': {'c': '3'}, 'deleted': {}}},
+        ])
+
+    def test_job_of_another_project(self):
+        job = ImportJob.objects.create(token=Token.objects.create(), changeset={})
+        self.assertEqual(self.get_job(job.id).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkDeleteTests(APITestCase):
+
+    def setUp(self):
+        self.token = Token.objects.create()
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+        bulk_create_translations(self.token, [
+            ('hello', 'hola', 'spanish'),
+            ('bye', 'chau', 'spanish'),
+            ('thanks', 'gracias', 'spanish'),
+            ('hello', 'hallo', 'german'),
+            ('bye', 'tschüss', 'german'),
+            ('hello', 'bonjour', 'french'),
+        ])
+
+    def bulk_delete(self, data):
+        return self.client.delete(reverse('process-translations'), data=data, headers=self.headers, format='json')
+
+    @override_settings(BULK_UPDATE_CHUNK_SIZE=1)
+    def test_delete_keys_and_languages(self):
+        response = self.bulk_delete({
+            'keys': [['spanish', 'hello'], ['SPANISH', 'bye'], ['french', 'missing'], ['italian', 'hello']],
+            'languages': ['german'],
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted_count'], 4)
+
+        response = self.client.get(reverse('pull-translations'), headers=self.headers)
+        self.assertEqual(response.data, {'spanish': {'thanks': 'gracias'}, 'french': {'hello': 'bonjour'}})
+
+        response = self.client.get(reverse('translation-changes'), headers=self.headers, query_params={'since': 1})
+        self.assertEqual(response.data['changes'], {
+            'spanish': {'reset': False, 'updated': {}, 'deleted': ['hello', 'bye']},
+            'german': {'reset': True, 'updated': {}, 'deleted': []},
+        })
+
+    def test_delete_invalid_body(self):
+        self.assertEqual(self.bulk_delete({}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.bulk_delete({'keys': [['spanish']]}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.bulk_delete({'languages': 'spanish'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Translation.objects.filter(token=self.token).count(), 6)
+
+    def test_delete_all_translations(self):
+        with self.assertNumQueries(8):
+            # token, savepoint, delete, version bump and refresh, languages, change log, release
+            response = self.client.delete(reverse('test-token'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Translation.objects.filter(token=self.token).count(), 0)
+
+
+class TranslationTableFormatTests(APITestCase):
+
+    def setUp(self):
+        token = Token.objects.create()
+        self.TEST_TOKEN = str(token.value)
+        self.catalog = {
+            'spanish': {
+                'hello': 'hola',
+                'bye': 'chau',
+                'emoji': 'adiós 👋',
+            },
+            'french': {
+                'hello': 'bonjour',
+                'bye': 'chau',
+            }
+        }
+
+    def test_round_trip(self):
+        for compress in (False, True):
+            data = wire_format.encode_catalog(self.catalog, compress=compress)
+            self.assertEqual(wire_format.decode_catalog(data), self.catalog)
+        self.assertEqual(wire_format.decode_catalog(wire_format.encode_catalog({})), {})
+
+    def test_malformed_table(self):
+        data = wire_format.encode_catalog(self.catalog, compress=False)
+        for malformed in (b'', b'nope' + data[4:], data[:-3]):
+            with self.assertRaises(wire_format.WireFormatError):
+                wire_format.decode_catalog(malformed)
+
+    def test_post_and_pull_table(self):
+        response = self.client.post(
+            reverse('process-translations'),
+            data=wire_format.encode_catalog(self.catalog),
+            content_type=wire_format.MEDIA_TYPE,
+            headers={'Token': self.TEST_TOKEN}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['added_count'], 5)
+
+        response = self.client.get(
+            reverse('pull-translations'),
+            headers={'Token': self.TEST_TOKEN, 'Accept': wire_format.MEDIA_TYPE},
+            query_params={'stream': 'true'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], wire_format.MEDIA_TYPE)
+        self.assertIn('ETag', response)
+        self.assertEqual(wire_format.decode_catalog(response.content), self.catalog)
+
+    def test_pull_table_error_falls_back_to_json(self):
+        response = self.client.get(
+            reverse('pull-translations'),
+            headers={'Token': 'c84234c3-b507-4ed0-a6eb-8b10116cdef1', 'Accept': wire_format.MEDIA_TYPE}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), {'error': 'Missing valid token.'})
+
+    def test_trailing_data(self):
+        for compress in (False, True):
+            data = wire_format.encode_catalog(self.catalog, compress=compress)
+            with self.assertRaises(wire_format.WireFormatError):
+                wire_format.decode_catalog(data + b'\x00')
+
+    def test_decompression_limit(self):
+        catalog = {'spanish': {'hello': 'a' * 100000}}
+        data = wire_format.encode_catalog(catalog, compress=True)
+        self.assertLess(len(data), 1000)
+        with self.assertRaises(wire_format.WireFormatError):
+            wire_format.decode_catalog(data, max_size=50000)
+        with self.assertRaises(wire_format.WireFormatError):
+            wire_format.decode_catalog(wire_format.encode_catalog(catalog, compress=False), max_size=50000)
+        self.assertEqual(wire_format.decode_catalog(data, max_size=200000), catalog)
+
+    @override_settings(TRANSLATION_TABLE_MAX_SIZE=50000)
+    def test_post_table_over_limit(self):
+        catalog = {'spanish': {f'key_{index}': f'{index} ' + 'a' * 1000 for index in range(100)}}
+        for compress in (False, True):
+            response = self.client.post(
+                reverse('process-translations'),
+                data=wire_format.encode_catalog(catalog, compress=compress),
+                content_type=wire_format.MEDIA_TYPE,
+                headers={'Token': self.TEST_TOKEN}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Translation.objects.exists())
+
+    def test_post_malformed_table(self):
+        response = self.client.post(
+            reverse('process-translations'),
+            data=b'I18T garbage',
+            content_type=wire_format.MEDIA_TYPE,
+            headers={'Token': self.TEST_TOKEN}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReplicaRoutingTests(APITestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.middleware = ReplicaRoutingMiddleware(self.route_read)
+        self.factory = APIRequestFactory()
+        cache.clear()
+
+    def route_read(self, request):
+        return HttpResponse(self.router.db_for_read(Translation))
+
+    def read(self, request, middleware=None):
+        return (middleware or self.middleware)(request).content.decode()
+
+    @override_settings(REPLICA_DATABASES=['replica_0', 'replica_1'])
+    def test_reads_use_replicas_only_when_allowed(self):
+        self.assertEqual(self.router.db_for_read(Translation), 'default')
+        with use_replica():
+            self.assertIn(self.router.db_for_read(Translation), ['replica_0', 'replica_1'])
+            self.assertEqual(self.router.db_for_write(Translation), 'default')
+            # the rest of the request reads its own writes
+            self.assertEqual(self.router.db_for_read(Translation), 'default')
+        self.assertEqual(self.router.db_for_read(Translation), 'default')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Translation), 'default')
+
+    @override_settings(REPLICA_DATABASES=['replica_0'], READ_YOUR_WRITES_SECONDS=60)
+    def test_middleware_read_your_writes(self):
+        token = 'c84234c3-b507-4ed0-a6eb-8b10116cdef1'
+        other_token = 'a18fcf6e-a886-42f1-b476-43681cc45393'
+
+        self.assertEqual(self.read(self.factory.get('/', HTTP_TOKEN=token)), 'replica_0')
+        self.assertEqual(self.read(self.factory.post('/', HTTP_TOKEN=token)), 'default')
+
+        # reads stay on the primary after a write, other clients are unaffected
+        self.assertEqual(self.read(self.factory.get('/', HTTP_TOKEN=token)), 'default')
+        self.assertEqual(self.read(self.factory.get('/', HTTP_TOKEN=other_token)), 'replica_0')
+
+    @override_settings(REPLICA_DATABASES=['replica_0'])
+    def test_middleware_streaming_response(self):
+        def stream(request):
+            return StreamingHttpResponse(self.router.db_for_read(Translation) for _ in range(2))
+
+        response = ReplicaRoutingMiddleware(stream)(self.factory.get('/'))
+        # the content is read after the middleware returned
+        self.assertEqual(self.router.db_for_read(Translation), 'default')
+        self.assertEqual(b''.join(response.streaming_content), b'replica_0replica_0')
+        self.assertEqual(self.router.db_for_read(Translation), 'default')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_middleware_without_replicas_skips_cache(self):
+        token = 'c84234c3-b507-4ed0-a6eb-8b10116cdef1'
+        with patch('core.middleware.cache') as mock_cache:
+            self.assertEqual(self.read(self.factory.post('/', HTTP_TOKEN=token)), 'default')
+            self.assertEqual(self.read(self.factory.get('/', HTTP_TOKEN=token)), 'default')
+        self.assertEqual(mock_cache.mock_calls, [])
+
+    def test_shared_cache(self):
+        # read-your-writes markers must be visible to every worker process
+        self.assertNotIsInstance(caches['default'], LocMemCache)
+        # tests run against their own cache, not the one of the host
+        self.assertIn('i18nilize-test-cache-', settings.CACHES['default']['LOCATION'])
+
+
+class TokenCacheTests(APITestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.token = Token.objects.create()
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+
+    def pull(self, headers=None):
+        return self.client.get(reverse('pull-translations'), headers=headers or self.headers)
+
+    def test_cached_token(self):
+        self.pull()
+        with self.assertNumQueries(2):
+            # token version for the ETag, translations
+            response = self.pull()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+        self.assertEqual(token_cache.stats()['misses'], 1)
+        self.assertEqual(token_cache.stats()['hit_rate'], 0.5)
+
+    def test_cached_token_reads_fresh_version(self):
+        etag = self.pull()['ETag']
+        bulk_create_translations(self.token, [('hello', 'hola', 'spanish')])
+
+        response = self.pull(headers={**self.headers, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data, {'spanish': {'hello': 'hola'}})
+
+    def test_unknown_token_is_cached(self):
+        headers = {'Token': 'c84234c3-b507-4ed0-a6eb-8b10116cdef1'}
+        self.assertEqual(self.pull(headers).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pull(headers).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(token_cache.stats()['negative_hits'], 1)
+
+    def test_deleted_token_is_evicted(self):
+        self.pull()
+        self.token.delete()
+        self.assertEqual(self.pull().status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_token_deleted_by_other_process(self):
+        self.pull()
+        # the post_delete signal only evicts the token in the deleting process
+        with patch.object(token_cache, 'invalidate'):
+            self.token.delete()
+        self.assertEqual(self.pull().status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    @override_settings(TOKEN_CACHE_SIZE=1)
+    def test_least_recently_used_token_is_evicted(self):
+        other_token = Token.objects.create()
+        self.pull()
+        self.pull(headers={'Token': str(other_token.value)})
+        self.pull()
+        self.assertEqual(token_cache.stats()['misses'], 3)
+        self.assertEqual(token_cache.stats()['size'], 1)
+
+    @override_settings(TOKEN_CACHE_TTL=0)
+    def test_expired_token(self):
+        self.pull()
+        self.pull()
+        self.assertEqual(token_cache.stats()['misses'], 2)
+
+
+class SqliteProfileTests(APITestCase):
+
+    def get_pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4096, 'busy_timeout': 1234})
+    def test_pragmas_applied_to_connection(self):
+        configure_connection(sender=None, connection=connection)
+        self.assertEqual(self.get_pragma('cache_size'), -4096)
+        self.assertEqual(self.get_pragma('busy_timeout'), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_no_profile(self):
+        cache_size = self.get_pragma('cache_size')
+        configure_connection(sender=None, connection=connection)
+        self.assertEqual(self.get_pragma('cache_size'), cache_size)
+
+
+class ReadTokenTests(APITestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.token = Token.objects.create()
+        bulk_create_translations(self.token, [('hello', 'hola', 'spanish')])
+        self.headers = {
+            'Token': str(self.token.value)
+        }
+
+    def get_read_token(self, data=None):
+        response = self.client.post(reverse('issue-read-token'), data or {}, headers=self.headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['read_token']
+
+    def test_pull_with_read_token(self):
+        headers = {'Read-Token': self.get_read_token()}
+        token_cache.clear()
+        with self.assertNumQueries(2):
+            # project and its version for the ETag, translations
+            response = self.client.get(reverse('pull-translations'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'spanish': {'hello': 'hola'}})
+        self.assertEqual(token_cache.stats()['misses'], 0)
+
+    def test_read_views_accept_read_token(self):
+        headers = {'Read-Token': self.get_read_token()}
+        response = self.client.get(reverse('translation'), {'original_word': 'hello', 'language': 'spanish'}, headers=headers)
+        self.assertEqual(response.data['translated_word'], 'hola')
+        response = self.client.get(reverse('process-translations'), {'language': 'spanish'}, headers=headers)
+        self.assertEqual(response.data, {'hello': 'hola'})
+        response = self.client.get(reverse('translation-changes'), {'since': 0}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_read_token_cannot_write(self):
+        headers = {'Read-Token': self.get_read_token()}
+        response = self.client.post(reverse('translation') + '?language=french&hello=bonjour', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Translation.objects.filter(language__code='french').exists())
+
+    def test_read_token_does_not_contain_project_token(self):
+        read_token = self.get_read_token()
+        payload = signing.b64_decode(read_token.split(':')[0].encode())
+        self.assertNotIn(str(self.token.value), read_token)
+        self.assertNotIn(str(self.token.value).encode(), payload)
+        self.assertNotIn(self.token.value.hex.encode(), payload)
+
+    def test_tampered_read_token(self):
+        read_token = self.get_read_token()
+        other_token = Token.objects.create()
+        other_read_token, _ = issue_read_token(other_token)
+        tampered = other_read_token.split(':')[0] + ':' + read_token.split(':', 1)[1]
+        for value in (tampered, read_token[:-1], 'not-a-read-token'):
+            response = self.client.get(reverse('pull-translations'), headers={'Read-Token': value})
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_read_token_of_deleted_project(self):
+        headers = {'Read-Token': self.get_read_token()}
+        self.token.delete()
+        response = self.client.get(reverse('pull-translations'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('process-translations'), {'language': 'spanish'}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expired_read_token(self):
+        read_token = self.get_read_token({'expires_in': 60})
+        with patch('i18nilize.read_tokens.time.time', return_value=time.time() + 61):
+            response = self.client.get(reverse('pull-translations'), headers={'Read-Token': read_token})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(READ_TOKEN_SECONDS=60)
+    def test_invalid_expiry(self):
+        for expires_in in (0, 61, 'soon'):
+            response = self.client.post(reverse('issue-read-token'), {'expires_in': expires_in}, headers=self.headers, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_issue_requires_project_token(self):
+        response = self.client.post(reverse('issue-read-token'), headers={'Read-Token': self.get_read_token()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class WriterPermissionViewTests(APITestCase):
     def setUp(self):
@@ -1086,6 +2191,40 @@ class WriterPermissionViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["editor_token"], str(self.TEST_MS_TOKEN_1a))
 
+    def test_grant_invalidates_other_workers(self):
+        # a cache client of another worker process, reading the same shared cache
+        other_worker_cache = FileBasedCache(settings.CACHES['default']['LOCATION'], {})
+        project_key = f'i18nilize:project-writer:{self.TEST_PROJECT_TOKEN_1}'
+        headers = {'Microservice-Token': self.TEST_MS_TOKEN_1a}
+
+        self.client.get(reverse('writer-permission'), headers=headers, format='json')
+        self.assertIn(project_key, other_worker_cache)
+
+        self.client.post(reverse('writer-permission'), headers=headers, format='json')
+        self.assertNotIn(project_key, other_worker_cache)
+
+    def test_grant_between_lookup_and_cache_write(self):
+        headers = {'Microservice-Token': self.TEST_MS_TOKEN_1a}
+        resolve_microservice_token = writer_permissions.resolve_microservice_token
+        granted = []
+
+        def resolve_then_grant(value):
+            microservice_token = resolve_microservice_token(value)
+            if not granted:
+                # the grant clears the cache before the lookup writes to it
+                granted.append(True)
+                self.client.post(reverse('writer-permission'), headers=headers, format='json')
+            return microservice_token
+
+        with patch('i18nilize.services.writer_permissions.resolve_microservice_token', side_effect=resolve_then_grant):
+            response = self.client.get(reverse('writer-permission'), headers=headers, format='json')
+        # read before the grant
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse('writer-permission'), headers=headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['editor_token'], self.TEST_MS_TOKEN_1a)
+
     def test_post_when_already_have_permissions(self):
         """Test POST when the microservice already has writer permissions"""
         headers = {
@@ -1203,3 +2342,89 @@ class WriterPermissionViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         expected_error_message = "Remove failed, no existing editor token found for project"
         self.assertEqual(response.data["error"], expected_error_message)
+
+    def test_get_is_cached(self):
+        headers_1a = {
+            'Microservice-Token': self.TEST_MS_TOKEN_1a
+        }
+        headers_1b = {
+            'Microservice-Token': self.TEST_MS_TOKEN_1b
+        }
+        response = self.client.post(reverse('writer-permission'), headers=headers_1a, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('writer-permission'), headers=headers_1b, format='json')
+        self.assertEqual(response.data, {
+            'project_token': self.TEST_PROJECT_TOKEN_1,
+            'editor_token': self.TEST_MS_TOKEN_1a,
+        })
+        with self.assertNumQueries(0):
+            self.client.get(reverse('writer-permission'), headers=headers_1b, format='json')
+
+        # relinquishing clears the project's cached writer for every microservice
+        response = self.client.delete(reverse('writer-permission'), headers=headers_1a, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('writer-permission'), headers=headers_1b, format='json')
+        self.assertIsNone(response.data['editor_token'])
+
+    def test_moving_microservice_clears_cache(self):
+        headers = {
+            'Microservice-Token': self.TEST_MS_TOKEN_1a
+        }
+        self.client.post(reverse('writer-permission'), headers=headers, format='json')
+        self.client.get(reverse('writer-permission'), headers=headers, format='json')
+
+        response = self.client.patch(
+            reverse('create-ms-token', kwargs={'value': self.TEST_MS_TOKEN_1a}),
+            {'project_token': self.TEST_PROJECT_TOKEN_2}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('writer-permission'), headers=headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writer_lease(self):
+        headers = {
+            'Microservice-Token': self.TEST_MS_TOKEN_1a
+        }
+        # no lease without writer permissions
+        response = self.client.post(reverse('writer-lease'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.post(reverse('writer-permission'), headers=headers, format='json')
+        response = self.client.post(reverse('writer-lease'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lease_id = response.data['lease_id']
+
+        changeset = {'spanish': {'type': 'created', 'created': {'hello': 'hola'}, 'modified': {}, 'deleted': {}}}
+        write_headers = {'Token': self.TEST_PROJECT_TOKEN_1, 'Writer-Lease': lease_id}
+        response = self.client.post(reverse('translation-changeset'), changeset, headers=write_headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # the lease only works for its own project
+        other_headers = {'Token': self.TEST_PROJECT_TOKEN_2, 'Writer-Lease': lease_id}
+        response = self.client.post(reverse('translation-changeset'), changeset, headers=other_headers, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # relinquishing permissions revokes the lease
+        self.client.delete(reverse('writer-permission'), headers=headers, format='json')
+        response = self.client.patch(
+            reverse('translation'), query_params={'language': 'spanish', 'hello': 'buenas'}, headers=write_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['error'], 'Writer lease is invalid or expired.')
+
+    @override_settings(WRITER_LEASE_SECONDS=-1)
+    def test_expired_writer_lease(self):
+        headers = {
+            'Microservice-Token': self.TEST_MS_TOKEN_1a
+        }
+        self.client.post(reverse('writer-permission'), headers=headers, format='json')
+        lease_id = self.client.post(reverse('writer-lease'), headers=headers).data['lease_id']
+
+        write_headers = {'Token': self.TEST_PROJECT_TOKEN_1, 'Writer-Lease': lease_id}
+        response = self.client.post(
+            reverse('translation'), query_params={'language': 'spanish', 'hello': 'hola'}, headers=write_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Token
+
+"""
+In-process cache of token lookups done by require_valid_token.
+
+Entries expire after TOKEN_CACHE_TTL seconds and the least recently used ones
+are evicted past TOKEN_CACHE_SIZE entries. Unknown tokens are cached as well,
+for TOKEN_CACHE_NEGATIVE_TTL seconds, so invalid tokens don't cost a query on
+every request. Deleting a token evicts it from the cache of this process.
+Other processes notice once their entry expires, or earlier when a request
+loads one of the deleted token's deferred fields: require_valid_token then
+evicts it and answers 404.
+
+Cached tokens are returned with their version deferred, so ETags and revisions
+are always read from the database.
+"""
+
+DEFAULT_SIZE = 1024
+DEFAULT_TTL = 60
+DEFAULT_NEGATIVE_TTL = 5
+
+# Fields kept in the cache, the rest are loaded on access
+CACHED_FIELDS = ('id', 'value', 'created_at')
+
+_MISSING = object()
+
+
+class TokenCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, value):
+        """
+        Returns the Token with the given value, or None if it doesn't exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(value, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(value)
+                if entry[1] is None:
+                    self.negative_hits += 1
+                    return None
+                self.hits += 1
+                return Token.from_db(None, CACHED_FIELDS, entry[1])
+            self.misses += 1
+
+        token = Token.objects.filter(value=value).first()
+        if token is None:
+            self._set(value, None, getattr(settings, 'TOKEN_CACHE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL))
+        else:
+            fields = tuple(getattr(token, field) for field in CACHED_FIELDS)
+            self._set(value, fields, getattr(settings, 'TOKEN_CACHE_TTL', DEFAULT_TTL))
+        return token
+
+    def _set(self, value, fields, ttl):
+        with self._lock:
+            self._entries[value] = (time.monotonic() + ttl, fields)
+            self._entries.move_to_end(value)
+            while len(self._entries) > getattr(settings, 'TOKEN_CACHE_SIZE', DEFAULT_SIZE):
+                self._entries.popitem(last=False)
+
+    def invalidate(self, value):
+        with self._lock:
+            self._entries.pop(value, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.negative_hits = self.misses = 0
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the hit rate since the last clear.
+        """
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache()
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(str(instance.value))
+
+
+@receiver(post_save, sender=Token)
+def evict_created_token(sender, instance, created, **kwargs):
+    # drops a cached "unknown token" entry
+    if created:
+        token_cache.invalidate(str(instance.value))
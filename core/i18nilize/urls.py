@@ -1,14 +1,20 @@
 from django.urls import path
-from .views import TokenView, MSTokenView, TranslationView, ProcessTranslationsView, PullTranslations, TestTokenView, WriterPermissionView
+from .views import TokenView, MSTokenView, TranslationView, ProcessTranslationsView, PullTranslations, TestTokenView, TranslationChangesView, TranslationChangesetView, TranslationImportView, ImportJobView, ReadTokenView, WriterLeaseView, WriterPermissionView
 
 urlpatterns = [
     path('token/', TokenView.as_view(), name='create-token'),
     path('ms-token/<str:value>/', MSTokenView.as_view(), name='create-ms-token'),
     path('token/<str:value>/', TokenView.as_view(), name='read-token'),
+    path('read-token/', ReadTokenView.as_view(), name='issue-read-token'),
     path('test/', TestTokenView.as_view(), name='test-token'),
     path('translation', TranslationView.as_view(), name='translation'),
     path('translations', ProcessTranslationsView.as_view(), name='process-translations'),
     path('translations/pull/', PullTranslations.as_view(), name='pull-translations'),
     path('translations/push/', TranslationView.as_view(), name='push-translations'),
+    path('translations/import/', TranslationImportView.as_view(), name='translation-import'),
+    path('translations/changeset/', TranslationChangesetView.as_view(), name='translation-changeset'),
+    path('translations/jobs/<uuid:job_id>/', ImportJobView.as_view(), name='import-job'),
+    path('translations/changes/', TranslationChangesView.as_view(), name='translation-changes'),
     path('writer-permission/', WriterPermissionView.as_view(), name='writer-permission'),
+    path('writer-permission/lease/', WriterLeaseView.as_view(), name='writer-lease'),
 ]
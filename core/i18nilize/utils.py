@@ -3,6 +3,9 @@ from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
 from .models import Token
+from .read_tokens import verify_read_token
+from .services import writer_permissions
+from .token_cache import token_cache
 
 def is_valid_uuid(uuid_string, version=4):
     """
@@ -14,12 +17,35 @@ def is_valid_uuid(uuid_string, version=4):
     except ValueError:
         return False
 
+def get_etag(token):
+    """
+    Returns the ETag of a token's translations, which changes on every write
+    """
+    return f'"{token.id}-{token.version}"'
+
+def etag_matches(request, etag):
+    """
+    Checks whether the request's If-None-Match header matches the given ETag
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
+
 def require_valid_token(func):
     """
-    Validates Token, wraps around CRUD methods in views.py
+    Validates Token, wraps around CRUD methods in views.py. Tokens are looked up
+    through the in-process token cache.
     """
     @wraps(func)
-    def wrapper(self, request):
+    def wrapper(self, request, *args, **kwargs):
         token_value = request.headers.get('Token')
         if not token_value:
             return Response({'error': 'Token is required.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -27,12 +53,63 @@ def require_valid_token(func):
         if not is_valid_uuid(token_value):
             return Response({'error': 'Invalid token.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        token_value = str(uuid.UUID(token_value))
+        token = token_cache.get(token_value)
+        if token is None:
+            return Response({'error': 'Missing valid token.'}, status=status.HTTP_404_NOT_FOUND)
+        request.token = token
+
         try:
-            token = Token.objects.get(value=token_value)
-            request.token = token
+            return func(self, request, *args, **kwargs)
         except Token.DoesNotExist:
+            # deleted by another process while cached here, found out when
+            # loading one of its deferred fields
+            token_cache.invalidate(token_value)
             return Response({'error': 'Missing valid token.'}, status=status.HTTP_404_NOT_FOUND)
 
-        return func(self, request)
+    return wrapper
+
+def require_read_token(func):
+    """
+    Like require_valid_token, but also accepts a signed read token in the
+    Read-Token header. The signature is checked without a database lookup, the
+    project is then loaded with its version only. For the read-only views.
+    """
+    token_required = require_valid_token(func)
+
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        read_token = request.headers.get('Read-Token')
+        if read_token is None:
+            return token_required(self, request, *args, **kwargs)
+
+        token = verify_read_token(read_token)
+        if token is None:
+            return Response({'error': 'Read token is invalid or expired.'}, status=status.HTTP_403_FORBIDDEN)
+
+        # the project may have been deleted since the read token was issued
+        token = Token.objects.filter(id=token.id).only('id', 'version').first()
+        if token is None:
+            return Response({'error': 'Missing valid token.'}, status=status.HTTP_404_NOT_FOUND)
+        request.token = token
+
+        return func(self, request, *args, **kwargs)
+
+    return wrapper
+
+def check_writer_lease(func):
+    """
+    Rejects writes sending a Writer-Lease header that isn't the current, unexpired
+    lease of the project's writer. Must be applied after require_valid_token.
+    Writes without the header are let through.
+    """
+    @wraps(func)
+    def wrapper(self, request, *args, **kwargs):
+        lease_id = request.headers.get('Writer-Lease')
+        if lease_id is not None:
+            if not is_valid_uuid(lease_id) or not writer_permissions.is_valid_lease(request.token, lease_id):
+                return Response({'error': 'Writer lease is invalid or expired.'}, status=status.HTTP_403_FORBIDDEN)
+
+        return func(self, request, *args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
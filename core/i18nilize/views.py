@@ -1,11 +1,58 @@
 # from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import MicroserviceToken, Token, Translation, Writer
+from rest_framework.settings import api_settings
+from .models import ImportJob, MicroserviceToken, Token, Translation, Writer
 from i18nilize.utils import is_valid_uuid
-from i18nilize.utils import require_valid_token
+from i18nilize.utils import check_writer_lease, require_read_token, require_valid_token
+from i18nilize.utils import etag_matches, get_etag
+from i18nilize.services import import_jobs, writer_permissions
 from i18nilize.services import translation_processor as tp
+from i18nilize.parsers import TranslationTableParser
+from i18nilize.read_tokens import issue_read_token, max_seconds
+from i18nilize.renderers import TranslationTableRenderer
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def is_async(request):
+    return request.query_params.get('async', '').lower() in ('1', 'true')
+
+
+def get_upload_stream(request):
+    """
+    Returns the stream of the request body, or None without one. DRF and
+    Django only read bodies with a Content-Length, a chunked upload has none
+    but is complete once the WSGI server marks its input as terminated.
+    """
+    if request.stream is not None:
+        return request.stream
+    meta = request._request.META
+    if meta.get('wsgi.input_terminated') and not meta.get('CONTENT_LENGTH'):
+        return meta['wsgi.input']
+    return None
+
+
+def import_job_data(job):
+    return {
+        'job_id': str(job.id),
+        'status': job.status,
+        'total_count': job.total_count,
+        'processed_count': job.processed_count,
+        'result': job.result,
+        'error': job.error,
+    }
+
+
+def import_job_accepted(request, job):
+    """
+    Response for a submitted import job, pointing to its status.
+    """
+    status_url = request.build_absolute_uri(reverse('import-job', kwargs={'job_id': job.id}))
+    return Response(import_job_data(job), status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
 
 
 class TokenView(APIView):
@@ -94,6 +141,7 @@ class MSTokenView(APIView):
 
         ms_token.project_token = new_project_token
         ms_token.save()
+        writer_permissions.invalidate_microservice_token(value)
 
         data = {
             'id': ms_token.id,
@@ -112,7 +160,7 @@ class MSTokenView(APIView):
             return Response({'error': 'Token value is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            token = MicroserviceToken.objects.get(value=value)
+            token = MicroserviceToken.objects.select_related('project_token').get(value=value)
             data = {
                 'id': token.id,
                 'value': str(token.value),
@@ -131,9 +179,7 @@ class TestTokenView(APIView):
     def delete(self, request):
         token = request.token
         try:
-            translations = Translation.objects.filter(token=token)
-            for t in translations:
-                t.delete()
+            tp.delete_all_translations(token)
         except Exception as e:
             print(e)
             return Response({'error': 'Could not delete all translations for given token.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -141,13 +187,21 @@ class TestTokenView(APIView):
 
 class ProcessTranslationsView(APIView):
     """
-    Endpoint to add or update translations.
+    Endpoint to add, update, read or delete translations.
+
+    POST and PATCH bodies can also be sent in the binary translation table format.
     """
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + [TranslationTableParser]
 
     @require_valid_token
+    @check_writer_lease
     def post(self, request):
         """
-        Adds new translations to database
+        Adds new translations to database.
+
+        With async=true the new translations are created by a background job
+        instead, see ImportJobView for its progress. Updates are rejected like
+        without it.
         """
         token = request.token
 
@@ -168,6 +222,10 @@ class ProcessTranslationsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if is_async(request):
+            changeset = tp.translations_to_changeset(new_translations)
+            return import_job_accepted(request, import_jobs.submit_import_job(token, changeset))
+
         success, added_count = tp.bulk_create_translations(token, new_translations)
         if not success:
             return Response(
@@ -187,6 +245,7 @@ class ProcessTranslationsView(APIView):
             )
 
     @require_valid_token
+    @check_writer_lease
     def patch(self, request):
         """
         Update existing translations in the database. Fails if new translations are being added.
@@ -211,7 +270,7 @@ class ProcessTranslationsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        success, updated_count = tp.bulk_update_translations(token, updated_translations)
+        success, updated_count, chunk_timings = tp.bulk_update_translations(token, updated_translations)
         if not success:
             return Response(
                 {'error': 'An error occurred while updating translations.'},
@@ -225,18 +284,71 @@ class ProcessTranslationsView(APIView):
             )
         else:
             return Response(
-                {'message': 'All translations updated successfully.', 'updated_count': updated_count},
+                {
+                    'message': 'All translations updated successfully.',
+                    'updated_count': updated_count,
+                    'chunk_timings_ms': chunk_timings,
+                },
                 status=status.HTTP_201_CREATED
             )
 
     @require_valid_token
+    @check_writer_lease
+    def delete(self, request):
+        """
+        Delete translations in bulk. The body lists [language, key] pairs and/or
+        whole languages to delete: {'keys': [[language, key]], 'languages': [language]}
+        """
+        token = request.token
+
+        keys = request.data.get('keys', [])
+        languages = request.data.get('languages', [])
+        if not keys and not languages:
+            return Response({'error': 'Keys or languages to delete are required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        valid_keys = isinstance(keys, list) and all(
+            isinstance(key, list) and len(key) == 2 and all(isinstance(value, str) for value in key)
+            for key in keys
+        )
+        valid_languages = isinstance(languages, list) and all(isinstance(language, str) for language in languages)
+        if not valid_keys or not valid_languages:
+            return Response({'error': 'Keys or languages are improperly formatted.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            deleted_count = tp.bulk_delete_translations(
+                token, keys=[(key, language) for language, key in keys], languages=languages
+            )
+        except Exception as e:
+            print(e)
+            return Response(
+                {'error': 'An error occurred while deleting translations.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response(
+            {'message': 'Translations deleted successfully.', 'deleted_count': deleted_count},
+            status=status.HTTP_200_OK
+        )
+
+    @require_read_token
     def get(self, request):
         """
         Fetch translations for a given language.
+
+        Passing languages (comma separated), key (repeatable), prefix, cursor or
+        limit instead returns a page of translations for several languages:
+        {'translations': {language: {key: value}}, 'next_cursor': key or None}
         """
         token = request.token
         language = request.query_params.get('language')
 
+        etag = get_etag(token)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        if any(param in request.query_params for param in ('languages', 'key', 'prefix', 'cursor', 'limit')):
+            return self.get_page(request, etag)
+
         translations = tp.get_translations_by_language(language, token)
         if not translations:
             return Response(
@@ -244,7 +356,41 @@ class ProcessTranslationsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response(translations, status=status.HTTP_200_OK)
+        return Response(translations, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+    def get_page(self, request, etag):
+        """
+        Fetch a page of translations for several languages, filtered by key.
+        """
+        languages = [
+            language for language in request.query_params.get('languages', '').split(',') if language.strip()
+        ]
+        if request.query_params.get('language'):
+            languages.append(request.query_params.get('language'))
+        if not languages:
+            return Response({'error': 'At least one language is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = request.query_params.get('limit', str(tp.DEFAULT_PAGE_SIZE))
+        if not limit.isdigit() or not 0 < int(limit) <= tp.MAX_PAGE_SIZE:
+            return Response(
+                {'error': f'Limit must be between 1 and {tp.MAX_PAGE_SIZE}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        keys = request.query_params.getlist('key') if 'key' in request.query_params else None
+        translations, next_cursor = tp.get_translations_page(
+            request.token,
+            languages,
+            keys=keys,
+            prefix=request.query_params.get('prefix'),
+            cursor=request.query_params.get('cursor'),
+            limit=int(limit),
+        )
+        return Response(
+            {'translations': translations, 'next_cursor': next_cursor},
+            status=status.HTTP_200_OK,
+            headers={'ETag': etag}
+        )
 
 class TranslationView(APIView):
     """
@@ -265,9 +411,10 @@ class TranslationView(APIView):
         if original_word.isdigit() or translated_word.isdigit():
             return None, None, None, Response({"error": "Translation pair must be in string format!"}, status=status.HTTP_400_BAD_REQUEST)
 
-        return language, original_word, translated_word, None
+        return tp.normalize_language(language), original_word, translated_word, None
 
     @require_valid_token
+    @check_writer_lease
     def post(self, request):
         """
         Create a new single translation.
@@ -284,7 +431,7 @@ class TranslationView(APIView):
         # Check if translation already exists
         try:
             # Try to retrieve an existing translation
-            existing_translation = Translation.objects.get(token=token, original_word=original_word, language=language)
+            existing_translation = Translation.objects.get(token=token, source_key__original_word=original_word, language__code=language)
 
             # Check if the existing translated word matches with the new one
             if existing_translation.translated_word != translated_word:
@@ -294,16 +441,16 @@ class TranslationView(APIView):
 
         # Create the translation if it doesn't already exist
         except Translation.DoesNotExist:
-            translation = Translation.objects.create(token=token, original_word=original_word, translated_word=translated_word, language=language)
+            translation = tp.create_translation(token, original_word, translated_word, language)
             data = {
                 "message": "Translation created successfuly!",
-                "language": translation.language,
-                "original_word": translation.original_word,
+                "language": translation.language.code,
+                "original_word": translation.source_key.original_word,
                 "translated_word": translation.translated_word
             }
             return Response(data, status=status.HTTP_201_CREATED)
 
-    @require_valid_token
+    @require_read_token
     def get(self, request):
         """
         Retrieve a translation by its original word and token
@@ -320,10 +467,12 @@ class TranslationView(APIView):
 
         # return translation if it exists
         try:
-            translation = Translation.objects.get(token=token, original_word=original_word, language=language)
+            translation = Translation.objects.select_related('language', 'source_key').get(
+                token=token, source_key__original_word=original_word, language__code=tp.normalize_language(language)
+            )
             data = {
-                "language": translation.language,
-                "original_word": translation.original_word,
+                "language": translation.language.code,
+                "original_word": translation.source_key.original_word,
                 "translated_word": translation.translated_word
             }
             return Response(data, status=status.HTTP_200_OK)
@@ -332,6 +481,7 @@ class TranslationView(APIView):
             return Response({"error": "Translation not found for given language and word!"}, status=status.HTTP_404_NOT_FOUND)
         
     @require_valid_token
+    @check_writer_lease
     def patch(self, request):
         """
         Update a new single translation.
@@ -348,17 +498,18 @@ class TranslationView(APIView):
         # Check if translation already exists
         try:
             # Try to retrieve an existing translation
-            existing_translation = Translation.objects.get(token=token, original_word=original_word, language=language)
+            existing_translation = Translation.objects.select_related('language', 'source_key').get(
+                token=token, source_key__original_word=original_word, language__code=language
+            )
 
             # Check if the existing translated word matches with the new one
             if existing_translation.translated_word != translated_word:
                 old_translated_word = existing_translation.translated_word
-                existing_translation.translated_word = translated_word
-                existing_translation.save()
+                tp.update_translation(token, existing_translation, translated_word)
                 data = {
                     "message": "Translation updated successfuly!",
-                    "language": existing_translation.language,
-                    "original_word": existing_translation.original_word,
+                    "language": existing_translation.language.code,
+                    "original_word": existing_translation.source_key.original_word,
                     "original_translated_word": old_translated_word,
                     "updated_translated_word": existing_translation.translated_word
                 }
@@ -372,6 +523,7 @@ class TranslationView(APIView):
             return Response({'error': 'Use a POST request to make new translations.'}, status=status.HTTP_400_BAD_REQUEST)
     
     @require_valid_token
+    @check_writer_lease
     def delete(self, request):
         """
         Delete a new single translation.
@@ -387,12 +539,14 @@ class TranslationView(APIView):
 
         # Check if translation exists
         try:
-            translation = Translation.objects.get(token=token, original_word=original_word, translated_word=translated_word, language=language)
-            translation.delete()
+            translation = Translation.objects.select_related('language', 'source_key').get(
+                token=token, source_key__original_word=original_word, translated_word=translated_word, language__code=language
+            )
+            tp.delete_translation(token, translation)
             data = {
                 "message": "Translation deleted successfuly!",
-                "language": translation.language,
-                "original_word": translation.original_word,
+                "language": translation.language.code,
+                "original_word": translation.source_key.original_word,
                 "translated_word": translation.translated_word
             }
             return Response(data, status=status.HTTP_200_OK)
@@ -404,31 +558,214 @@ class TranslationView(APIView):
 class PullTranslations(APIView):
     """
     Pulls all translations for a given token.
+
+    Pass stream=true to stream the translations straight from the database
+    instead of building the whole catalog in memory first. Clients accepting
+    the binary translation table format get it instead of JSON. The table
+    can't be streamed (its string tables come first), so it is always built in
+    memory and stream is ignored for it.
+
+    Responses carry an ETag, send it back in If-None-Match to get a 304 when
+    nothing has changed since. The Translations-Revision header holds the
+    revision to pass to TranslationChangesView for incremental pulls.
     """
-    @require_valid_token
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [TranslationTableRenderer]
+
+    @require_read_token
     def get(self, request):
         token = request.token
 
-        try:
-            translations = Translation.objects.filter(token=token)
+        etag = get_etag(token)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        stream = request.query_params.get('stream', '').lower() in ('1', 'true')
+        if stream and not isinstance(request.accepted_renderer, TranslationTableRenderer):
+            response = StreamingHttpResponse(
+                tp.stream_all_translations(token),
+                content_type='application/json',
+                status=status.HTTP_200_OK
+            )
+            response['ETag'] = etag
+            response['Translations-Revision'] = token.version
+            return response
 
+        try:
             # Consolidate all translations into single dictionary following
             # the format of local translation files to overwrite files easily.
-            response_data = {}
-            for translation in translations:
-                language = translation.language.lower()
-                original_word = translation.original_word
-                translated_word = translation.translated_word
-
-                if language not in response_data:
-                    response_data[language] = {}
-                response_data[language][original_word] = translated_word
+            response_data = tp.get_all_translations(token)
         except Exception as e:
             print(e)
             return Response({"error": "could not fetch translations"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(
+            response_data,
+            status=status.HTTP_200_OK,
+            headers={'ETag': etag, 'Translations-Revision': token.version}
+        )
     
+class TranslationImportView(APIView):
+    """
+    Imports a large upload of translations as NDJSON (application/x-ndjson),
+    one {'language': ..., key: value} object per line. The body is read and
+    written in batches instead of being parsed in one go, and can be sent
+    chunked when the WSGI server supports it (wsgi.input_terminated).
+    """
+    @require_valid_token
+    @check_writer_lease
+    def post(self, request):
+        token = request.token
+
+        if request.content_type.split(';')[0].strip() != NDJSON_MEDIA_TYPE:
+            return Response(
+                {'error': f'Translations must be sent as {NDJSON_MEDIA_TYPE}.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        stream = get_upload_stream(request)
+        if stream is None:
+            return Response({'error': 'Translations data is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            counts = tp.ingest_translations(token, stream)
+        except tp.IngestError as e:
+            return Response({'error': str(e), 'line': e.line_number}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(e)
+            return Response(
+                {'error': 'An error occurred while importing translations.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response(
+            {'message': 'Translations imported successfully.', 'revision': token.version, **counts},
+            status=status.HTTP_200_OK
+        )
+
+class TranslationChangesetView(APIView):
+    """
+    Applies a set of local changes in one transaction. The body follows the
+    format of the client's DiffingProcessor.get_changed_translations:
+    {language: {'type': ..., 'created': {}, 'modified': {}, 'deleted': {}}}
+
+    With async=true the changeset is applied in batches by a background job.
+    """
+    @require_valid_token
+    @check_writer_lease
+    def post(self, request):
+        token = request.token
+
+        changeset = request.data
+        if not changeset:
+            return Response({'error': 'Changeset is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not tp.validate_changeset(changeset):
+            return Response({'error': 'Changeset is improperly formatted.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_async(request):
+            return import_job_accepted(request, import_jobs.submit_import_job(token, changeset))
+
+        try:
+            counts = tp.apply_changeset(token, changeset)
+        except Exception as e:
+            print(e)
+            return Response(
+                {'error': 'An error occurred while applying the changeset.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response(
+            {'message': 'Changeset applied successfully.', 'revision': token.version, **counts},
+            status=status.HTTP_200_OK
+        )
+
+class TranslationChangesView(APIView):
+    """
+    Returns the translations created, updated and deleted after a given revision.
+    """
+    @require_read_token
+    def get(self, request):
+        token = request.token
+
+        since = request.query_params.get('since')
+        if since is None or not since.isdigit():
+            return Response({'error': 'A non-negative integer revision is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        since = int(since)
+        if since > token.version:
+            return Response(
+                {'error': 'Revision is ahead of the server, pull all translations instead.'},
+                status=status.HTTP_410_GONE
+            )
+
+        changes = tp.get_translation_changes(token, since) if since < token.version else {}
+        return Response({'revision': token.version, 'changes': changes}, status=status.HTTP_200_OK)
+
+class ReadTokenView(APIView):
+    """
+    Issues a signed read token for the project token, accepted by the read
+    endpoints in the Read-Token header. Pass expires_in to get a token valid
+    for less than READ_TOKEN_SECONDS.
+    """
+    @require_valid_token
+    def post(self, request):
+        seconds = max_seconds()
+        expires_in = request.data.get('expires_in', seconds)
+        if isinstance(expires_in, bool) or not isinstance(expires_in, int) or not 0 < expires_in <= seconds:
+            return Response(
+                {'error': f'expires_in must be between 1 and {seconds} seconds.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        read_token, expires_at = issue_read_token(request.token, expires_in)
+        return Response({'read_token': read_token, 'expires_at': expires_at}, status=status.HTTP_201_CREATED)
+
+class ImportJobView(APIView):
+    """
+    Returns the status and progress of a background import job.
+    """
+    @require_valid_token
+    def get(self, request, job_id):
+        import_jobs.fail_stale_jobs(id=job_id)
+        job = ImportJob.objects.filter(id=job_id, token=request.token).first()
+        if job is None:
+            return Response({'error': 'Import job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(import_job_data(job), status=status.HTTP_200_OK)
+
+class WriterLeaseView(APIView):
+    """
+    Issues a writer lease to the microservice holding the project's writer
+    permissions. The lease is sent back in the Writer-Lease header of writes,
+    so the microservice doesn't need to check its permissions before every push.
+    Requesting a lease again replaces the previous one.
+    """
+
+    def post(self, request):
+        microservice_token_value = request.headers.get("Microservice-Token")
+        if not microservice_token_value or not is_valid_uuid(microservice_token_value):
+            return Response(
+                {"error": "A valid microservice token is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        microservice_token = writer_permissions.resolve_microservice_token(microservice_token_value)
+        if microservice_token is None:
+            return Response(
+                {"error": "Microservice token not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if microservice_token.writer_id is None or microservice_token.writer_editor_id != microservice_token.id:
+            return Response(
+                {"error": "Microservice does not have writer permissions."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        lease_id, expires_at = writer_permissions.issue_lease(microservice_token.writer_id)
+        return Response(
+            {"lease_id": str(lease_id), "expires_at": expires_at.isoformat()},
+            status=status.HTTP_200_OK
+        )
+
 class WriterPermissionView(APIView):
     """
     API endpoint to manage writer permissions to a microservice.
@@ -447,8 +784,6 @@ class WriterPermissionView(APIView):
             request.data.get("microservice_token")
         )
 
-        print(microservice_token_value)
-
         if not microservice_token_value:
             return Response(
                 {"error": "Microservice token is required."},
@@ -461,36 +796,34 @@ class WriterPermissionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # get the MicroserviceToken instance
-        try:
-            microservice_token = MicroserviceToken.objects.get(
-                value=microservice_token_value
-            )
-        except MicroserviceToken.DoesNotExist:
+        # get the MicroserviceToken instance along with its project's writer
+        microservice_token = writer_permissions.resolve_microservice_token(microservice_token_value)
+        if microservice_token is None:
             return Response(
                 {"error": "Microservice token not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
         
         project_token = microservice_token.project_token
-        print(project_token)
 
         # check if a Writer record already exists for this project
-        writer_permission = Writer.objects.filter(project_token=project_token).first()
-        if writer_permission:
-            # if project doesn't have any writer tokens assigned yet
-            if not writer_permission.editor_token:
-                writer_permission.editor_token = microservice_token
-                writer_permission.save()
+        if microservice_token.writer_id is not None:
+            # if the current microservice is already the writer, no change is needed
+            if microservice_token.writer_editor_id == microservice_token.id:
                 return Response(
-                    {"message": "Writer permissions granted."},
+                    {"message": "Microservice already has writer permissions."},
                     status=status.HTTP_200_OK
                 )
 
-            # if the current microservice is already the writer, no change is needed
-            elif writer_permission.editor_token == microservice_token:
+            # if project doesn't have any writer tokens assigned yet, claim them
+            # unless another microservice got them in the meantime
+            granted = Writer.objects.filter(
+                id=microservice_token.writer_id, editor_token__isnull=True
+            ).update(editor_token=microservice_token)
+            if granted:
+                writer_permissions.invalidate_project(project_token)
                 return Response(
-                    {"message": "Microservice already has writer permissions."},
+                    {"message": "Writer permissions granted."},
                     status=status.HTTP_200_OK
                 )
             else:
@@ -505,6 +838,7 @@ class WriterPermissionView(APIView):
                 project_token=project_token,
                 editor_token=microservice_token
             )
+            writer_permissions.invalidate_project(project_token)
             return Response(
                 {"message": "Writer permissions granted."},
                 status=status.HTTP_201_CREATED
@@ -528,27 +862,16 @@ class WriterPermissionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # get the MicroserviceToken instance
-        try:
-            microservice_token = MicroserviceToken.objects.get(
-                value=microservice_token_value
-            )
-        except MicroserviceToken.DoesNotExist:
+        found, writer_permission = writer_permissions.get_writer_permission(microservice_token_value)
+        if not found:
             return Response(
                 {"error": "Microservice token not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        project_token = microservice_token.project_token
 
         # check if a Writer record exists for this project
-        writer_permission = Writer.objects.filter(project_token=project_token).first()
         if writer_permission:
-            data = {
-                "project_token": str(writer_permission.project_token),
-                "editor_token": str(writer_permission.editor_token) if writer_permission.editor_token else None
-            }
-            return Response(data, status=status.HTTP_200_OK)
+            return Response(writer_permission, status=status.HTTP_200_OK)
         
         # reader/writer permissions not initialized for current project
         else:
@@ -576,12 +899,9 @@ class WriterPermissionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # get the MicroserviceToken instance
-        try:
-            microservice_token = MicroserviceToken.objects.get(
-                value=microservice_token_value
-            )
-        except MicroserviceToken.DoesNotExist:
+        # get the MicroserviceToken instance along with its project's writer
+        microservice_token = writer_permissions.resolve_microservice_token(microservice_token_value)
+        if microservice_token is None:
             return Response(
                 {"error": "Microservice token not found."},
                 status=status.HTTP_404_NOT_FOUND
@@ -590,18 +910,19 @@ class WriterPermissionView(APIView):
         project_token = microservice_token.project_token
 
         # check if a Writer record exists for this project
-        writer_permission = Writer.objects.filter(project_token=project_token).first()
-        if writer_permission:
+        if microservice_token.writer_id is not None:
             # if project doesn't have any writer tokens assigned yet
-            if not writer_permission.editor_token:
+            if microservice_token.writer_editor_id is None:
                 return Response(
                     {"error": "Remove failed, no existing editor token found for project"},
                     status=status.HTTP_404_NOT_FOUND)
 
             # if the current microservice is the writer, remove successfuly
-            if writer_permission.editor_token == microservice_token:
-                writer_permission.editor_token = None
-                writer_permission.save()
+            if microservice_token.writer_editor_id == microservice_token.id:
+                Writer.objects.filter(id=microservice_token.writer_id).update(
+                    editor_token=None, lease_id=None, lease_expires_at=None
+                )
+                writer_permissions.invalidate_project(project_token)
 
                 data = {
                     "message": "Writer permissions removed successfuly!",
@@ -621,4 +942,4 @@ class WriterPermissionView(APIView):
             # no writer exists for this project yet, cannot remove
             return Response(
                 {"error": "Writer permissions has not been initialized for current project"},
-                status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+                status=status.HTTP_404_NOT_FOUND)
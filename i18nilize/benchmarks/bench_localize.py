@@ -0,0 +1,95 @@
+"""
+Compares Localize.translate against a bound Translator for hits and misses,
+and loading a language from its JSON file against mapping its compiled catalog.
+
+To run, in the i18nilize directory:
+    python benchmarks/bench_localize.py --keys 80000 --lookups 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.internationalize.catalog import compile_catalogs  # noqa: E402
+from src.internationalize.localize import MISS_DEFAULT, Localize  # noqa: E402
+
+
+def write_language(directory, language, keys):
+    translations = {f"app.section_{index // 100}.message_{index}": f"Translated message {index}" for index in range(keys)}
+    with open(os.path.join(directory, f"{language}.json"), "w") as file:
+        json.dump(translations, file)
+    return list(translations)
+
+
+def measure(lookup, words, repeat):
+    def run():
+        for word in words:
+            lookup(word)
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def measure_load(catalogs_dir, repeat):
+    Localize.catalogs_dir = catalogs_dir
+
+    def load():
+        Localize.translations_map = {}
+        Localize.load_language("spanish")
+
+    load_time = min(timeit.repeat(load, number=1, repeat=repeat))
+    Localize.translations_map = {}
+    tracemalloc.start()
+    Localize.load_language("spanish")
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return load_time, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Localize lookup benchmark")
+    parser.add_argument("--keys", type=int, default=80000)
+    parser.add_argument("--lookups", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        Localize.languages_dir = directory
+        keys = write_language(directory, "spanish", args.keys)
+        hits = [keys[index % len(keys)] for index in range(args.lookups)]
+        misses = [f"missing_{index % 1000}" for index in range(args.lookups)]
+
+        catalogs_dir = os.path.join(directory, "catalogs")
+        compile_catalogs(directory, catalogs_dir)
+
+        print(f"{args.keys} keys, {args.lookups} lookups")
+        print(f"{'load':<22}{'ms':>10}{'heap KiB':>10}")
+        for name, load_dir in (("json", os.path.join(directory, "none")), ("catalog", catalogs_dir)):
+            load_time, memory = measure_load(load_dir, args.repeat)
+            print(f"{name:<22}{load_time * 1000:>10.1f}{memory / 1024:>10.0f}")
+        print()
+
+        catalog_translator = Localize.translator("spanish")
+        Localize.catalogs_dir = os.path.join(directory, "none")
+        Localize.translations_map = {}
+        translator = Localize.translator("spanish")
+        default_translator = Localize.translator("spanish", MISS_DEFAULT, "")
+        lookups = [
+            ("translate", lambda word: Localize.translate(word, "spanish")),
+            ("translator", translator.translate),
+            ("translator (default)", default_translator.translate),
+            ("translator (catalog)", catalog_translator.translate),
+        ]
+
+        print(f"{'lookup':<22}{'hit ns':>10}{'miss ns':>10}")
+        for name, lookup in lookups:
+            hit_time = measure(lookup, hits, args.repeat)
+            miss_time = measure(lookup, misses, args.repeat)
+            print(f"{name:<22}{hit_time / args.lookups * 1e9:>10.0f}{miss_time / args.lookups * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares the batch translation entry points of Localize against translating
+each string with Localize.translate.
+
+To run, in the i18nilize directory:
+    python benchmarks/bench_translate_batch.py --keys 80000 --batch 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.internationalize.localize import Localize  # noqa: E402
+
+from bench_localize import write_language  # noqa: E402
+
+
+def build_payload(keys, batch):
+    # a list response of items with a translated title and tags, and an untranslated id
+    return {
+        "items": [
+            {"id": index, "title": keys[index % len(keys)], "tags": [keys[(index * 7) % len(keys)]]}
+            for index in range(batch // 2)
+        ],
+    }
+
+
+def walk_payload(value, language, fields, marked=False):
+    # a generic walk calling translate for every marked string
+    if isinstance(value, str):
+        return Localize.translate(value, language) if marked else value
+    if isinstance(value, dict):
+        return {key: walk_payload(item, language, fields, key in fields) for key, item in value.items()}
+    if isinstance(value, list):
+        return [walk_payload(item, language, fields, marked) for item in value]
+    return value
+
+
+def translate_payload(payload, language):
+    # written for the shape of the payload
+    return {
+        "items": [
+            {
+                "id": item["id"],
+                "title": Localize.translate(item["title"], language),
+                "tags": [Localize.translate(tag, language) for tag in item["tags"]],
+            }
+            for item in payload["items"]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Localize batch translation benchmark")
+    parser.add_argument("--keys", type=int, default=80000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--number", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        Localize.languages_dir = directory
+        Localize.catalogs_dir = os.path.join(directory, "catalogs")
+        keys = write_language(directory, "spanish", args.keys)
+        words = [keys[(index * 7919) % len(keys)] for index in range(args.batch)]
+        payload = build_payload(keys, args.batch)
+        assert Localize.translate_structure(payload, "spanish", ["title", "tags"]) == translate_payload(payload, "spanish")
+        assert walk_payload(payload, "spanish", {"title", "tags"}) == translate_payload(payload, "spanish")
+
+        runs = [
+            ("translate loop", lambda: [Localize.translate(word, "spanish") for word in words]),
+            ("translate_many", lambda: Localize.translate_many(words, "spanish")),
+            ("payload walk", lambda: walk_payload(payload, "spanish", {"title", "tags"})),
+            ("payload loop", lambda: translate_payload(payload, "spanish")),
+            ("translate_structure", lambda: Localize.translate_structure(payload, "spanish", ["title", "tags"])),
+        ]
+
+        print(f"{args.keys} keys, batches of {args.batch} strings")
+        print(f"{'run':<22}{'us/batch':>10}")
+        for name, run in runs:
+            run_time = min(timeit.repeat(run, number=args.number, repeat=args.repeat)) / args.number
+            print(f"{name:<22}{run_time * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,18 @@ import requests
 from . import globals
 from dotenv import load_dotenv
 import os
+from datetime import datetime, timedelta, timezone
 from .helpers import (
+    read_sync_state,
+    update_sync_state,
     write_env_var
 )
 
 ENV_FILE_PATH = globals.ENV_FILE
 
+# A stored writer lease is renewed when it expires within this many seconds
+LEASE_RENEWAL_MARGIN_SECONDS = 60
+
 def create_token():
     """
     Creates a new token by making a POST request to the central API.
@@ -159,6 +165,54 @@ def has_writer_permissions(ms_token):
     except requests.RequestException as e:
         raise Exception(f"HTTP Request failed: {e}")
     
+def get_writer_lease(ms_token):
+    """
+    Returns the id of a valid writer lease for the microservice token, or None
+    if it doesn't have writer permissions. The lease is stored in the sync state
+    and only requested again from the server once it is about to expire.
+    """
+    lease = read_sync_state().get("writer_lease")
+    if lease and lease.get("ms_token") == ms_token:
+        expires_at = datetime.fromisoformat(lease["expires_at"])
+        if expires_at - timedelta(seconds=LEASE_RENEWAL_MARGIN_SECONDS) > datetime.now(timezone.utc):
+            return lease["lease_id"]
+
+    try:
+        response = requests.post(globals.WRITER_LEASE_ENDPOINT, headers={"Microservice-Token": ms_token})
+    except requests.RequestException as e:
+        raise Exception(f"HTTP Request failed: {e}")
+
+    if response.status_code != 200:
+        clear_writer_lease()
+        return None
+
+    data = response.json()
+    update_sync_state(writer_lease={
+        "ms_token": ms_token,
+        "lease_id": data["lease_id"],
+        "expires_at": data["expires_at"],
+    })
+    return data["lease_id"]
+
+def get_error_message(response):
+    """
+    Returns the error message of a failed response. Falls back to the body
+    when it isn't JSON, e.g. the HTML error page of a proxy.
+    """
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and "error" in data:
+        return data["error"]
+    return response.text.strip() or f"HTTP {response.status_code}"
+
+def clear_writer_lease():
+    """
+    Forgets the stored writer lease.
+    """
+    update_sync_state(writer_lease=None)
+    
 def relinquish_writer_permissions():
     """
     Relinquishes writer permissions for the current microservice token.
@@ -178,6 +232,7 @@ def relinquish_writer_permissions():
         )
         
         if response.status_code == 200:
+            clear_writer_lease()
             print("Writer permissions relinquished successfully.")
             return True
         elif response.status_code == 404:
@@ -0,0 +1,164 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+
+"""
+Compiled binary catalogs of a language's translations, read through mmap so a
+language doesn't have to be parsed into a dict to be used.
+
+    header   magic (4 bytes) | format version (1 byte) | padding (3 bytes) |
+             slot count (u32) | entry count (u32)
+    slots    slot count * (key hash (u32) | key offset (u32) | key length (u32) | value length (u32))
+    pool     utf-8 keys and values, each value right after its key
+
+Slots are an open addressing hash table over the crc32 of the utf-8 key with
+linear probing, at most half full. Empty slots have a key offset of EMPTY.
+Offsets are relative to the start of the pool and lengths are in bytes. All
+integers are little-endian.
+
+Lookups hash the key, probe the slots and only decode the value they return.
+"""
+
+MAGIC = b"I18C"
+FORMAT_VERSION = 1
+EXTENSION = ".catalog"
+
+EMPTY = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sB3xII")
+_SLOT = struct.Struct("<IIII")
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def catalog_path(catalogs_dir, language):
+    return os.path.join(catalogs_dir, f"{language}{EXTENSION}")
+
+
+def encode_catalog(translations):
+    """
+    Returns the compiled catalog of a {key: value} dict.
+    """
+    slot_count = 8
+    while slot_count < 2 * len(translations):
+        slot_count *= 2
+    mask = slot_count - 1
+
+    slots = [None] * slot_count
+    pool = bytearray()
+    for key, value in translations.items():
+        key_bytes = key.encode("utf-8")
+        value_bytes = value.encode("utf-8")
+        key_hash = zlib.crc32(key_bytes)
+        index = key_hash & mask
+        while slots[index] is not None:
+            index = (index + 1) & mask
+        slots[index] = (key_hash, len(pool), len(key_bytes), len(value_bytes))
+        pool += key_bytes
+        pool += value_bytes
+
+    if len(pool) >= EMPTY:
+        raise CatalogError("Catalog is too large.")
+
+    empty_slot = _SLOT.pack(0, EMPTY, 0, 0)
+    return b"".join((
+        _HEADER.pack(MAGIC, FORMAT_VERSION, slot_count, len(translations)),
+        b"".join(_SLOT.pack(*slot) if slot is not None else empty_slot for slot in slots),
+        pool,
+    ))
+
+
+def write_catalog(translations, path):
+    """
+    Compiles a {key: value} dict to the given path. The file is replaced
+    atomically, so processes reading the previous catalog keep their mapping.
+    """
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(encode_catalog(translations))
+    os.replace(temporary_path, path)
+
+
+def compile_catalogs(languages_dir, catalogs_dir):
+    """
+    Compiles every language file in languages_dir to catalogs_dir. Returns the
+    compiled languages.
+    """
+    os.makedirs(catalogs_dir, exist_ok=True)
+    languages = []
+    for file_name in sorted(os.listdir(languages_dir)):
+        language, extension = os.path.splitext(file_name)
+        if extension != ".json":
+            continue
+        with open(os.path.join(languages_dir, file_name), "r", encoding="utf8") as file:
+            write_catalog(json.load(file), catalog_path(catalogs_dir, language))
+        languages.append(language)
+    return languages
+
+
+class Catalog(Mapping):
+    """
+    Read-only mapping over a compiled catalog file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._data) < _HEADER.size:
+            raise CatalogError("Truncated catalog header.")
+        magic, version, slot_count, self._length = _HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise CatalogError("Not a translation catalog.")
+        if version != FORMAT_VERSION:
+            raise CatalogError(f"Unsupported catalog version {version}.")
+        if slot_count & (slot_count - 1):
+            raise CatalogError("Invalid catalog slot count.")
+
+        self._mask = slot_count - 1
+        self._pool = _HEADER.size + slot_count * _SLOT.size
+        if len(self._data) < self._pool:
+            raise CatalogError("Truncated catalog slots.")
+
+    def get(self, key, default=None):
+        key_bytes = key.encode("utf-8")
+        key_hash = zlib.crc32(key_bytes)
+        data, pool, mask = self._data, self._pool, self._mask
+        index = key_hash & mask
+        while True:
+            slot_hash, offset, key_length, value_length = _SLOT.unpack_from(data, _HEADER.size + index * _SLOT.size)
+            if offset == EMPTY:
+                return default
+            if slot_hash == key_hash and key_length == len(key_bytes):
+                start = pool + offset
+                if data[start:start + key_length] == key_bytes:
+                    start += key_length
+                    return str(data[start:start + value_length], "utf-8")
+            index = (index + 1) & mask
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __iter__(self):
+        data, pool = self._data, self._pool
+        for index in range(self._mask + 1):
+            _, offset, key_length, _ = _SLOT.unpack_from(data, _HEADER.size + index * _SLOT.size)
+            if offset != EMPTY:
+                yield str(data[pool + offset:pool + offset + key_length], "utf-8")
+
+    def __len__(self):
+        return self._length
+
+    def close(self):
+        self._data.close()
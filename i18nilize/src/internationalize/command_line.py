@@ -11,6 +11,7 @@ from .package_init_utils import (
     setup_package,
     validate_required_directories,
 )
+from .catalog import compile_catalogs
 from .sync_processor import pull_translations, push_translations
 from .diffing_processor import DiffingProcessor
 from .api_helpers import relinquish_writer_permissions, request_writer_permissions, create_token, assign_token
@@ -50,10 +51,38 @@ def cli():
     group_token_fetch_parser = subparsers.add_parser("group-fetch")
 
     # sub parser for pull
-    subparsers.add_parser("pull")
+    pull_parser = subparsers.add_parser("pull")
+    pull_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only download the changes made since the last pull",
+    )
+    pull_parser.add_argument(
+        "--languages",
+        type=lambda languages: [language.strip().lower() for language in languages.split(",") if language.strip()],
+        help="comma separated languages to pull",
+    )
+    pull_parser.add_argument(
+        "--prefix",
+        help="only pull keys starting with this prefix",
+    )
+    pull_parser.add_argument(
+        "--table",
+        action="store_true",
+        help="pull all translations in the compact binary format instead of streamed JSON",
+    )
 
     # sub parser for push
-    subparsers.add_parser("push")
+    push_parser = subparsers.add_parser("push")
+    push_parser.add_argument(
+        "--async",
+        dest="asynchronous",
+        action="store_true",
+        help="push as a background job on the server and wait for it to finish",
+    )
+
+    # sub parser for compile
+    subparsers.add_parser("compile", help="compile the language files to binary catalogs for Localize")
 
     # sub parser for setup
     subparsers.add_parser("setup")
@@ -84,9 +113,17 @@ def cli():
     elif args.command == "delete":
         delete_translation(args.language, args.original_word, args.translated_word)
     elif args.command == "pull":
-        pull_translations()
+        pull_translations(
+            incremental=args.incremental,
+            languages=args.languages,
+            prefix=args.prefix,
+            table=args.table,
+        )
     elif args.command == "push":
-        push_translations()
+        push_translations(asynchronous=args.asynchronous)
+    elif args.command == "compile":
+        languages = compile_catalogs(globals.LANGUAGES_DIR, globals.CATALOGS_DIR)
+        print(f"Compiled {len(languages)} languages to {globals.CATALOGS_DIR}.")
     elif args.command == "relinquish-writer":
         relinquish_writer_permissions()
     elif args.command == "request-writer":
@@ -6,7 +6,7 @@ from dirsync import sync
 
 from .error_handler import ErrorHandler
 from .api_helpers import create_token, create_ms_token
-from .helpers import compute_hashes, read_json_file
+from .helpers import compute_hash, compute_hashes, read_json_file
 
 from . import globals
 
@@ -89,6 +89,43 @@ class DiffingProcessor:
         with open(self.metadata_file_dir, "w") as outfile:
             json.dump(hash_dict, outfile)
 
+    """
+    Returns the translations of a language as of the last sync, empty if the
+    language wasn't synced.
+    """
+
+    def read_synced_translations(self, language):
+        file_path = os.path.join(self.diff_state_files_dir, language + JSON_EXTENSION)
+        if not os.path.exists(file_path):
+            return {}
+        return read_json_file(file_path)
+
+    """
+    Records translations of a single language as synced, leaving the state of
+    the other languages alone so their unpushed changes are still pushed.
+    None removes the language from the synced state.
+    """
+
+    def write_synced_translations(self, language, translations):
+        file_path = os.path.join(self.diff_state_files_dir, language + JSON_EXTENSION)
+        hash_dict = {}
+        if os.path.exists(self.metadata_file_dir):
+            with open(self.metadata_file_dir, "r") as file:
+                hash_dict = json.load(file)
+
+        if translations is None:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            hash_dict.pop(language, None)
+        else:
+            os.makedirs(self.diff_state_files_dir, exist_ok=True)
+            content = json.dumps(translations, indent=4)
+            with open(file_path, "w") as file:
+                file.write(content)
+            hash_dict[language] = compute_hash(content.encode())
+
+        self.update_metadata(hash_dict)
+
     def sync_translations(self):
         handler = ErrorHandler(globals.LANGUAGES_DIR)
         errors = handler.verify_languages()
@@ -18,17 +18,24 @@ API_BASE_URL = "http://localhost:8000/api/"
 TOKEN_ENDPOINT = f"{API_BASE_URL}token/"
 MS_TOKEN_ENDPOINT = f"{API_BASE_URL}ms-token/"
 TRANSLATIONS_ENDPOINT = f"{API_BASE_URL}translations/"
+PROCESS_TRANSLATIONS_ENDPOINT = f"{API_BASE_URL}translations"
 PULL_TRANSLATIONS_ENDPOINT = f"{TRANSLATIONS_ENDPOINT}pull/"
+TRANSLATION_CHANGES_ENDPOINT = f"{TRANSLATIONS_ENDPOINT}changes/"
+TRANSLATION_CHANGESET_ENDPOINT = f"{TRANSLATIONS_ENDPOINT}changeset/"
+IMPORT_JOBS_ENDPOINT = f"{TRANSLATIONS_ENDPOINT}jobs/"
 PUSH_TRANSLATIONS_ENDPOINT = f"{TRANSLATIONS_ENDPOINT}push/"
 WRITER_PERMISSIONS_ENDPOINT = f"{API_BASE_URL}writer-permission/"
+WRITER_LEASE_ENDPOINT = f"{WRITER_PERMISSIONS_ENDPOINT}lease/"
 
 LANGUAGES_DIR = 'languages'
+CATALOGS_DIR = 'catalogs'
 DIFF_STATE_DIR = 'diff_state'
 ENV_FILE = ".env"
+SYNC_STATE_FILE = "sync_state.json"
 
 def initialize_root_directory():
     try:
-        global ROOT_DIRECTORY, LANGUAGES_DIR, DIFF_STATE_DIR, ENV_FILE
+        global ROOT_DIRECTORY, LANGUAGES_DIR, CATALOGS_DIR, DIFF_STATE_DIR, ENV_FILE, SYNC_STATE_FILE
  
         if ROOT_DIRECTORY and LANGUAGES_DIR and DIFF_STATE_DIR and ENV_FILE:
             return
@@ -36,8 +43,10 @@ def initialize_root_directory():
         root_directory = get_project_root_directory()
         ROOT_DIRECTORY = root_directory
         LANGUAGES_DIR = os.path.join(root_directory, "languages")
+        CATALOGS_DIR = os.path.join(root_directory, "catalogs")
         DIFF_STATE_DIR = os.path.join(root_directory, "diff_state")
         ENV_FILE = os.path.join(DIFF_STATE_DIR, ".env")
+        SYNC_STATE_FILE = os.path.join(DIFF_STATE_DIR, "sync_state.json")
     except FileNotFoundError as err:
         print("Error:", err)
         exit(1)
@@ -32,6 +32,23 @@ def write_env_var(key, value):
         f.writelines(lines)
 
 
+# read the state of the last sync with the server (ETags, revisions) from the diff_state dir
+def read_sync_state():
+    try:
+        with open(globals.SYNC_STATE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# update values in the sync state file in the diff_state dir
+def update_sync_state(**values):
+    state = read_sync_state()
+    state.update(values)
+    with open(globals.SYNC_STATE_FILE, "w") as f:
+        json.dump(state, f, indent=4)
+
+
 # Function to parse json file, given its path
 def get_json(file_path):
     try:
@@ -1,29 +1,422 @@
+import asyncio
 import json
 import os
+import threading
+from concurrent.futures import Future
+import weakref
+from types import MappingProxyType
 
 from . import globals
+from .catalog import Catalog, catalog_path
+
+# What a Translator returns for a word missing from its language
+MISS_KEY = "key"
+MISS_DEFAULT = "default"
+MISS_RAISE = "raise"
+MISS_POLICIES = (MISS_KEY, MISS_DEFAULT, MISS_RAISE)
+
+class Translator:
+    """
+    Translates words into a single language, bound to a read-only view of its
+    loaded translations. translate(word) is a single dict lookup, on a miss it
+    returns the word itself (MISS_KEY), the given default (MISS_DEFAULT) or
+    raises a KeyError (MISS_RAISE).
+
+    Get one from Localize.translator and keep it, e.g. per request handler.
+    When Localize reloads the language, the translator is bound to the new
+    translations.
+    """
+    __slots__ = ("language", "miss", "default", "translations", "translate", "__weakref__")
+
+    def __init__(self, language, translations, miss=MISS_KEY, default=None):
+        if miss not in MISS_POLICIES:
+            raise ValueError(f"Unknown miss policy {miss!r}, expected one of {', '.join(MISS_POLICIES)}.")
+
+        self.language = language
+        self.miss = miss
+        self.default = default
+        self._bind(translations)
+
+    def _bind(self, translations):
+        self.translations = MappingProxyType(translations)
+
+        # bind the lookup once so translate doesn't dispatch on the policy,
+        # replacing it is a single attribute assignment
+        if self.miss == MISS_RAISE:
+            self.translate = self.translations.__getitem__
+        else:
+            get = translations.get
+            default = self.default
+            if self.miss == MISS_KEY:
+                self.translate = lambda word: get(word, word)
+            else:
+                self.translate = lambda word: get(word, default)
+
+    def translate_many(self, words):
+        """
+        Translate a list of words, returning a list.
+        """
+        return list(map(self.translate, words))
+
+    def translate_structure(self, data, fields):
+        """
+        Translate the strings of a nested structure of dicts and lists that are
+        stored under one of the given dict keys, including strings in lists
+        under those keys. Returns the translated structure without modifying
+        data: dicts and lists are only copied if something inside them was
+        translated to a different string.
+        """
+        translate = self.translate
+        fields = frozenset(fields)
+
+        # strings are handled in the loops, only containers recurse
+        def walk_dict(value):
+            result = None
+            for key, item in value.items():
+                if isinstance(item, str):
+                    if key not in fields:
+                        continue
+                    translated = translate(item)
+                elif isinstance(item, dict):
+                    translated = walk_dict(item)
+                elif isinstance(item, list):
+                    translated = walk_list(item, key in fields)
+                else:
+                    continue
+                if translated is not item:
+                    if result is None:
+                        result = value.copy()
+                    result[key] = translated
+            return value if result is None else result
+
+        def walk_list(value, marked):
+            result = None
+            for index, item in enumerate(value):
+                if isinstance(item, str):
+                    if not marked:
+                        continue
+                    translated = translate(item)
+                elif isinstance(item, dict):
+                    translated = walk_dict(item)
+                elif isinstance(item, list):
+                    translated = walk_list(item, marked)
+                else:
+                    continue
+                if translated is not item:
+                    if result is None:
+                        result = value.copy()
+                    result[index] = translated
+            return value if result is None else result
+
+        if isinstance(data, dict):
+            return walk_dict(data)
+        if isinstance(data, list):
+            return walk_list(data, False)
+        return data
+
+    def __repr__(self):
+        return f"<Translator {self.language}>"
 
 class Localize:
     languages_dir = globals.LANGUAGES_DIR
+    catalogs_dir = globals.CATALOGS_DIR
     translations_map = {}
+    # {language: [fallback languages]}, set with set_fallbacks
+    fallbacks = {}
+
+    # fallback chains merged into one table per language
+    _resolved = {}
+    # chain languages skipped for lack of files, merged in once they appear
+    _missing = set()
+    # file signatures of the loaded languages, and translators to rebind, for reloads
+    _sources = {}
+    _translators = {}
+    # languages being loaded, other callers wait on the first one's future
+    _loading = {}
+    _registry_lock = threading.Lock()
+    _watcher = None
+
+    @classmethod
+    def _source_signature(cls, language):
+        signature = []
+        for path in (os.path.join(cls.languages_dir, f"{language}.json"), catalog_path(cls.catalogs_dir, language)):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    @classmethod
+    def _read_language(cls, language):
+        """
+        Read a language's translations without storing them, along with the
+        signature of its files. A catalog compiled by `i18nilize compile` is
+        mapped instead of parsing the file, unless the file changed since.
+        """
+        signature = cls._source_signature(language)
+        file_path = os.path.join(cls.languages_dir, f"{language}.json")
+        compiled_path = catalog_path(cls.catalogs_dir, language)
+        file_signature, compiled_signature = signature
+        if compiled_signature and (not file_signature or compiled_signature[0] >= file_signature[0]):
+            return Catalog(compiled_path), signature
+        elif file_signature:
+            with open(file_path, "r") as file:
+                return json.load(file), signature
+        else:
+            raise FileNotFoundError(f"Translations for {language} not found.")
 
     @classmethod
     def load_language(cls, language):
         """
         Load the translation file for a specific language if not already loaded.
+        Thread-safe: while a language is loading, other callers wait for it
+        instead of parsing the file again, and get its error if it fails.
         """
-        if language not in cls.translations_map:
-            file_path = os.path.join(cls.languages_dir, f"{language}.json")
-            if os.path.exists(file_path):
-                with open(file_path, "r") as file:
-                    cls.translations_map[language] = json.load(file)
-            else:
+        if language in cls.translations_map:
+            return
+
+        with cls._registry_lock:
+            if language in cls.translations_map:
+                return
+            future = cls._loading.get(language)
+            loader = future is None
+            if loader:
+                future = cls._loading[language] = Future()
+
+        if not loader:
+            future.result()
+            return
+
+        try:
+            translations, signature = cls._read_language(language)
+            cls._sources[language] = signature
+            cls.translations_map[language] = translations
+            future.set_result(None)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with cls._registry_lock:
+                cls._loading.pop(language, None)
+
+    @classmethod
+    async def load_language_async(cls, language, executor=None):
+        """
+        Like load_language, but parses the file in an executor (the loop's
+        default one unless given) so the event loop isn't blocked.
+        """
+        if language in cls.translations_map:
+            return
+
+        with cls._registry_lock:
+            future = cls._loading.get(language)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        else:
+            await asyncio.get_running_loop().run_in_executor(executor, cls.load_language, language)
+
+    @classmethod
+    def set_fallbacks(cls, fallbacks):
+        """
+        Set the languages to fall back to for words missing from a language, in
+        order, e.g. {"fr-ca": ["fr", "en"]}. Chains aren't followed further: the
+        fallbacks of "fr" don't apply to "fr-ca". Languages of a chain without
+        translation files are skipped, reload_changed merges them in once their
+        files appear.
+
+        Each chain is merged into a single table when the language is first
+        used, so looking a word up with fallbacks is still a single lookup. The
+        table is a dict holding every word of the chain: languages with
+        fallbacks don't keep the memory and startup savings of compiled
+        catalogs, which are copied into it.
+        """
+        changed = set(cls.fallbacks).union(fallbacks)
+        cls.fallbacks = {language: list(chain) for language, chain in fallbacks.items()}
+        cls._resolved = {}
+        cls._missing = set()
+        cls._rebind(changed)
+
+    @classmethod
+    def fallback_chain(cls, language):
+        return [language, *cls.fallbacks.get(language, ())]
+
+    @classmethod
+    def get_translations(cls, language):
+        """
+        Get the translations to look words up in for the specified language,
+        with its fallbacks merged in. Loads the languages if needed.
+        """
+        if language not in cls.fallbacks:
+            cls.load_language(language)
+            return cls.translations_map[language]
+
+        resolved = cls._resolved.get(language)
+        if resolved is None:
+            resolved = {}
+            found = False
+            for chain_language in reversed(cls.fallback_chain(language)):
+                try:
+                    cls.load_language(chain_language)
+                except FileNotFoundError:
+                    cls._missing.add(chain_language)
+                    continue
+                resolved.update(cls.translations_map[chain_language])
+                found = True
+            if not found:
                 raise FileNotFoundError(f"Translations for {language} not found.")
+            cls._resolved[language] = resolved
+        return resolved
+
+    @classmethod
+    def _rebind(cls, languages):
+        for language in languages:
+            with cls._registry_lock:
+                translators = list(cls._translators.get(language, ()))
+            if translators:
+                try:
+                    translations = cls.get_translations(language)
+                except (OSError, ValueError) as e:
+                    # the translators keep their current translations
+                    print(f"Error: could not load translations for {language}.", e)
+                    continue
+                for translator in translators:
+                    translator._bind(translations)
 
     @classmethod
     def translate(cls, word, language):
         """
         Get translation for a word in the specified language.
         """
-        cls.load_language(language)
-        return cls.translations_map[language].get(word, f"Translation for {word} not found")
+        return cls.get_translations(language).get(word, f"Translation for {word} not found")
+
+    @classmethod
+    def translator(cls, language, miss=MISS_KEY, default=None):
+        """
+        Get a Translator for the specified language, loading it if needed.
+        """
+        translator = Translator(language, cls.get_translations(language), miss, default)
+        with cls._registry_lock:
+            cls._translators.setdefault(language, weakref.WeakSet()).add(translator)
+        return translator
+
+    @classmethod
+    def translate_many(cls, words, language, miss=MISS_KEY, default=None):
+        """
+        Translate a list of words into the specified language, loading it once
+        for the whole batch. Misses follow the Translator miss policy.
+        """
+        return Translator(language, cls.get_translations(language), miss, default).translate_many(words)
+
+    @classmethod
+    def translate_structure(cls, data, language, fields, miss=MISS_KEY, default=None):
+        """
+        Translate the strings stored under the given dict keys of a nested
+        structure into the specified language, see Translator.translate_structure.
+        """
+        return Translator(language, cls.get_translations(language), miss, default).translate_structure(data, fields)
+
+    @classmethod
+    async def translator_async(cls, language, miss=MISS_KEY, default=None, executor=None):
+        """
+        Get a Translator for the specified language, loading it and its
+        fallbacks in an executor if needed.
+        """
+        for chain_language in cls.fallback_chain(language):
+            try:
+                await cls.load_language_async(chain_language, executor)
+            except FileNotFoundError:
+                pass
+        return cls.translator(language, miss, default)
+
+    @classmethod
+    def reload_changed(cls):
+        """
+        Reload the loaded languages whose files changed since they were loaded
+        and return them. Each language is read in full before it is swapped in,
+        so lookups keep using the previous translations until then. A file that
+        can't be read (e.g. while `i18nilize pull` is still writing it) is
+        retried on the next call.
+
+        Fallback languages that were skipped for lack of files are loaded once
+        their files appear, and merged into the chains they are part of.
+        """
+        reloaded = []
+        for language in list(cls._missing):
+            if language in cls.translations_map:
+                # loaded directly since, the chains still lack it
+                cls._missing.discard(language)
+                reloaded.append(language)
+                continue
+            if cls._source_signature(language) == (None, None):
+                continue
+            try:
+                translations, signature = cls._read_language(language)
+            except (OSError, ValueError) as e:
+                print(f"Error: could not load translations for {language}.", e)
+                continue
+
+            cls._missing.discard(language)
+            cls._sources[language] = signature
+            cls.translations_map[language] = translations
+            reloaded.append(language)
+
+        for language, signature in list(cls._sources.items()):
+            if language in reloaded:
+                continue
+            if language not in cls.translations_map:
+                cls._sources.pop(language, None)
+                continue
+            if cls._source_signature(language) == signature:
+                continue
+
+            try:
+                translations, signature = cls._read_language(language)
+            except (OSError, ValueError) as e:
+                print(f"Error: could not reload translations for {language}.", e)
+                continue
+
+            cls._sources[language] = signature
+            cls.translations_map[language] = translations
+            reloaded.append(language)
+
+        if reloaded:
+            # rebuild the merged tables of the chains the languages are part of
+            affected = {
+                language for language, chain in cls.fallbacks.items()
+                if any(chain_language in reloaded for chain_language in [language, *chain])
+            }
+            for language in affected:
+                cls._resolved.pop(language, None)
+            cls._rebind(affected.union(reloaded))
+        return reloaded
+
+    @classmethod
+    def watch(cls, interval=1.0):
+        """
+        Start a background thread reloading changed language files every
+        interval seconds. Lookups never wait on it.
+        """
+        with cls._registry_lock:
+            if cls._watcher is None:
+                stop = threading.Event()
+                thread = threading.Thread(target=cls._watch, args=(interval, stop), name="i18nilize-watcher", daemon=True)
+                cls._watcher = (thread, stop)
+                thread.start()
+
+    @classmethod
+    def stop_watching(cls):
+        with cls._registry_lock:
+            watcher, cls._watcher = cls._watcher, None
+        if watcher is not None:
+            thread, stop = watcher
+            stop.set()
+            thread.join()
+
+    @classmethod
+    def _watch(cls, interval, stop):
+        while not stop.wait(interval):
+            try:
+                cls.reload_changed()
+            except Exception as e:
+                print("Error: could not reload translations.", e)
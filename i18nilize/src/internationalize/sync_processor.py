@@ -1,37 +1,95 @@
 import json
 import os
+import time
 from dotenv import load_dotenv
 
 import requests
 
-from .diffing_processor import DiffingProcessor
+from .diffing_processor import CREATED, DELETED, MODIFIED, TYPE, DiffingProcessor
 
 from . import globals
-from .api_helpers import has_writer_permissions
+from .api_helpers import clear_writer_lease, get_error_message, get_writer_lease
+from .helpers import read_sync_state, update_sync_state
+from . import wire_format
 ENV_FILE_PATH = globals.ENV_FILE
 
+# Number of keys requested per page when pulling a subset of translations
+PULL_PAGE_SIZE = 1000
+
+# Maximum number of translations sent per changeset when pushing
+PUSH_CHUNK_SIZE = 5000
+
+# Seconds between two polls of a background import job
+JOB_POLL_SECONDS = 1
+# Seconds push --async waits for an import job to finish
+JOB_TIMEOUT_SECONDS = 30 * 60
+
 """
 Pulls all translations assigned to the microservices' token
 and overwrites all language files to sync translations.
+Files are left untouched if nothing changed since the last pull.
+
+With incremental set, only the changes made since the last pull
+are downloaded and applied to the language files.
+
+With languages and/or prefix set, only those languages and the keys
+starting with prefix are downloaded and synced.
+
+Full pulls are streamed by the server as JSON, so its memory stays flat. With
+table set they are sent in the compact binary format instead, which is smaller
+on the wire but built in memory by the server.
 """
 
 
-def pull_translations():
+def pull_translations(incremental=False, languages=None, prefix=None, table=False):
     load_dotenv(ENV_FILE_PATH)
     token = os.getenv("GROUP_TOKEN")
     
     diff_processor = DiffingProcessor(globals.LANGUAGES_DIR)
 
+    if languages or prefix:
+        pull_filtered_translations(token, languages, prefix, diff_processor)
+        return
+
+    revision = read_sync_state().get("revision")
+    if incremental and revision is not None:
+        if pull_translation_changes(token, revision, diff_processor):
+            return
+        print("Could not pull changes incrementally, pulling all translations instead.")
+
+    pull_all_translations(token, diff_processor, table)
+
+
+def pull_all_translations(token, diff_processor, table=False):
+    headers = {"Token": token}
+    params = {"stream": "true"}
+    if table:
+        # the server can't stream the table format, it falls back to JSON on errors
+        headers["Accept"] = wire_format.MEDIA_TYPE
+        params = {}
+    etag = read_sync_state().get("pull_etag")
+    if etag:
+        headers["If-None-Match"] = etag
+
     try:
         all_translations = requests.get(
-            globals.PULL_TRANSLATIONS_ENDPOINT, headers={"Token": token}
+            globals.PULL_TRANSLATIONS_ENDPOINT,
+            headers=headers,
+            params=params,
         )
     except Exception as e:
         print("Error: Could not fetch translations from database.", e)
         return
 
+    if all_translations.status_code == 304:
+        print("Translations are already up to date.")
+        return
+
     # Overwrite all translation files
-    all_transactions_dict = all_translations.json()
+    if all_translations.headers.get("Content-Type", "").startswith(wire_format.MEDIA_TYPE):
+        all_transactions_dict = wire_format.decode_catalog(all_translations.content)
+    else:
+        all_transactions_dict = all_translations.json()
     for language, translations in all_transactions_dict.items():
         file_name = f"{language}.json"
         curr_file_path = os.path.join(globals.LANGUAGES_DIR, file_name)
@@ -39,75 +97,288 @@ def pull_translations():
             json.dump(translations, file, indent=4)
 
     diff_processor.update_to_current_state()
+
+    revision = all_translations.headers.get("Translations-Revision")
+    update_sync_state(
+        pull_etag=all_translations.headers.get("ETag"),
+        revision=int(revision) if revision is not None else None,
+    )
     print("Pulled all translations from the database.")
 
 
+"""
+Pulls the given languages (all local languages by default), restricted to the
+keys starting with prefix, a page at a time. Local keys in the pulled range
+that no longer exist on the server are removed.
+
+Only the pulled range is marked as synced, unpushed changes outside of it are
+kept and pushed by the next push.
+"""
+
+
+def pull_filtered_translations(token, languages, prefix, diff_processor):
+    if not languages:
+        languages = [
+            file_name[:-len(".json")]
+            for file_name in os.listdir(globals.LANGUAGES_DIR)
+            if file_name.endswith(".json")
+        ]
+    if not languages:
+        print("Error: No languages to pull.")
+        return
+
+    pulled_translations = {language: {} for language in languages}
+    params = {"languages": ",".join(languages), "limit": PULL_PAGE_SIZE}
+    if prefix:
+        params["prefix"] = prefix
+
+    while True:
+        try:
+            response = requests.get(
+                globals.PROCESS_TRANSLATIONS_ENDPOINT,
+                headers={"Token": token},
+                params=params,
+            )
+        except Exception as e:
+            print("Error: Could not fetch translations from database.", e)
+            return
+
+        if response.status_code != 200:
+            print("Error: Could not fetch translations from database.", get_error_message(response))
+            return
+
+        data = response.json()
+        for language, translations in data["translations"].items():
+            pulled_translations.setdefault(language, {}).update(translations)
+
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    for language, translations in pulled_translations.items():
+        curr_file_path = os.path.join(globals.LANGUAGES_DIR, f"{language}.json")
+
+        local_translations = {}
+        synced_translations = {}
+        if prefix:
+            if os.path.exists(curr_file_path):
+                with open(curr_file_path, "r") as file:
+                    local_translations = json.load(file)
+            synced_translations = diff_processor.read_synced_translations(language)
+        local_translations = merge_pulled_range(local_translations, translations, prefix)
+        synced_translations = merge_pulled_range(synced_translations, translations, prefix)
+
+        with open(curr_file_path, "w+") as file:
+            json.dump(local_translations, file, indent=4)
+        diff_processor.write_synced_translations(language, synced_translations)
+
+    print(f"Pulled translations for {', '.join(pulled_translations)} from the database.")
+
+
+"""
+Returns the translations with the keys starting with prefix (all keys without
+prefix) replaced by the pulled ones.
+"""
+
+
+def merge_pulled_range(translations, pulled_translations, prefix):
+    merged = {
+        original_word: translated_word
+        for original_word, translated_word in translations.items()
+        if prefix and not original_word.startswith(prefix)
+    }
+    merged.update(pulled_translations)
+    return merged
+
+
+"""
+Applies the changes made after the given revision to the language files.
+Returns False if the server can't serve changes from that revision.
+
+Only the changed keys are marked as synced, unpushed changes to other keys
+are kept and pushed by the next push.
+"""
+
+
+def pull_translation_changes(token, revision, diff_processor):
+    try:
+        response = requests.get(
+            globals.TRANSLATION_CHANGES_ENDPOINT,
+            headers={"Token": token},
+            params={"since": revision},
+        )
+    except Exception as e:
+        print("Error: Could not fetch translation changes from database.", e)
+        return False
+
+    if response.status_code != 200:
+        return False
+
+    data = response.json()
+    for language, changes in data["changes"].items():
+        curr_file_path = os.path.join(globals.LANGUAGES_DIR, f"{language}.json")
+
+        translations = {}
+        synced_translations = {}
+        if not changes["reset"]:
+            if os.path.exists(curr_file_path):
+                with open(curr_file_path, "r") as file:
+                    translations = json.load(file)
+            synced_translations = diff_processor.read_synced_translations(language)
+
+        # the changed keys are marked as synced, other unpushed changes are kept
+        for changed_translations in (translations, synced_translations):
+            for original_word in changes["deleted"]:
+                changed_translations.pop(original_word, None)
+            changed_translations.update(changes["updated"])
+
+        if not translations and changes["reset"]:
+            if os.path.exists(curr_file_path):
+                os.remove(curr_file_path)
+            diff_processor.write_synced_translations(language, None)
+            continue
+
+        with open(curr_file_path, "w+") as file:
+            json.dump(translations, file, indent=4)
+        diff_processor.write_synced_translations(language, synced_translations)
+
+    update_sync_state(revision=data["revision"])
+    print(f"Pulled {len(data['changes'])} changed language(s) from the database.")
+    return True
+
+
 """
 Push all local translations to the API.
+
+With asynchronous set, the whole diff is submitted as a single background
+import job on the server, which is polled until it finishes.
 """
 
 
-def push_translations():
+def push_translations(asynchronous=False):
     load_dotenv(ENV_FILE_PATH)
     token = os.getenv("GROUP_TOKEN")
 
     ms_token = os.getenv("MS_TOKEN")
 
-    # make sure current microservice token has writer permissions
-    if not has_writer_permissions(ms_token):
+    # make sure current microservice token has writer permissions, a stored
+    # lease that is still valid saves the round-trip
+    lease_id = get_writer_lease(ms_token)
+    if lease_id is None:
         error_msg = "Error: this microservice does not have writer permissions. Use the CLI to change writer permissions and try again."
         print(error_msg)
         return
+    headers = {"Token": token, "Writer-Lease": lease_id}
 
     diff_processor = DiffingProcessor(globals.LANGUAGES_DIR)
     changed_translations = diff_processor.get_changed_translations()
 
-    for language in changed_translations:
-        created = changed_translations[language]["created"]
-        modified = changed_translations[language]["modified"]
-        deleted = changed_translations[language]["deleted"]
-
-        # Post a new entry for each new translation
-        for original_word in created:
-            try:
-                requests.post(
-                    globals.PUSH_TRANSLATIONS_ENDPOINT,
-                    headers={"Token": token},
-                    params={
-                        "language": language,
-                        original_word: created[original_word],
-                    },
-                )
-            except Exception as e:
-                print("Error: Could not create translation.", e)
-
-        # Patch the appropriate entry for each modified translation
-        for original_word in modified:
-            try:
-                requests.patch(
-                    globals.PUSH_TRANSLATIONS_ENDPOINT,
-                    headers={"Token": token},
-                    params={
-                        "language": language,
-                        original_word: modified[original_word],
-                    },
-                )
-            except Exception as e:
-                print("Error: Could not patch translation.", e)
-
-        # Delete the appropriate entry for each deleted translation
-        for original_word in deleted:
-            try:
-                requests.delete(
-                    globals.PUSH_TRANSLATIONS_ENDPOINT,
-                    headers={"Token": token},
-                    params={
-                        "language": language,
-                        original_word: deleted[original_word],
-                    },
-                )
-            except Exception as e:
-                print("Error: Could not delete translation.", e)
+    if asynchronous:
+        if push_translations_job(headers, changed_translations):
+            diff_processor.update_to_current_state()
+            print(f"Pushed all local translations to the database.")
+        return
+
+    # Each changeset is applied atomically, and applying one again is harmless,
+    # so after a failure the whole diff is simply pushed again next time
+    for changeset in split_changeset(changed_translations, PUSH_CHUNK_SIZE):
+        try:
+            response = requests.post(
+                globals.TRANSLATION_CHANGESET_ENDPOINT,
+                headers=headers,
+                json=changeset,
+            )
+        except Exception as e:
+            print("Error: Could not push translations.", e)
+            return
+
+        if response.status_code == 403:
+            # the lease was revoked, the next push checks the permissions again
+            clear_writer_lease()
+        if response.status_code != 200:
+            print("Error: Could not push translations.", get_error_message(response))
+            return
 
     diff_processor.update_to_current_state()
     print(f"Pushed all local translations to the database.")
+
+
+"""
+Submits the changes as a background import job and waits for it to finish,
+printing its progress. Returns whether the job succeeded.
+"""
+
+
+def push_translations_job(headers, changed_translations):
+    try:
+        response = requests.post(
+            globals.TRANSLATION_CHANGESET_ENDPOINT,
+            headers=headers,
+            params={"async": "true"},
+            json=changed_translations,
+        )
+    except Exception as e:
+        print("Error: Could not submit import job.", e)
+        return False
+
+    if response.status_code == 403:
+        clear_writer_lease()
+    if response.status_code != 202:
+        print("Error: Could not submit import job.", get_error_message(response))
+        return False
+
+    job_url = response.headers.get("Location") or f"{globals.IMPORT_JOBS_ENDPOINT}{response.json()['job_id']}/"
+    job = response.json()
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while job["status"] in ("pending", "running"):
+        if time.monotonic() >= deadline:
+            print(f"Error: Import job did not finish within {JOB_TIMEOUT_SECONDS} seconds, check {job_url} for its status.")
+            return False
+        time.sleep(JOB_POLL_SECONDS)
+        try:
+            response = requests.get(job_url, headers={"Token": headers["Token"]})
+        except Exception as e:
+            print("Error: Could not fetch import job status.", e)
+            return False
+        if response.status_code != 200:
+            print("Error: Could not fetch import job status.", get_error_message(response))
+            return False
+
+        job = response.json()
+        print(f"Import job {job['status']}: {job['processed_count']}/{job['total_count']} translations processed.")
+
+    if job["status"] != "succeeded":
+        print("Error: Import job failed.", job.get("error"))
+        return False
+    return True
+
+
+"""
+Splits the changes of get_changed_translations into changesets of at most
+chunk_size translations each, keeping the format of the changes.
+"""
+
+
+def split_changeset(changed_translations, chunk_size):
+    # deleted languages carry no translations, they all go in the first changeset
+    changesets = [{
+        language: changes
+        for language, changes in changed_translations.items()
+        if changes[TYPE] == DELETED
+    }]
+    size = 0
+    for language, changes in changed_translations.items():
+        if changes[TYPE] == DELETED:
+            continue
+
+        for change_type in (CREATED, MODIFIED, DELETED):
+            for original_word, translated_word in changes[change_type].items():
+                if size == chunk_size:
+                    changesets.append({})
+                    size = 0
+                if language not in changesets[-1]:
+                    changesets[-1][language] = {TYPE: changes[TYPE], CREATED: {}, MODIFIED: {}, DELETED: {}}
+                changesets[-1][language][change_type][original_word] = translated_word
+                size += 1
+
+    return [changeset for changeset in changesets if changeset]
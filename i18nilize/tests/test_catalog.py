@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import unittest
+
+from src.internationalize.catalog import Catalog, CatalogError, catalog_path, compile_catalogs, write_catalog
+from src.internationalize.localize import MISS_RAISE, Localize
+
+# To test:
+# In i18nilize directory, run python -m tests.test_catalog
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.root_directory = "test_directory__do_not_commit"
+        self.languages_dir = os.path.join(self.root_directory, "languages")
+        self.catalogs_dir = os.path.join(self.root_directory, "catalogs")
+        os.makedirs(self.languages_dir, exist_ok=True)
+
+        self.original_dirs = (Localize.languages_dir, Localize.catalogs_dir)
+        Localize.languages_dir = self.languages_dir
+        Localize.catalogs_dir = self.catalogs_dir
+        Localize.translations_map = {}
+
+    def tearDown(self):
+        for translations in Localize.translations_map.values():
+            if isinstance(translations, Catalog):
+                translations.close()
+        Localize.translations_map = {}
+        Localize.languages_dir, Localize.catalogs_dir = self.original_dirs
+        if os.path.exists(self.root_directory):
+            shutil.rmtree(self.root_directory)
+
+    def write_language(self, language, translations):
+        with open(os.path.join(self.languages_dir, f"{language}.json"), "w", encoding="utf8") as file:
+            json.dump(translations, file)
+
+    def open_catalog(self, translations):
+        os.makedirs(self.catalogs_dir, exist_ok=True)
+        path = os.path.join(self.catalogs_dir, "test.catalog")
+        write_catalog(translations, path)
+        catalog = Catalog(path)
+        self.addCleanup(catalog.close)
+        return catalog
+
+    def test_lookup(self):
+        translations = {"hello": "hola", "thanks": "gracias", "café": "☕ caffè", "": "empty"}
+        catalog = self.open_catalog(translations)
+
+        self.assertEqual(catalog.get("hello"), "hola")
+        self.assertEqual(catalog["café"], "☕ caffè")
+        self.assertEqual(catalog[""], "empty")
+        self.assertIsNone(catalog.get("bye"))
+        self.assertEqual(catalog.get("bye", "bye"), "bye")
+        self.assertNotIn("bye", catalog)
+        with self.assertRaises(KeyError):
+            catalog["bye"]
+        self.assertEqual(len(catalog), 4)
+        self.assertEqual(dict(catalog), translations)
+
+    def test_many_keys(self):
+        translations = {f"app.message_{index}": f"message {index}" for index in range(5000)}
+        catalog = self.open_catalog(translations)
+
+        for key, value in translations.items():
+            self.assertEqual(catalog[key], value)
+        self.assertIsNone(catalog.get("app.message_5000"))
+
+    def test_empty_catalog(self):
+        catalog = self.open_catalog({})
+
+        self.assertIsNone(catalog.get("hello"))
+        self.assertEqual(len(catalog), 0)
+
+    def test_invalid_catalog(self):
+        os.makedirs(self.catalogs_dir, exist_ok=True)
+        path = os.path.join(self.catalogs_dir, "invalid.catalog")
+        with open(path, "wb") as file:
+            file.write(b"{\"hello\": \"hola\"}")
+
+        with self.assertRaises(CatalogError):
+            Catalog(path)
+
+    def test_compile_catalogs(self):
+        self.write_language("spanish", {"hello": "hola"})
+        self.write_language("french", {"hello": "bonjour"})
+
+        self.assertEqual(compile_catalogs(self.languages_dir, self.catalogs_dir), ["french", "spanish"])
+        self.assertTrue(os.path.exists(catalog_path(self.catalogs_dir, "spanish")))
+
+    def test_localize_maps_compiled_catalog(self):
+        self.write_language("spanish", {"hello": "hola"})
+        compile_catalogs(self.languages_dir, self.catalogs_dir)
+
+        self.assertEqual(Localize.translate("hello", "spanish"), "hola")
+        self.assertIsInstance(Localize.translations_map["spanish"], Catalog)
+        translator = Localize.translator("spanish", MISS_RAISE)
+        self.assertEqual(translator.translate("hello"), "hola")
+        with self.assertRaises(KeyError):
+            translator.translate("bye")
+
+    def test_localize_skips_stale_catalog(self):
+        self.write_language("spanish", {"hello": "hola"})
+        compile_catalogs(self.languages_dir, self.catalogs_dir)
+        self.write_language("spanish", {"hello": "buenas"})
+        compiled_mtime = os.path.getmtime(catalog_path(self.catalogs_dir, "spanish"))
+        file_path = os.path.join(self.languages_dir, "spanish.json")
+        os.utime(file_path, (compiled_mtime + 1, compiled_mtime + 1))
+
+        self.assertEqual(Localize.translate("hello", "spanish"), "buenas")
+        self.assertIsInstance(Localize.translations_map["spanish"], dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
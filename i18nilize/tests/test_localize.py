@@ -1,6 +1,13 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
 import unittest
 from unittest.mock import patch
-from src.internationalize.localize import Localize
+from src.internationalize.catalog import compile_catalogs
+from src.internationalize.localize import MISS_DEFAULT, MISS_RAISE, Localize
 
 # to test:
 # in i18nilize directory, run python -m tests.test_localize
@@ -38,6 +45,255 @@ class TestLocalize(unittest.TestCase):
     def test_translate_invalid_language(self):
         self.assertRaises(FileNotFoundError, Localize.translate, "hello", "asdf")
 
+    def test_translator(self):
+        Localize.translations_map["french"] = {"hello": "bonjour"}
+        translator = Localize.translator("french")
+
+        self.assertEqual(translator.translate("hello"), "bonjour")
+        self.assertEqual(translator.translate("asdf"), "asdf")
+        with self.assertRaises(TypeError):
+            translator.translations["hello"] = "salut"
+
+    def test_translator_miss_policies(self):
+        Localize.translations_map["french"] = {"hello": "bonjour"}
+
+        self.assertEqual(Localize.translator("french", MISS_DEFAULT, "?").translate("asdf"), "?")
+        self.assertIsNone(Localize.translator("french", MISS_DEFAULT).translate("asdf"))
+        with self.assertRaises(KeyError):
+            Localize.translator("french", MISS_RAISE).translate("asdf")
+        with self.assertRaises(ValueError):
+            Localize.translator("french", "ignore")
+
+    def test_translate_many(self):
+        Localize.translations_map["french"] = {"hello": "bonjour", "thanks": "merci"}
+
+        self.assertEqual(Localize.translate_many(["hello", "asdf", "thanks"], "french"), ["bonjour", "asdf", "merci"])
+        self.assertEqual(Localize.translate_many(["asdf"], "french", MISS_DEFAULT, ""), [""])
+        self.assertEqual(Localize.translate_many([], "french"), [])
+        with self.assertRaises(KeyError):
+            Localize.translate_many(["hello", "asdf"], "french", MISS_RAISE)
+
+    def test_translate_structure(self):
+        Localize.translations_map["french"] = {"hello": "bonjour", "thanks": "merci"}
+        untouched = {"id": 2, "title": "asdf"}
+        data = {
+            "title": "hello",
+            "id": "hello",
+            "tags": ["hello", "thanks"],
+            "items": [{"title": "thanks", "count": 3}, untouched],
+            "meta": {"label": "thanks", "hello": "hello"},
+        }
+
+        result = Localize.translate_structure(data, "french", ["title", "label", "tags"])
+
+        self.assertEqual(result, {
+            "title": "bonjour",
+            "id": "hello",
+            "tags": ["bonjour", "merci"],
+            "items": [{"title": "merci", "count": 3}, untouched],
+            "meta": {"label": "merci", "hello": "hello"},
+        })
+        self.assertEqual(data["title"], "hello")
+        self.assertIs(result["items"][1], untouched)
+
+    def test_translate_structure_without_changes(self):
+        Localize.translations_map["french"] = {"hello": "bonjour"}
+        data = {"title": "asdf", "items": [{"title": "asdf"}]}
+
+        self.assertIs(Localize.translate_structure(data, "french", ["title"]), data)
+
+    def test_translator_invalid_language(self):
+        self.assertRaises(FileNotFoundError, Localize.translator, "asdf")
+
+
+class TestLocalizeFiles(unittest.TestCase):
+    def setUp(self):
+        self.root_directory = "test_directory__do_not_commit"
+        self.languages_dir = os.path.join(self.root_directory, "languages")
+        self.catalogs_dir = os.path.join(self.root_directory, "catalogs")
+        os.makedirs(self.languages_dir, exist_ok=True)
+
+        self.original_dirs = (Localize.languages_dir, Localize.catalogs_dir)
+        Localize.languages_dir = self.languages_dir
+        Localize.catalogs_dir = self.catalogs_dir
+        Localize.translations_map = {}
+        Localize._translators = {}
+        self.write_language("spanish", {"hello": "hola"})
+
+    def tearDown(self):
+        Localize.stop_watching()
+        Localize.set_fallbacks({})
+        Localize.translations_map = {}
+        Localize.languages_dir, Localize.catalogs_dir = self.original_dirs
+        if os.path.exists(self.root_directory):
+            shutil.rmtree(self.root_directory)
+
+    def write_language(self, language, translations, mtime_offset=0):
+        file_path = os.path.join(self.languages_dir, f"{language}.json")
+        with open(file_path, "w", encoding="utf8") as file:
+            json.dump(translations, file)
+        if mtime_offset:
+            # coarse file system timestamps could hide the change
+            mtime = os.path.getmtime(file_path) + mtime_offset
+            os.utime(file_path, (mtime, mtime))
+
+    def test_reload_changed_language(self):
+        translator = Localize.translator("spanish")
+        self.assertEqual(Localize.reload_changed(), [])
+
+        self.write_language("spanish", {"hello": "buenas"}, mtime_offset=1)
+
+        self.assertEqual(Localize.reload_changed(), ["spanish"])
+        self.assertEqual(Localize.translate("hello", "spanish"), "buenas")
+        self.assertEqual(translator.translate("hello"), "buenas")
+        self.assertEqual(Localize.reload_changed(), [])
+
+    def test_reload_compiled_catalog(self):
+        compile_catalogs(self.languages_dir, self.catalogs_dir)
+        translator = Localize.translator("spanish", MISS_RAISE)
+
+        self.write_language("spanish", {"hello": "buenas"}, mtime_offset=1)
+        compile_catalogs(self.languages_dir, self.catalogs_dir)
+        os.utime(os.path.join(self.catalogs_dir, "spanish.catalog"), (time.time() + 2, time.time() + 2))
+
+        self.assertEqual(Localize.reload_changed(), ["spanish"])
+        self.assertEqual(translator.translate("hello"), "buenas")
+
+    def test_reload_keeps_translations_on_invalid_file(self):
+        translator = Localize.translator("spanish")
+        file_path = os.path.join(self.languages_dir, "spanish.json")
+        with open(file_path, "w") as file:
+            file.write("{\"hello\": ")
+
+        self.assertEqual(Localize.reload_changed(), [])
+        self.assertEqual(translator.translate("hello"), "hola")
+
+        self.write_language("spanish", {"hello": "buenas"}, mtime_offset=1)
+        self.assertEqual(Localize.reload_changed(), ["spanish"])
+
+    def test_watcher(self):
+        translator = Localize.translator("spanish")
+        Localize.watch(interval=0.01)
+
+        self.write_language("spanish", {"hello": "buenas"}, mtime_offset=1)
+        deadline = time.monotonic() + 5
+        while translator.translate("hello") != "buenas" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(translator.translate("hello"), "buenas")
+
+    def slow_read_language(self, reads):
+        read_language = Localize._read_language
+
+        def read(language):
+            reads.append(language)
+            time.sleep(0.05)
+            return read_language(language)
+        return read
+
+    def test_concurrent_loads_read_once(self):
+        reads = []
+        with patch.object(Localize, "_read_language", side_effect=self.slow_read_language(reads)):
+            threads = [threading.Thread(target=Localize.load_language, args=("spanish",)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(reads, ["spanish"])
+        self.assertEqual(Localize.translations_map["spanish"], {"hello": "hola"})
+        self.assertEqual(Localize._loading, {})
+
+    def test_concurrent_load_failure(self):
+        errors = []
+
+        def load():
+            try:
+                Localize.load_language("japanese")
+            except FileNotFoundError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=load) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(Localize._loading, {})
+
+    def test_async_loads_read_once(self):
+        reads = []
+
+        async def load():
+            translators = await asyncio.gather(*(Localize.translator_async("spanish") for _ in range(5)))
+            return [translator.translate("hello") for translator in translators]
+
+        with patch.object(Localize, "_read_language", side_effect=self.slow_read_language(reads)):
+            self.assertEqual(asyncio.run(load()), ["hola"] * 5)
+
+        self.assertEqual(reads, ["spanish"])
+
+    def test_async_load_failure(self):
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(Localize.load_language_async("japanese"))
+
+    def test_fallback_chain(self):
+        self.write_language("french", {"hello": "bonjour", "thanks": "merci"})
+        self.write_language("fr-ca", {"hello": "allô"})
+        self.write_language("english", {"hello": "hello", "thanks": "thanks", "bye": "bye"})
+        Localize.set_fallbacks({"fr-ca": ["french", "english"], "fr-be": ["french"]})
+
+        translator = Localize.translator("fr-ca")
+        self.assertEqual(translator.translate("hello"), "allô")
+        self.assertEqual(translator.translate("thanks"), "merci")
+        self.assertEqual(translator.translate("bye"), "bye")
+        self.assertEqual(translator.translate("asdf"), "asdf")
+        self.assertIs(Localize.get_translations("fr-ca"), Localize.get_translations("fr-ca"))
+
+        # fr-be has no translation file of its own
+        self.assertEqual(Localize.translate("hello", "fr-be"), "bonjour")
+        self.assertEqual(Localize.translate("bye", "fr-be"), "Translation for bye not found")
+
+    def test_fallback_chain_without_languages(self):
+        Localize.set_fallbacks({"fr-ca": ["french"]})
+
+        self.assertRaises(FileNotFoundError, Localize.translator, "fr-ca")
+
+    def test_reload_rebuilds_fallback_chains(self):
+        self.write_language("french", {"hello": "bonjour", "thanks": "merci"})
+        Localize.set_fallbacks({"fr-ca": ["french"]})
+        translator = Localize.translator("fr-ca")
+        spanish_translations = Localize.get_translations("spanish")
+
+        self.write_language("french", {"hello": "bonjour", "thanks": "merci bien"}, mtime_offset=1)
+
+        self.assertEqual(Localize.reload_changed(), ["french"])
+        self.assertEqual(translator.translate("thanks"), "merci bien")
+        self.assertIs(Localize.get_translations("spanish"), spanish_translations)
+
+    def test_reload_merges_fallback_added_later(self):
+        Localize.set_fallbacks({"spanish": ["english"]})
+        translator = Localize.translator("spanish")
+        self.assertEqual(translator.translate("bye"), "bye")
+        self.assertEqual(Localize.reload_changed(), [])
+
+        # english is pulled after spanish was first used
+        self.write_language("english", {"bye": "goodbye"})
+
+        self.assertEqual(Localize.reload_changed(), ["english"])
+        self.assertEqual(translator.translate("bye"), "goodbye")
+        self.assertEqual(Localize.reload_changed(), [])
+
+    def test_set_fallbacks_rebinds_translators(self):
+        self.write_language("english", {"bye": "bye"})
+        translator = Localize.translator("spanish", MISS_DEFAULT)
+        self.assertIsNone(translator.translate("bye"))
+
+        Localize.set_fallbacks({"spanish": ["english"]})
+
+        self.assertEqual(translator.translate("bye"), "bye")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,436 @@
+import json
+import os
+import shutil
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.internationalize import globals, wire_format
+from src.internationalize.api_helpers import get_writer_lease
+from src.internationalize.diffing_processor import DiffingProcessor
+from src.internationalize.helpers import read_sync_state, update_sync_state
+from src.internationalize.sync_processor import pull_translations, push_translations, split_changeset
+
+# To test:
+# In i18nilize directory, run python -m tests.test_sync_processor
+
+
+class TestSyncProcessor(unittest.TestCase):
+    def setUp(self):
+        self.original_globals = (
+            globals.ROOT_DIRECTORY,
+            globals.LANGUAGES_DIR,
+            globals.DIFF_STATE_DIR,
+            globals.SYNC_STATE_FILE,
+        )
+        globals.ROOT_DIRECTORY = "test_directory__do_not_commit"
+        globals.LANGUAGES_DIR = os.path.join(globals.ROOT_DIRECTORY, "languages")
+        globals.DIFF_STATE_DIR = os.path.join(globals.ROOT_DIRECTORY, "diff_state")
+        globals.SYNC_STATE_FILE = os.path.join(globals.DIFF_STATE_DIR, "sync_state.json")
+        os.makedirs(globals.LANGUAGES_DIR, exist_ok=True)
+        os.makedirs(globals.DIFF_STATE_DIR, exist_ok=True)
+
+        diffing_patcher = patch("src.internationalize.sync_processor.DiffingProcessor")
+        self.mock_diffing_processor = diffing_patcher.start()
+        self.addCleanup(diffing_patcher.stop)
+
+        env_patcher = patch.dict(os.environ, {"GROUP_TOKEN": "group-token", "MS_TOKEN": "ms-token"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+    def tearDown(self):
+        if os.path.exists(globals.ROOT_DIRECTORY):
+            shutil.rmtree(globals.ROOT_DIRECTORY)
+        (
+            globals.ROOT_DIRECTORY,
+            globals.LANGUAGES_DIR,
+            globals.DIFF_STATE_DIR,
+            globals.SYNC_STATE_FILE,
+        ) = self.original_globals
+
+    def mock_response(self, status_code, data=None, headers=None, content=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.json.return_value = data
+        response.content = content
+        response.headers = headers or {}
+        return response
+
+    def read_language(self, language):
+        with open(os.path.join(globals.LANGUAGES_DIR, f"{language}.json"), "r") as file:
+            return json.load(file)
+
+    def write_language(self, language, translations):
+        with open(os.path.join(globals.LANGUAGES_DIR, f"{language}.json"), "w") as file:
+            json.dump(translations, file, indent=4)
+
+    def use_diffing_processor(self, **languages):
+        # syncs the given languages with a real DiffingProcessor
+        self.mock_diffing_processor.side_effect = DiffingProcessor
+        os.makedirs(os.path.join(globals.DIFF_STATE_DIR, "translations"), exist_ok=True)
+        for language, translations in languages.items():
+            self.write_language(language, translations)
+        diff_processor = DiffingProcessor(globals.LANGUAGES_DIR)
+        diff_processor.update_to_current_state()
+        return diff_processor
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_pull_stores_etag(self, mock_get):
+        mock_get.return_value = self.mock_response(
+            200, {"spanish": {"hello": "hola"}}, {"ETag": '"1-3"'}
+        )
+
+        pull_translations()
+
+        self.assertNotIn("If-None-Match", mock_get.call_args.kwargs["headers"])
+        # full pulls are streamed as JSON by default
+        self.assertNotIn("Accept", mock_get.call_args.kwargs["headers"])
+        self.assertEqual(mock_get.call_args.kwargs["params"], {"stream": "true"})
+        self.assertEqual(self.read_language("spanish"), {"hello": "hola"})
+        self.assertEqual(read_sync_state()["pull_etag"], '"1-3"')
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_pull_translation_table(self, mock_get):
+        catalog = {"spanish": {"hello": "hola"}, "french": {"hello": "bonjour"}}
+        mock_get.return_value = self.mock_response(
+            200, headers={"Content-Type": wire_format.MEDIA_TYPE}, content=wire_format.encode_catalog(catalog)
+        )
+
+        pull_translations(table=True)
+
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["Accept"], wire_format.MEDIA_TYPE)
+        self.assertEqual(mock_get.call_args.kwargs["params"], {})
+        self.assertEqual(self.read_language("spanish"), {"hello": "hola"})
+        self.assertEqual(self.read_language("french"), {"hello": "bonjour"})
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_pull_not_modified_keeps_files(self, mock_get):
+        update_sync_state(pull_etag='"1-3"')
+        with open(os.path.join(globals.LANGUAGES_DIR, "spanish.json"), "w") as file:
+            json.dump({"hello": "hola"}, file)
+        mock_get.return_value = self.mock_response(304, headers={"ETag": '"1-3"'})
+
+        pull_translations()
+
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"1-3"')
+        self.assertEqual(self.read_language("spanish"), {"hello": "hola"})
+        self.mock_diffing_processor.return_value.update_to_current_state.assert_not_called()
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_pull_stores_revision(self, mock_get):
+        mock_get.return_value = self.mock_response(
+            200, {"spanish": {"hello": "hola"}}, {"ETag": '"1-3"', "Translations-Revision": "3"}
+        )
+
+        pull_translations(incremental=True)
+
+        self.assertEqual(mock_get.call_args.args[0], globals.PULL_TRANSLATIONS_ENDPOINT)
+        self.assertEqual(read_sync_state()["revision"], 3)
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_incremental_pull_applies_changes(self, mock_get):
+        update_sync_state(revision=3)
+        with open(os.path.join(globals.LANGUAGES_DIR, "spanish.json"), "w") as file:
+            json.dump({"hello": "hola", "bye": "chau", "thanks": "gracias"}, file)
+        with open(os.path.join(globals.LANGUAGES_DIR, "german.json"), "w") as file:
+            json.dump({"hello": "hallo"}, file)
+        mock_get.return_value = self.mock_response(200, {
+            "revision": 5,
+            "changes": {
+                "spanish": {"reset": False, "updated": {"hello": "buenas"}, "deleted": ["bye"]},
+                "french": {"reset": False, "updated": {"hello": "bonjour"}, "deleted": []},
+                "german": {"reset": True, "updated": {}, "deleted": []},
+            },
+        })
+
+        pull_translations(incremental=True)
+
+        self.assertEqual(mock_get.call_args.args[0], globals.TRANSLATION_CHANGES_ENDPOINT)
+        self.assertEqual(mock_get.call_args.kwargs["params"], {"since": 3})
+        self.assertEqual(self.read_language("spanish"), {"hello": "buenas", "thanks": "gracias"})
+        self.assertEqual(self.read_language("french"), {"hello": "bonjour"})
+        self.assertFalse(os.path.exists(os.path.join(globals.LANGUAGES_DIR, "german.json")))
+        self.assertEqual(read_sync_state()["revision"], 5)
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_incremental_pull_keeps_unpushed_changes(self, mock_get):
+        update_sync_state(revision=3)
+        diff_processor = self.use_diffing_processor(
+            spanish={"hello": "hola", "bye": "chau"},
+            german={"hello": "hallo"},
+        )
+        self.write_language("spanish", {"hello": "hola", "bye": "adios", "thanks": "gracias"})
+        self.write_language("german", {"hello": "servus"})
+        mock_get.return_value = self.mock_response(200, {
+            "revision": 5,
+            "changes": {"spanish": {"reset": False, "updated": {"hello": "buenas"}, "deleted": []}},
+        })
+
+        pull_translations(incremental=True)
+
+        self.assertEqual(self.read_language("spanish"), {"hello": "buenas", "bye": "adios", "thanks": "gracias"})
+        changed_translations = diff_processor.get_changed_translations()
+        self.assertEqual(changed_translations["spanish"]["created"], {"thanks": "gracias"})
+        self.assertEqual(changed_translations["spanish"]["modified"], {"bye": "adios"})
+        self.assertEqual(changed_translations["german"]["modified"], {"hello": "servus"})
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_incremental_pull_falls_back_to_full_pull(self, mock_get):
+        update_sync_state(revision=9)
+        mock_get.side_effect = [
+            self.mock_response(410, {"error": "Revision is ahead of the server, pull all translations instead."}),
+            self.mock_response(200, {"spanish": {"hello": "hola"}}, {"Translations-Revision": "2"}),
+        ]
+
+        pull_translations(incremental=True)
+
+        self.assertEqual(self.read_language("spanish"), {"hello": "hola"})
+        self.assertEqual(read_sync_state()["revision"], 2)
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_filtered_pull_merges_pages(self, mock_get):
+        with open(os.path.join(globals.LANGUAGES_DIR, "spanish.json"), "w") as file:
+            json.dump({"home.title": "viejo", "home.removed": "borrado", "settings.title": "ajustes"}, file)
+        mock_get.side_effect = [
+            self.mock_response(200, {
+                "translations": {"spanish": {"home.body": "cuerpo"}, "french": {"home.body": "corps"}},
+                "next_cursor": "home.body",
+            }),
+            self.mock_response(200, {
+                "translations": {"spanish": {"home.title": "inicio"}, "french": {}},
+                "next_cursor": None,
+            }),
+        ]
+
+        pull_translations(languages=["spanish", "french"], prefix="home.")
+
+        self.assertEqual(mock_get.call_args_list[0].kwargs["params"]["languages"], "spanish,french")
+        self.assertEqual(mock_get.call_args_list[1].kwargs["params"]["cursor"], "home.body")
+        self.assertEqual(
+            self.read_language("spanish"),
+            {"settings.title": "ajustes", "home.body": "cuerpo", "home.title": "inicio"},
+        )
+        self.assertEqual(self.read_language("french"), {"home.body": "corps"})
+        self.assertNotIn("revision", read_sync_state())
+
+    @patch("src.internationalize.sync_processor.requests.get")
+    def test_filtered_pull_keeps_unpushed_changes(self, mock_get):
+        diff_processor = self.use_diffing_processor(
+            spanish={"home.title": "viejo", "settings.title": "ajustes"},
+            french={"home.title": "accueil"},
+        )
+        self.write_language("spanish", {"home.title": "viejo", "settings.title": "opciones", "home.body": "local"})
+        self.write_language("french", {"home.title": "maison"})
+        mock_get.return_value = self.mock_response(200, {
+            "translations": {"spanish": {"home.title": "inicio"}},
+            "next_cursor": None,
+        })
+
+        pull_translations(languages=["spanish"], prefix="home.")
+
+        self.assertEqual(self.read_language("spanish"), {"settings.title": "opciones", "home.title": "inicio"})
+        changed_translations = diff_processor.get_changed_translations()
+        self.assertEqual(changed_translations["spanish"]["modified"], {"settings.title": "opciones"})
+        self.assertEqual(changed_translations["spanish"]["created"], {})
+        self.assertEqual(changed_translations["french"]["modified"], {"home.title": "maison"})
+
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_sends_changesets(self, mock_post, mock_get_writer_lease):
+        changed_translations = {
+            "spanish": {
+                "type": "modified",
+                "created": {"thanks": "gracias"},
+                "modified": {"hello": "buenas"},
+                "deleted": {"bye": "chau"},
+            },
+            "german": {"type": "deleted", "created": {}, "modified": {}, "deleted": {}},
+        }
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = changed_translations
+        mock_post.return_value = self.mock_response(200, {"message": "Changeset applied successfully."})
+
+        push_translations()
+
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[0], globals.TRANSLATION_CHANGESET_ENDPOINT)
+        self.assertEqual(mock_post.call_args.kwargs["json"], changed_translations)
+        self.assertEqual(mock_post.call_args.kwargs["headers"], {"Token": "group-token", "Writer-Lease": "lease-id"})
+        diff_processor.update_to_current_state.assert_called_once()
+
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value=None)
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_without_writer_lease(self, mock_post, mock_get_writer_lease):
+        push_translations()
+
+        mock_get_writer_lease.assert_called_once_with("ms-token")
+        mock_post.assert_not_called()
+
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_rejected_lease_is_cleared(self, mock_post, mock_get_writer_lease):
+        update_sync_state(writer_lease={"ms_token": "ms-token", "lease_id": "lease-id", "expires_at": "2100-01-01T00:00:00+00:00"})
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {
+            "spanish": {"type": "created", "created": {"hello": "hola"}, "modified": {}, "deleted": {}},
+        }
+        mock_post.return_value = self.mock_response(403, {"error": "Writer lease is invalid or expired."})
+
+        push_translations()
+
+        self.assertIsNone(read_sync_state()["writer_lease"])
+        diff_processor.update_to_current_state.assert_not_called()
+
+    @patch("src.internationalize.api_helpers.requests.post")
+    def test_writer_lease_is_reused_until_it_expires(self, mock_post):
+        mock_post.return_value = self.mock_response(200, {"lease_id": "lease-id", "expires_at": "2100-01-01T00:00:00+00:00"})
+
+        self.assertEqual(get_writer_lease("ms-token"), "lease-id")
+        self.assertEqual(get_writer_lease("ms-token"), "lease-id")
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[0], globals.WRITER_LEASE_ENDPOINT)
+
+        update_sync_state(writer_lease={"ms_token": "ms-token", "lease_id": "old-lease", "expires_at": "2000-01-01T00:00:00+00:00"})
+        self.assertEqual(get_writer_lease("ms-token"), "lease-id")
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch("src.internationalize.api_helpers.requests.post")
+    def test_writer_lease_without_permissions(self, mock_post):
+        mock_post.return_value = self.mock_response(403, {"error": "Microservice does not have writer permissions."})
+
+        self.assertIsNone(get_writer_lease("ms-token"))
+
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_failure_keeps_diff_state(self, mock_post, mock_get_writer_lease):
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {
+            "spanish": {"type": "created", "created": {"hello": "hola"}, "modified": {}, "deleted": {}},
+        }
+        mock_post.return_value = self.mock_response(500, {"error": "An error occurred while applying the changeset."})
+
+        push_translations()
+
+        diff_processor.update_to_current_state.assert_not_called()
+
+    @patch("builtins.print")
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_failure_without_json_body(self, mock_post, mock_get_writer_lease, mock_print):
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {
+            "spanish": {"type": "created", "created": {"hello": "hola"}, "modified": {}, "deleted": {}},
+        }
+        response = self.mock_response(502)
+        response.json.side_effect = json.JSONDecodeError("Expecting value", "", 0)
+        response.text = "<html><body>502 Bad Gateway</body></html>\n"
+        mock_post.return_value = response
+
+        push_translations()
+
+        mock_print.assert_called_with("Error: Could not push translations.", "<html><body>502 Bad Gateway</body></html>")
+        diff_processor.update_to_current_state.assert_not_called()
+
+    @patch("src.internationalize.sync_processor.time.sleep")
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.get")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_async_polls_job(self, mock_post, mock_get, mock_get_writer_lease, mock_sleep):
+        changed_translations = {
+            "spanish": {"type": "created", "created": {"hello": "hola"}, "modified": {}, "deleted": {}},
+        }
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = changed_translations
+        job = {"job_id": "1", "status": "pending", "total_count": 1, "processed_count": 0, "error": None}
+        mock_post.return_value = self.mock_response(202, job, {"Location": "http://localhost:8000/api/translations/jobs/1/"})
+        mock_get.side_effect = [
+            self.mock_response(200, {**job, "status": "running"}),
+            self.mock_response(200, {**job, "status": "succeeded", "processed_count": 1}),
+        ]
+
+        push_translations(asynchronous=True)
+
+        self.assertEqual(mock_post.call_args.kwargs["params"], {"async": "true"})
+        self.assertEqual(mock_post.call_args.kwargs["json"], changed_translations)
+        self.assertEqual(mock_get.call_args.args[0], "http://localhost:8000/api/translations/jobs/1/")
+        self.assertEqual(mock_get.call_count, 2)
+        diff_processor.update_to_current_state.assert_called_once()
+
+    @patch("src.internationalize.sync_processor.time.sleep")
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.get")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_async_failed_job(self, mock_post, mock_get, mock_get_writer_lease, mock_sleep):
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {}
+        job = {"job_id": "1", "status": "pending", "total_count": 0, "processed_count": 0, "error": None}
+        mock_post.return_value = self.mock_response(202, job)
+        mock_get.return_value = self.mock_response(200, {**job, "status": "failed", "error": "database is locked"})
+
+        push_translations(asynchronous=True)
+
+        self.assertEqual(mock_get.call_args.args[0], f"{globals.IMPORT_JOBS_ENDPOINT}1/")
+        diff_processor.update_to_current_state.assert_not_called()
+
+    @patch("builtins.print")
+    @patch("src.internationalize.sync_processor.time.sleep")
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.get")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_async_poll_without_json_body(self, mock_post, mock_get, mock_get_writer_lease, mock_sleep, mock_print):
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {}
+        job = {"job_id": "1", "status": "pending", "total_count": 0, "processed_count": 0, "error": None}
+        mock_post.return_value = self.mock_response(202, job)
+        response = self.mock_response(504)
+        response.json.side_effect = json.JSONDecodeError("Expecting value", "", 0)
+        response.text = ""
+        mock_get.return_value = response
+
+        push_translations(asynchronous=True)
+
+        mock_print.assert_called_with("Error: Could not fetch import job status.", "HTTP 504")
+        diff_processor.update_to_current_state.assert_not_called()
+
+    @patch("src.internationalize.sync_processor.JOB_TIMEOUT_SECONDS", 0)
+    @patch("src.internationalize.sync_processor.time.sleep")
+    @patch("src.internationalize.sync_processor.get_writer_lease", return_value="lease-id")
+    @patch("src.internationalize.sync_processor.requests.get")
+    @patch("src.internationalize.sync_processor.requests.post")
+    def test_push_async_job_timeout(self, mock_post, mock_get, mock_get_writer_lease, mock_sleep):
+        diff_processor = self.mock_diffing_processor.return_value
+        diff_processor.get_changed_translations.return_value = {}
+        job = {"job_id": "1", "status": "running", "total_count": 1, "processed_count": 0, "error": None}
+        mock_post.return_value = self.mock_response(202, job)
+        mock_get.return_value = self.mock_response(200, job)
+
+        push_translations(asynchronous=True)
+
+        mock_get.assert_not_called()
+        diff_processor.update_to_current_state.assert_not_called()
+
+    def test_split_changeset(self):
+        changed_translations = {
+            "spanish": {
+                "type": "modified",
+                "created": {"a": "1", "b": "2"},
+                "modified": {"c": "3"},
+                "deleted": {"d": "4"},
+            },
+            "german": {"type": "deleted", "created": {}, "modified": {}, "deleted": {}},
+        }
+
+        changesets = split_changeset(changed_translations, 3)
+
+        self.assertEqual(changesets, [
+            {
+                "spanish": {"type": "modified", "created": {"a": "1", "b": "2"}, "modified": {"c": "3"}, "deleted": {}},
+                "german": {"type": "deleted", "created": {}, "modified": {}, "deleted": {}},
+            },
+            {
+                "spanish": {"type": "modified", "created": {}, "modified": {}, "deleted": {"d": "4"}},
+            },
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()